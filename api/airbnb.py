@@ -1,18 +1,9 @@
-import requests
+from api.client import get_client, get_async_client
+from api.cache import cached
+from api.records import parse_airbnb
 
 
-# Define a function to search Airbnb
-def search_airbnb(
-    location,
-    checkin,
-    checkout,
-    adults,
-    pricemax,
-    totalrecords,
-    rapidapi_key=None
-):
-    url = "https://airbnb19.p.rapidapi.com/api/v1/searchPropertyByLocationV2"
-    
+def _airbnb_request(location, checkin, checkout, adults, pricemax, totalrecords, rapidapi_key):
     querystring = {
         "location": location,
         "checkin": checkin,
@@ -27,8 +18,10 @@ def search_airbnb(
         "X-RapidAPI-Key": rapidapi_key,
         "X-RapidAPI-Host": "airbnb19.p.rapidapi.com"
     }
+    return querystring, headers
 
-    response = requests.get(url, headers=headers, params=querystring)
+
+def _airbnb_results(response):
     # print(response.status_code)
     # print(response.json())
     if response.status_code != 200:
@@ -39,44 +32,58 @@ def search_airbnb(
     return results
 
 
-def display_airbnb_results(response_json):
-    results = ""
-    listings = response_json.get('data', {}).get('list', [])
-    
+# Define a function to search Airbnb
+@cached("airbnb")
+def search_airbnb(
+    location,
+    checkin,
+    checkout,
+    adults,
+    pricemax,
+    totalrecords,
+    rapidapi_key=None
+):
+    querystring, headers = _airbnb_request(
+        location, checkin, checkout, adults, pricemax, totalrecords, rapidapi_key
+    )
+    response = get_client().get("airbnb", "searchPropertyByLocationV2", headers=headers, params=querystring)
+    return _airbnb_results(response)
+
+
+# Async variant of search_airbnb
+@cached("airbnb")
+async def search_airbnb_async(
+    location,
+    checkin,
+    checkout,
+    adults,
+    pricemax,
+    totalrecords,
+    rapidapi_key=None
+):
+    querystring, headers = _airbnb_request(
+        location, checkin, checkout, adults, pricemax, totalrecords, rapidapi_key
+    )
+    response = await get_async_client().get(
+        "airbnb", "searchPropertyByLocationV2", headers=headers, params=querystring
+    )
+    return _airbnb_results(response)
+
+
+def display_airbnb_results(listings):
     if not listings:
-        # print("No airbnb listings found.")
-        results += "No airbnb listings found."
-        return
+        return "No airbnb listings found."
     
-    # print(f"Found {len(listings)} listings:\n" + "="*60)
-    results += f"Found {len(listings)} listings:\n" + "="*60 + "\n"
+    results = f"Found {len(listings)} listings:\n" + "="*60 + "\n"
     
-    for idx, item in enumerate(listings, 1):
-        listing_info = item.get('listing', {})
-        pricing_info = item.get('pricingQuote', {})
-        
-        name = listing_info.get('name', 'Unknown')
-        city = listing_info.get('city', 'Unknown')
-        rating = listing_info.get('avgRatingLocalized', 'No Rating')
-        room_type = listing_info.get('roomTypeCategory', 'Unknown')
-        url = listing_info.get('webURL', '#')
+    for idx, listing in enumerate(listings, 1):
+        price = f"${listing.price_per_night:.0f}" if listing.price_per_night is not None else "N/A"
         
-        price_info = pricing_info.get('structuredStayDisplayPrice', {}).get('primaryLine', {})
-        price = price_info.get('price', 'N/A')
-        
-        # Display nicely
-        # print(f"{idx}. {name} ({city})")
-        # print(f"   🛏️ Room Type: {room_type}")
-        # print(f"   💵 Price: {price} per night")
-        # print(f"   ⭐ Rating: {rating}")
-        # print(f"   🔗 Link: {url}")
-        # print("-" * 60)
-
-        results += (f"{idx}. {name} ({city})\n")
-        results += (f"   🛏️ Room Type: {room_type}\n")
+        results += (f"{idx}. {listing.name} ({listing.address or 'Unknown'})\n")
+        results += (f"   🛏️ Room Type: {listing.room_type or 'Unknown'}\n")
         results += (f"   💵 Price: {price} per night\n")
-        results += (f"   ⭐ Rating: {rating}\n")
-        results += (f"   🔗 Link: {url}\n")
+        results += (f"   ⭐ Rating: {listing.label or 'No Rating'}\n")
+        results += (f"   🔗 Link: {listing.url or '#'}\n")
         results += ("-" * 60)
         results += "\n"
     return results
@@ -118,7 +125,7 @@ if __name__ == "__main__":
     
     # Display the results
     if results:
-        formatted_results = display_airbnb_results(results)
+        formatted_results = display_airbnb_results(parse_airbnb(results))
         print(formatted_results)
     else:
         print("No results found or an error occurred.")
@@ -145,7 +152,7 @@ if __name__ == "__main__":
     
     # Display the results
     if results:
-        formatted_results = display_airbnb_results(results)
+        formatted_results = display_airbnb_results(parse_airbnb(results))
         print(formatted_results)
     else:
         print("No results found or an error occurred.")
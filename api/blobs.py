@@ -0,0 +1,170 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator
+
+# Tool results larger than this (bytes) are stored out of band, unless BLOB_THRESHOLD says otherwise
+DEFAULT_THRESHOLD = 2048
+
+# Characters of a stored result kept inline in front of its handle
+PREVIEW_CHARS = 240
+
+# Longest chunk read_blob returns at once
+READ_CHARS = 4000
+
+MEMORY = "memory"
+DISK = "disk"
+
+
+class BlobStore:
+    """
+    Session-scoped store of large tool results, kept in memory.
+
+    Each blob gets a short handle numbered within the session; blobs are
+    matched by SHA-256 digest, so the same result stored twice takes the
+    space (and the handle) once.
+    """
+
+    def __init__(self):
+        self._blobs: Dict[str, str] = {}
+        self._handles: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stored_bytes = 0
+        self.offloaded = 0
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def put(self, text: str) -> str:
+        """Store a blob and return its handle."""
+        digest = self.digest(text)
+        with self._lock:
+            self.offloaded += 1
+            if digest not in self._handles:
+                self._handles[digest] = f"blob-{len(self._handles) + 1}"
+                self._write(self._handles[digest], text)
+                self.stored_bytes += len(text.encode("utf-8"))
+            return self._handles[digest]
+
+    def get(self, handle: str) -> Optional[str]:
+        """A stored blob, or None unless the handle is one this store issued."""
+        with self._lock:
+            # Handles come from the LLM; anything not issued here never reaches the storage
+            if handle not in self._handles.values():
+                return None
+            return self._read(handle) if self._contains(handle) else None
+
+    def _contains(self, handle: str) -> bool:
+        return handle in self._blobs
+
+    def _write(self, handle: str, text: str):
+        self._blobs[handle] = text
+
+    def _read(self, handle: str) -> str:
+        return self._blobs[handle]
+
+    def close(self):
+        with self._lock:
+            self._blobs.clear()
+            self._handles.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"offloaded": self.offloaded, "stored_bytes": self.stored_bytes}
+
+
+class DiskBlobStore(BlobStore):
+    """BlobStore that keeps each blob in a file of a session directory, removed on close."""
+
+    def __init__(self, root: Optional[str] = None):
+        super().__init__()
+        if root:
+            Path(root).mkdir(parents=True, exist_ok=True)
+        self.path = Path(tempfile.mkdtemp(prefix="blobs-", dir=root))
+
+    def _contains(self, handle: str) -> bool:
+        return (self.path / handle).exists()
+
+    def _write(self, handle: str, text: str):
+        (self.path / handle).write_text(text, encoding="utf-8")
+
+    def _read(self, handle: str) -> str:
+        return (self.path / handle).read_text(encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._handles.clear()
+
+
+_session: contextvars.ContextVar[Optional[BlobStore]] = contextvars.ContextVar("blob_store", default=None)
+
+
+def current_store() -> Optional[BlobStore]:
+    """Blob store of the running session, or None outside blob_session."""
+    return _session.get()
+
+
+@contextmanager
+def blob_session(kind: Optional[str] = None) -> Iterator[Optional[BlobStore]]:
+    """
+    Give a planning session its own blob store, dropped when the session ends.
+
+    kind (or BLOB_STORE) is "memory", the default, "disk" (under BLOB_DIR,
+    else the system temp directory) or "off", which keeps results inline.
+    """
+    kind = (kind or os.environ.get("BLOB_STORE", MEMORY)).strip().lower()
+    if kind == "off":
+        yield None
+        return
+    store = DiskBlobStore(os.environ.get("BLOB_DIR")) if kind == DISK else BlobStore()
+    token = _session.set(store)
+    try:
+        yield store
+    finally:
+        _session.reset(token)
+        store.close()
+
+
+def threshold() -> int:
+    value = os.environ.get("BLOB_THRESHOLD")
+    return int(value) if value else DEFAULT_THRESHOLD
+
+
+def offload(text: str, limit: Optional[int] = None) -> str:
+    """
+    Put a large tool result in the session's blob store.
+
+    Returns the text itself when it is small or no session is running, else
+    a reference: the handle, digest and size, with a short preview.
+    """
+    store = current_store()
+    size = len(text.encode("utf-8"))
+    if store is None or size <= (limit or threshold()):
+        return text
+    handle = store.put(text)
+    preview = text[:PREVIEW_CHARS].rstrip()
+    return (
+        f"[{handle} sha256:{store.digest(text)[:16]} {size} bytes] {preview}…\n"
+        f"(Full result stored out of band; call read_blob with handle \"{handle}\" to read it.)"
+    )
+
+
+def read_blob(handle: str, offset: int = 0, length: int = READ_CHARS) -> str:
+    """A chunk of a stored tool result; says where the next chunk starts."""
+    store = current_store()
+    text = store.get(handle.strip("[] ")) if store is not None else None
+    if text is None:
+        return f"Error: no stored result with handle {handle}"
+    offset = max(int(offset), 0)
+    chunk = text[offset:offset + min(max(int(length), 1), READ_CHARS)]
+    end = offset + len(chunk)
+    if end < len(text):
+        chunk += f"\n(characters {offset}-{end} of {len(text)}; read on with offset={end})"
+    return chunk
@@ -1,22 +1,134 @@
-import requests
+import os
+import re
 import json
+import asyncio
+import tempfile
+import threading
+import unicodedata
+from pathlib import Path
+from api.client import get_client, get_async_client
+from api.cache import cached
+from api.records import parse_booking
 
+DEFAULT_DEST_INDEX_PATH = Path(__file__).resolve().parent.parent / ".cache" / "booking_destinations.json"
 
-def search_booking_destination(
-    query,
-    rapidapi_key=None
-):
-    url = "https://booking-com15.p.rapidapi.com/api/v1/hotels/searchDestination"
-    
-    querystring = {
-        "query": query,
-    }
-    headers = {
+
+def normalize_city(query):
+    """Casefold, strip accents and punctuation so 'Zürich' and ' zurich ' share a key."""
+    text = unicodedata.normalize("NFKD", query or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+class DestinationIndex:
+    """
+    Persistent map of city strings to Booking.com (dest_id, search_type).
+
+    Populated from the first searchDestination lookup of each city and
+    saved to disk, so later hotel searches for a known city skip that
+    round trip. Lookups only match the exact normalized name: a near miss
+    such as 'Vitoria' for 'Victoria' is a different city, so it goes to
+    searchDestination like any unknown one.
+    """
+
+    def __init__(self, path=None, preload=None):
+        self.path = Path(path or os.environ.get("BOOKING_DEST_INDEX_PATH") or DEFAULT_DEST_INDEX_PATH)
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Serializes saves, so lookups are not held up by disk writes
+        self._write_lock = threading.Lock()
+        if self.path.exists():
+            self.load(self.path, persist=False)
+        preload = preload or os.environ.get("BOOKING_DEST_PRELOAD")
+        if preload:
+            self.load(preload)
+
+    def load(self, path, persist=True):
+        """
+        Merge entries from a JSON file.
+
+        The file maps city names to {"dest_id": ..., "search_type": ...},
+        or is a list of such objects each carrying a "city" field.
+        """
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            data = {item["city"]: item for item in data}
+        with self._lock:
+            for city, entry in data.items():
+                self._entries[normalize_city(city)] = {
+                    "dest_id": str(entry["dest_id"]),
+                    "search_type": entry["search_type"],
+                }
+        if persist:
+            self.save()
+
+    def save(self):
+        """Write the index atomically; concurrent saves take turns, the last one writes the latest entries."""
+        with self._write_lock:
+            with self._lock:
+                data = dict(self._entries)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                'w', dir=self.path.parent, prefix=self.path.name, suffix=".tmp", delete=False
+            ) as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            try:
+                os.replace(f.name, self.path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+
+    def lookup(self, query):
+        """Return (dest_id, search_type) for a city, or None if unknown."""
+        with self._lock:
+            entry = self._entries.get(normalize_city(query))
+        if entry is None:
+            return None
+        return entry["dest_id"], entry["search_type"]
+
+    def add(self, query, dest_id, search_type):
+        with self._lock:
+            self._entries[normalize_city(query)] = {
+                "dest_id": str(dest_id),
+                "search_type": search_type,
+            }
+        self.save()
+
+    def add_from_response(self, query, response_json):
+        """Record the best searchDestination match for a query and return it."""
+        data = (response_json or {}).get('data') or []
+        if not data:
+            return None
+        self.add(query, data[0]['dest_id'], data[0]['search_type'])
+        return str(data[0]['dest_id']), data[0]['search_type']
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_destination_index = None
+_destination_index_lock = threading.Lock()
+
+
+def get_destination_index():
+    """Return the process-wide Booking.com destination index."""
+    global _destination_index
+    if _destination_index is None:
+        with _destination_index_lock:
+            if _destination_index is None:
+                _destination_index = DestinationIndex()
+    return _destination_index
+
+
+def _booking_headers(rapidapi_key):
+    return {
         "X-RapidAPI-Key": rapidapi_key,
         "X-RapidAPI-Host": "booking-com15.p.rapidapi.com"
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+
+def _booking_results(response):
     # print(response.status_code)
     # print(response.json())
     if response.status_code != 200:
@@ -27,6 +139,50 @@ def search_booking_destination(
     return results
 
 
+def _hotel_querystring(dest_info, arrival_date, departure_date, adults, page_number, price_max):
+    return {
+        "dest_id": dest_info[0],
+        "search_type":dest_info[1],
+        "arrival_date": arrival_date,
+        "departure_date": departure_date,
+        "adults": str(adults),
+        "page_number": str(page_number),
+        "price_max":str(price_max)
+    }
+
+
+@cached("booking")
+def search_booking_destination(
+    query,
+    rapidapi_key=None
+):
+    querystring = {
+        "query": query,
+    }
+    headers = _booking_headers(rapidapi_key)
+
+    response = get_client().get("booking", "hotels/searchDestination", headers=headers, params=querystring)
+    return _booking_results(response)
+
+
+# Async variant of search_booking_destination
+@cached("booking")
+async def search_booking_destination_async(
+    query,
+    rapidapi_key=None
+):
+    querystring = {
+        "query": query,
+    }
+    headers = _booking_headers(rapidapi_key)
+
+    response = await get_async_client().get(
+        "booking", "hotels/searchDestination", headers=headers, params=querystring
+    )
+    return _booking_results(response)
+
+
+@cached("booking")
 def search_booking_hotel(
     query,
     arrival_date,
@@ -36,56 +192,67 @@ def search_booking_hotel(
     price_max,
     rapidapi_key=None
 ):
-    url = "https://booking-com15.p.rapidapi.com/api/v1/hotels/searchHotels"
-    response_json = search_booking_destination(query=query,rapidapi_key=rapidapi_key)
-    # Extracting dest_id and search_type from the JSON response
-    dest_info = [(item['dest_id'], item['search_type']) for item in response_json['data']]
-    # print(dest_info)
-    querystring = {
-        "dest_id": dest_info[0][0],
-        "search_type":dest_info[0][1],
-        "arrival_date": arrival_date,
-        "departure_date": departure_date,
-        "adults": str(adults),
-        "page_number": str(page_number),
-        "price_max":str(price_max)
-    }
-    headers = {
-        "X-RapidAPI-Key": rapidapi_key,
-        "X-RapidAPI-Host": "booking-com15.p.rapidapi.com"
-    }
-
-    response = requests.get(url, headers=headers, params=querystring)
-    # print(response.status_code)
-    # print(response.json())
-    if response.status_code != 200:
-        print(f"Error: {response.status_code}")
-        return None
+    index = get_destination_index()
+    dest_info = index.lookup(query)
+    if dest_info is None:
+        response_json = search_booking_destination(query=query,rapidapi_key=rapidapi_key)
+        dest_info = index.add_from_response(query, response_json)
+        if dest_info is None:
+            print(f"Error: no Booking.com destination found for {query}")
+            return None
+    querystring = _hotel_querystring(
+        dest_info, arrival_date, departure_date, adults, page_number, price_max
+    )
+    headers = _booking_headers(rapidapi_key)
 
-    results = response.json()
-    print(json.dumps(results, indent=4, sort_keys=True))
+    response = get_client().get("booking", "hotels/searchHotels", headers=headers, params=querystring)
+    results = _booking_results(response)
+    if results:
+        print(json.dumps(results, indent=4, sort_keys=True))
     return results
 
 
+# Async variant of search_booking_hotel
+@cached("booking")
+async def search_booking_hotel_async(
+    query,
+    arrival_date,
+    departure_date,
+    adults,
+    page_number,
+    price_max,
+    rapidapi_key=None
+):
+    index = get_destination_index()
+    dest_info = index.lookup(query)
+    if dest_info is None:
+        response_json = await search_booking_destination_async(query=query,rapidapi_key=rapidapi_key)
+        # add_from_response saves the index to disk
+        dest_info = await asyncio.to_thread(index.add_from_response, query, response_json)
+        if dest_info is None:
+            print(f"Error: no Booking.com destination found for {query}")
+            return None
+    querystring = _hotel_querystring(
+        dest_info, arrival_date, departure_date, adults, page_number, price_max
+    )
+    headers = _booking_headers(rapidapi_key)
+
+    response = await get_async_client().get(
+        "booking", "hotels/searchHotels", headers=headers, params=querystring
+    )
+    return _booking_results(response)
+
+
 
-def display_booking_results(response_json):
-    hotels = response_json.get('data', {}).get('hotels', [])
-    results = ""
-    if not hotels:
-        # print("No booking hotels found.")
-        results += "No booking hotels found."
-        return
+def display_booking_results(listings):
+    if not listings:
+        return "No booking hotels found."
     
-    # print(f"Found {len(hotels)} hotels:\n" + "="*60)
-    results += f"Found {len(hotels)} hotels:\n" + "="*60 + "\n"
+    results = f"Found {len(listings)} hotels:\n" + "="*60 + "\n"
     
-    for idx, item in enumerate(hotels, 1):
-        accessibilityLabel = item.get('accessibilityLabel', {})
-        # print(f"{idx}")
-        # print(f"   🛏️Detail: {accessibilityLabel}")
-        # print("-" * 60)
+    for idx, listing in enumerate(listings, 1):
         results += (f"{idx}\n")
-        results += (f"   🛏️Detail: {accessibilityLabel}\n")
+        results += (f"   🛏️Detail: {listing.label or listing.name}\n")
         results += ("-" * 60)
         results += "\n"
     
@@ -127,7 +294,7 @@ if __name__ == "__main__":
     
     # Display the results
     if results:
-        formatted_results = display_booking_results(results)
+        formatted_results = display_booking_results(parse_booking(results, checkin, checkout))
         print(formatted_results)
     else:
         print("No results found or an error occurred.")
@@ -153,7 +320,7 @@ if __name__ == "__main__":
     
     # Display the results
     if results:
-        formatted_results = display_booking_results(results)
+        formatted_results = display_booking_results(parse_booking(results, checkin, checkout))
         print(formatted_results)
     else:
         print("No results found or an error occurred.")
@@ -0,0 +1,318 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import inspect
+import threading
+import functools
+import weakref
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from api.singleflight import SingleFlight, AsyncSingleFlight
+from api.circuit import ProviderUnavailable
+from api.metrics import note_cache
+
+# How long a cached response stays fresh, in seconds, per provider.
+# Attraction/place data changes rarely; prices and availability change fast.
+DEFAULT_TTLS = {
+    "tripadvisor": 3 * 24 * 3600,
+    "google_maps": 24 * 3600,
+    "yelp": 24 * 3600,
+    "airbnb": 15 * 60,
+    "booking": 15 * 60,
+}
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "api_responses.sqlite3"
+
+# Keys looked up per query by get_many, well under SQLite's limit on bound parameters
+KEYS_PER_QUERY = 500
+
+# Arguments that carry credentials and must never become part of a cache key
+SECRET_PARAMS = {"key", "api_key", "rapidapi_key", "yelp_api_key"}
+
+
+def _normalize(value: Any) -> Any:
+    """Normalize a parameter value so equivalent requests produce the same key."""
+    if isinstance(value, dict):
+        return {
+            str(k): _normalize(v)
+            for k, v in sorted(value.items())
+            if v is not None and k not in SECRET_PARAMS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return str(value)
+
+
+def make_key(provider: str, endpoint: str, params: Dict[str, Any]) -> str:
+    """Build the cache key for a (provider, endpoint, params) request."""
+    payload = json.dumps([provider, endpoint.strip("/"), _normalize(params)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of provider responses that survives restarts.
+
+    Entries are keyed by the normalized (provider, endpoint, params) of the
+    request and expire after the provider's TTL.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttls: Optional[Dict[str, int]] = None):
+        self.path = Path(path or os.environ.get("API_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        self.ttls = dict(DEFAULT_TTLS)
+        for provider in self.ttls:
+            env_ttl = os.environ.get(f"API_CACHE_TTL_{provider.upper()}")
+            if env_ttl:
+                self.ttls[provider] = int(env_ttl)
+        if ttls:
+            self.ttls.update(ttls)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires_at)")
+        self._conn.commit()
+
+    def get(
+        self,
+        provider: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        allow_stale: bool = False
+    ) -> Optional[Any]:
+        """Return the cached response, or None if missing or (unless allow_stale) expired."""
+        key = make_key(provider, endpoint, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[1] < time.time() and not allow_stale):
+            return None
+        return json.loads(row[0])
+
+    def set(
+        self,
+        provider: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        value: Any,
+        ttl: Optional[int] = None
+    ):
+        """Store a response for the provider's TTL (or the given ttl in seconds)."""
+        key = make_key(provider, endpoint, params)
+        now = time.time()
+        ttl = self.ttls.get(provider, 3600) if ttl is None else ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, endpoint, json.dumps(value), now, now + ttl)
+            )
+            self._conn.commit()
+
+    def get_many(
+        self,
+        provider: str,
+        endpoint: str,
+        params_list: List[Dict[str, Any]]
+    ) -> List[Optional[Any]]:
+        """Like get for several requests of one endpoint, in one query per KEYS_PER_QUERY keys."""
+        keys = [make_key(provider, endpoint, params) for params in params_list]
+        rows = {}
+        with self._lock:
+            for start in range(0, len(keys), KEYS_PER_QUERY):
+                chunk = keys[start:start + KEYS_PER_QUERY]
+                rows.update(
+                    (key, (value, expires_at)) for key, value, expires_at in self._conn.execute(
+                        f"SELECT key, value, expires_at FROM responses WHERE key IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    )
+                )
+        now = time.time()
+        return [
+            json.loads(rows[key][0]) if key in rows and rows[key][1] >= now else None
+            for key in keys
+        ]
+
+    def set_many(
+        self,
+        provider: str,
+        endpoint: str,
+        items: List[Tuple[Dict[str, Any], Any]],
+        ttl: Optional[int] = None
+    ):
+        """Like set for several (params, value) pairs of one endpoint, in one transaction."""
+        now = time.time()
+        ttl = self.ttls.get(provider, 3600) if ttl is None else ttl
+        rows = [
+            (make_key(provider, endpoint, params), provider, endpoint, json.dumps(value), now, now + ttl)
+            for params, value in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self, provider: Optional[str] = None):
+        """Delete all entries, or only those of one provider."""
+        with self._lock:
+            if provider:
+                self._conn.execute("DELETE FROM responses WHERE provider = ?", (provider,))
+            else:
+                self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("API_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def get_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+# Identical requests already in flight, shared by every manager and session
+_flights = SingleFlight()
+_async_flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSingleFlight]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _async_flight() -> AsyncSingleFlight:
+    loop = asyncio.get_running_loop()
+    flight = _async_flights.get(loop)
+    if flight is None:
+        flight = _async_flights[loop] = AsyncSingleFlight()
+    return flight
+
+
+def coalescing_stats() -> Dict[str, int]:
+    """How many upstream calls ran and how many callers shared one already in flight."""
+    stats = _flights.stats()
+    for flight in list(_async_flights.values()):
+        for name, value in flight.stats().items():
+            stats[name] += value
+    return stats
+
+
+def cached(provider: str, cacheable: Optional[Callable[[Any], bool]] = None):
+    """
+    Decorator that serves an api/ function from the response cache.
+
+    The function's arguments (minus credentials) form the request params and
+    its name the endpoint; an `_async` variant shares entries with its sync
+    twin. Empty results are never cached, and `cacheable` can reject
+    responses that carry a provider-level error. On a cache miss, concurrent
+    identical calls are coalesced so only one reaches the provider. When
+    the provider's circuit is open, an expired entry is served instead of
+    failing, if one is still on disk.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        endpoint = func.__name__
+        if endpoint.endswith("_async"):
+            endpoint = endpoint[:-len("_async")]
+
+        def request_params(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return _normalize(dict(bound.arguments))
+
+        def store(params, result):
+            if result and (cacheable is None or cacheable(result)):
+                get_cache().set(provider, endpoint, params, result)
+
+        def stale(params, error):
+            result = get_cache().get(provider, endpoint, params, allow_stale=True)
+            if result is None:
+                raise error
+            note_cache("response", "stale")
+            return result
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                params = request_params(args, kwargs)
+                flight_key = make_key(provider, endpoint, params)
+                if not cache_enabled():
+                    return await _async_flight().do(flight_key, lambda: func(*args, **kwargs))
+                # The cache is sqlite; its reads and writes stay off the event loop
+                result = await asyncio.to_thread(get_cache().get, provider, endpoint, params)
+                note_cache("response", "miss" if result is None else "hit")
+                if result is not None:
+                    return result
+
+                async def fetch():
+                    try:
+                        result = await func(*args, **kwargs)
+                    except ProviderUnavailable as e:
+                        return await asyncio.to_thread(stale, params, e)
+                    await asyncio.to_thread(store, params, result)
+                    return result
+
+                return await _async_flight().do(flight_key, fetch)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            params = request_params(args, kwargs)
+            flight_key = make_key(provider, endpoint, params)
+            if not cache_enabled():
+                return _flights.do(flight_key, lambda: func(*args, **kwargs))
+            result = get_cache().get(provider, endpoint, params)
+            note_cache("response", "miss" if result is None else "hit")
+            if result is not None:
+                return result
+
+            def fetch():
+                try:
+                    result = func(*args, **kwargs)
+                except ProviderUnavailable as e:
+                    return stale(params, e)
+                store(params, result)
+                return result
+
+            return _flights.do(flight_key, fetch)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,422 @@
+import os
+import time
+import asyncio
+import threading
+import weakref
+from typing import Dict, Any, Optional, Tuple, Union
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, EmptyPoolError
+from api.ratelimit import get_limiter, get_retry_policy, retryable, RETRY_STATUSES
+from api.circuit import get_breaker
+from api.metrics import note_http, note_error
+from api.tracing import span, KIND_CLIENT
+
+# Base URL of every provider the planner talks to
+PROVIDERS = {
+    "google_maps": "https://maps.googleapis.com/maps/api/",
+    "tripadvisor": "https://api.content.tripadvisor.com/api/v1/",
+    "yelp": "https://api.yelp.com/",
+    "airbnb": "https://airbnb19.p.rapidapi.com/api/v1/",
+    "booking": "https://booking-com15.p.rapidapi.com/api/v1/",
+}
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+# Transport failures: retried, and counted against the provider's circuit breaker
+SYNC_TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout)
+ASYNC_TRANSPORT_ERRORS = (httpx.NetworkError, httpx.TimeoutException, httpx.RemoteProtocolError)
+
+# Of those, failures to connect at all; anything else (a read timeout, a
+# connection dropped mid-response) may come after the provider got the
+# request, so is retried only for idempotent methods.
+# urllib3's NewConnectionError (refused, DNS) is a ConnectTimeoutError.
+ASYNC_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _connect_failed(error: BaseException) -> bool:
+    """Whether a requests error happened before the request was sent."""
+    seen, pending = set(), [error]
+    while pending:
+        error = pending.pop()
+        if error is None or id(error) in seen:
+            continue
+        seen.add(id(error))
+        if isinstance(error, (requests.ConnectTimeout, ConnectTimeoutError, EmptyPoolError)):
+            return True
+        # requests wraps urllib3's MaxRetryError, whose reason is the underlying failure
+        pending += [getattr(error, "reason", None), error.__cause__, error.__context__]
+        pending += [arg for arg in getattr(error, "args", ()) if isinstance(arg, BaseException)]
+    return False
+
+
+def base_url(provider: str) -> str:
+    """
+    Base URL of a provider.
+
+    <PROVIDER>_BASE_URL overrides one provider; API_STUB_URL sends every
+    provider to a local stand-in server (see stub_server.py).
+    """
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider: {provider}")
+    override = os.environ.get(f"{provider.upper()}_BASE_URL")
+    if override:
+        return override.rstrip("/") + "/"
+    stub = os.environ.get("API_STUB_URL")
+    if stub:
+        return f"{stub.rstrip('/')}/{provider}/"
+    return PROVIDERS[provider]
+
+
+def openai_base_url() -> Optional[str]:
+    """OpenAI base URL override (OPENAI_BASE_URL or the stand-in server), or None for the live API."""
+    override = os.environ.get("OPENAI_BASE_URL")
+    if override:
+        return override
+    stub = os.environ.get("API_STUB_URL")
+    if stub:
+        return f"{stub.rstrip('/')}/openai/v1"
+    return None
+
+
+def provider_url(provider: str, path: str) -> str:
+    """Join a provider-relative path onto the provider's base URL."""
+    return f"{base_url(provider)}{path.lstrip('/')}"
+
+
+def _env_number(name: str, default, cast=float):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return cast(value)
+
+
+class ProviderClient:
+    """
+    Keeps one pooled keep-alive session per provider host.
+
+    Every api/ module goes through the same client so repeated calls to the
+    same host reuse an open TCP+TLS connection instead of paying a new
+    handshake on each tool call.
+    """
+
+    def __init__(
+        self,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+    ):
+        self.pool_connections = pool_connections or _env_number(
+            "API_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS, int)
+        self.pool_maxsize = pool_maxsize or _env_number(
+            "API_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE, int)
+        self.timeout = (
+            connect_timeout or _env_number("API_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+            read_timeout or _env_number("API_READ_TIMEOUT", DEFAULT_READ_TIMEOUT),
+        )
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def session(self, provider: str) -> requests.Session:
+        """Return the pooled session for a provider, creating it on first use."""
+        session = self._sessions.get(provider)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[provider] = session
+            return session
+
+    def request(
+        self,
+        provider: str,
+        method: str,
+        path: str,
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        **kwargs: Any
+    ) -> requests.Response:
+        """
+        Send a request to a provider over its pooled session.
+
+        Requests wait for the provider's rate limiter, and 429s and connection
+        failures are retried with jittered exponential backoff (honoring
+        Retry-After); 5xx responses, timeouts and connections lost after
+        sending only for idempotent methods. No retry starts past
+        API_RETRY_MAX_ELAPSED seconds, and the last response is returned
+        once retries run out. A request that still fails to connect, times
+        out or gets a 5xx counts against the provider's circuit breaker (a
+        429 does not); while the circuit is open, calls raise
+        ProviderUnavailable without touching the network.
+
+        Args:
+            provider: Provider name (a key of PROVIDERS)
+            method: HTTP method
+            path: Path relative to the provider's base URL
+            timeout: Optional override of the (connect, read) timeout
+            **kwargs: Passed through to requests (params, headers, json, data)
+
+        Returns:
+            The requests.Response
+        """
+        breaker = get_breaker(provider)
+        with span("http.request", kind=KIND_CLIENT, provider=provider, method=method, path=path) as http_span:
+            try:
+                breaker.allow()
+            except Exception as e:
+                note_error(e)
+                raise
+            try:
+                response = self._send(provider, method, path, timeout, **kwargs)
+            except SYNC_TRANSPORT_ERRORS as e:
+                breaker.record_failure()
+                note_error(e)
+                raise
+            except BaseException as e:
+                breaker.release()
+                note_error(e)
+                raise
+            http_span.set("status_code", response.status_code)
+            note_http(provider, response.status_code)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            elif response.status_code == 429:
+                # Quota pushback, already paced by the rate limiter and Retry-After
+                breaker.release()
+            else:
+                breaker.record_success()
+            return response
+
+    def _send(self, provider, method, path, timeout, **kwargs) -> requests.Response:
+        limiter, policy = get_limiter(provider), get_retry_policy()
+        started = time.monotonic()
+        for attempt in range(policy.max_retries + 1):
+            limiter.acquire()
+            try:
+                response = self.session(provider).request(
+                    method,
+                    provider_url(provider, path),
+                    timeout=timeout or self.timeout,
+                    **kwargs
+                )
+            except SYNC_TRANSPORT_ERRORS as e:
+                connect_error = _connect_failed(e)
+                delay = policy.delay(attempt)
+                if not (retryable(method, connect_error=connect_error) and policy.allows(attempt, started, delay)):
+                    raise
+                time.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                if response.status_code < 400:
+                    limiter.succeed()
+                return response
+
+            delay = policy.delay(attempt, response.headers.get("Retry-After"))
+            if response.status_code == 429:
+                limiter.throttle(delay)
+            if not (retryable(method, response.status_code) and policy.allows(attempt, started, delay)):
+                return response
+            time.sleep(delay)
+
+    def get(self, provider: str, path: str, **kwargs: Any) -> requests.Response:
+        return self.request(provider, "GET", path, **kwargs)
+
+    def post(self, provider: str, path: str, **kwargs: Any) -> requests.Response:
+        return self.request(provider, "POST", path, **kwargs)
+
+    def close(self):
+        """Close every pooled session."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_client: Optional[ProviderClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ProviderClient:
+    """Return the process-wide provider client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ProviderClient()
+    return _client
+
+
+def configure_client(**kwargs: Any) -> ProviderClient:
+    """Replace the process-wide client with one built from the given pool/timeout settings."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = ProviderClient(**kwargs)
+    return _client
+
+
+class AsyncProviderClient:
+    """
+    Non-blocking counterpart of ProviderClient built on httpx.
+
+    Holds one pooled httpx.AsyncClient per provider so many provider calls
+    can be in flight at once on a single event loop. An instance is bound
+    to the event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_keepalive_connections=pool_connections or _env_number(
+                "API_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS, int),
+            max_connections=pool_maxsize or _env_number(
+                "API_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE, int),
+        )
+        self.timeout = httpx.Timeout(
+            read_timeout or _env_number("API_READ_TIMEOUT", DEFAULT_READ_TIMEOUT),
+            connect=connect_timeout or _env_number("API_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+        )
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def session(self, provider: str) -> httpx.AsyncClient:
+        """Return the pooled async client for a provider, creating it on first use."""
+        client = self._clients.get(provider)
+        if client is None:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            self._clients[provider] = client
+        return client
+
+    async def request(
+        self,
+        provider: str,
+        method: str,
+        path: str,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Send a request to a provider without blocking the event loop.
+
+        Applies the same rate limiting, retry schedule and circuit breaker
+        as ProviderClient.
+
+        Args:
+            provider: Provider name (a key of PROVIDERS)
+            method: HTTP method
+            path: Path relative to the provider's base URL
+            timeout: Optional override of the client timeout
+            **kwargs: Passed through to httpx (params, headers, json, content)
+
+        Returns:
+            The httpx.Response
+        """
+        breaker = get_breaker(provider)
+        with span("http.request", kind=KIND_CLIENT, provider=provider, method=method, path=path) as http_span:
+            try:
+                breaker.allow()
+            except Exception as e:
+                note_error(e)
+                raise
+            try:
+                response = await self._send(provider, method, path, timeout, **kwargs)
+            except ASYNC_TRANSPORT_ERRORS as e:
+                breaker.record_failure()
+                note_error(e)
+                raise
+            except BaseException as e:
+                breaker.release()
+                note_error(e)
+                raise
+            http_span.set("status_code", response.status_code)
+            note_http(provider, response.status_code)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            elif response.status_code == 429:
+                # Quota pushback, already paced by the rate limiter and Retry-After
+                breaker.release()
+            else:
+                breaker.record_success()
+            return response
+
+    async def _send(self, provider, method, path, timeout, **kwargs) -> httpx.Response:
+        limiter, policy = get_limiter(provider), get_retry_policy()
+        started = time.monotonic()
+        for attempt in range(policy.max_retries + 1):
+            wait = limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                response = await self.session(provider).request(
+                    method,
+                    provider_url(provider, path),
+                    timeout=timeout or self.timeout,
+                    **kwargs
+                )
+            except ASYNC_TRANSPORT_ERRORS as e:
+                connect_error = isinstance(e, ASYNC_CONNECT_ERRORS)
+                delay = policy.delay(attempt)
+                if not (retryable(method, connect_error=connect_error) and policy.allows(attempt, started, delay)):
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                if response.status_code < 400:
+                    limiter.succeed()
+                return response
+
+            delay = policy.delay(attempt, response.headers.get("Retry-After"))
+            if response.status_code == 429:
+                limiter.throttle(delay)
+            if not (retryable(method, response.status_code) and policy.allows(attempt, started, delay)):
+                return response
+            await asyncio.sleep(delay)
+
+    async def get(self, provider: str, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request(provider, "GET", path, **kwargs)
+
+    async def post(self, provider: str, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request(provider, "POST", path, **kwargs)
+
+    async def aclose(self):
+        """Close every pooled async client."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+# httpx clients cannot be shared across event loops, so keep one per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncProviderClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_client() -> AsyncProviderClient:
+    """Return the async provider client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncProviderClient()
+        _async_clients[loop] = client
+    return client
@@ -0,0 +1,211 @@
+import os
+import re
+import html
+import json
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+from api.records import Attraction, Restaurant, Listing, Hotel, Route
+
+# Output modes of the tool formatters
+VERBOSE = "verbose"
+COMPACT = "compact"
+
+# Token budget of one compact tool result, unless TOOL_TOKEN_BUDGET(_<TOOL>) says otherwise
+DEFAULT_TOKEN_BUDGET = 600
+
+# Longest free-text cell (descriptions, summaries) in compact results
+DESCRIPTION_CHARS = 160
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+
+def output_mode() -> str:
+    """Formatter mode from TOOL_OUTPUT_MODE ("verbose", the default, or "compact")."""
+    mode = os.environ.get("TOOL_OUTPUT_MODE", VERBOSE).strip().lower()
+    return COMPACT if mode == COMPACT else VERBOSE
+
+
+def token_budget(tool: str) -> int:
+    """Token budget of a tool's compact result: TOOL_TOKEN_BUDGET_<TOOL>, else TOOL_TOKEN_BUDGET."""
+    value = os.environ.get(f"TOOL_TOKEN_BUDGET_{tool.upper()}") or os.environ.get("TOOL_TOKEN_BUDGET")
+    return int(value) if value else DEFAULT_TOKEN_BUDGET
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def strip_html(text: Optional[str]) -> str:
+    """Plain text of an HTML fragment such as a directions step."""
+    if not text:
+        return ""
+    # Block-level tags start a new clause in Google's instructions
+    text = re.sub(r"<div[^>]*>", "; ", text)
+    return _SPACE.sub(" ", html.unescape(_TAG.sub("", text))).strip()
+
+
+def truncate(text: Any, limit: int = DESCRIPTION_CHARS) -> str:
+    text = _SPACE.sub(" ", str(text or "")).strip()
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        value = f"{value:g}"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def table(columns: Sequence[str], rows: List[Sequence[Any]], budget: int, title: str = "") -> str:
+    """
+    Render rows as a pipe-separated table that fits a token budget.
+
+    The title and header always stay; rows are dropped from the end (the
+    formatters pass them best first) until the rest fits, and a last line
+    says how many were left out.
+    """
+    lines = [title] if title else []
+    lines.append("|".join(columns))
+    used = estimate_tokens("\n".join(lines))
+    kept = 0
+    for row in rows:
+        line = "|".join(_cell(v) for v in row)
+        cost = estimate_tokens(line)
+        if used + cost > budget and kept:
+            break
+        lines.append(line)
+        used += cost
+        kept += 1
+    if kept < len(rows):
+        lines.append(f"(+{len(rows) - kept} more omitted)")
+    return "\n".join(lines)
+
+
+def compact_attractions(attractions: List[Attraction], budget: int) -> str:
+    rows = [[a.location_id, a.name, a.category] for a in attractions]
+    return table(["id", "name", "category"], rows, budget)
+
+
+def compact_location_details(attraction: Attraction, location_id: Any = None) -> Dict[str, Any]:
+    """Projected TripAdvisor details: empty fields dropped, description truncated."""
+    details = {
+        'location_id': location_id,
+        'name': attraction.name,
+        'rating': attraction.rating,
+        'reviews': attraction.num_reviews,
+        'price': attraction.price_level,
+        'address': attraction.address,
+        'hours': "; ".join(attraction.hours or []) or None,
+        'description': truncate(attraction.description) or None,
+    }
+    return {k: v for k, v in details.items() if v not in (None, '')}
+
+
+def compact_directions(route: Route, budget: int) -> str:
+    leg = route.legs[0]
+    rows = [[strip_html(step.instruction), step.distance_text, step.duration_text] for step in leg.steps]
+    title = f"{leg.distance_text}, {leg.duration_text}"
+    return table(["step", "dist", "time"], rows, budget, title=title)
+
+
+def compact_hotels(hotels: List[Hotel], budget: int) -> str:
+    rows = [
+        [
+            hotel.name,
+            ",".join(hotel.sources),
+            f"{hotel.price_per_night:.0f}" if hotel.price_per_night is not None else None,
+            hotel.rating,
+            hotel.reviews,
+            hotel.room_type,
+            hotel.url,
+        ]
+        for hotel in hotels
+    ]
+    return table(["name", "source", "usd_night", "rating", "reviews", "type", "url"], rows, budget)
+
+
+def compact_airbnb(listings: List[Listing], budget: int) -> str:
+    if not listings:
+        return "No airbnb listings found."
+    rows = [
+        [listing.name, listing.address, listing.price_per_night, listing.label, listing.room_type, listing.url]
+        for listing in listings
+    ]
+    return table(["name", "city", "usd_night", "rating", "type", "url"], rows, budget)
+
+
+def compact_booking(listings: List[Listing], budget: int) -> str:
+    if not listings:
+        return "No booking hotels found."
+    rows = [[listing.name, listing.price_per_night, listing.rating, listing.reviews] for listing in listings]
+    return table(["name", "usd_night", "rating", "reviews"], rows, budget)
+
+
+def compact_restaurants(restaurants: List[Restaurant], intro: Optional[str], budget: int) -> str:
+    if not restaurants:
+        return "No businesses found."
+    rows = [
+        [
+            r.name,
+            r.rating,
+            r.review_count,
+            r.price,
+            ",".join(r.categories),
+            r.address,
+            truncate(r.summary or r.specialties, 100),
+        ]
+        for r in restaurants
+    ]
+    return table(
+        ["name", "rating", "reviews", "price", "categories", "address", "summary"], rows, budget,
+        title=truncate(intro)
+    )
+
+
+def compact_nearby(places: List[Dict[str, Any]], budget: int) -> str:
+    rows = [[p['name'], p['kind'], p['distance_m'], p['address']] for p in places]
+    return table(["name", "kind", "distance_m", "address"], rows, budget)
+
+
+def _dump(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _shrink(record: Dict[str, Any], budget: int) -> Dict[str, Any]:
+    """Halve the record's longest text field until it fits the budget (or no text is left to cut)."""
+    record = dict(record)
+    while estimate_tokens(_dump(record)) > budget:
+        texts = [k for k, v in record.items() if isinstance(v, str) and len(v) > 20]
+        if not texts:
+            break
+        longest = max(texts, key=lambda k: len(record[k]))
+        record[longest] = truncate(record[longest], len(record[longest]) // 2)
+    return record
+
+
+def compact_json(items: Union[Dict[str, Any], List[Dict[str, Any]]], budget: int) -> str:
+    """
+    Dump records without whitespace within a token budget.
+
+    A single record is dumped as an object, a list as an array. Over
+    budget, descriptions go first, then records from the end; a record
+    still over budget on its own has its longest text fields cut.
+    """
+    single = isinstance(items, dict)
+    records = [items] if single else list(items)
+    shape = (lambda kept: kept[0]) if single else (lambda kept: kept)
+    text = _dump(shape(records))
+    if estimate_tokens(text) <= budget:
+        return text
+    records = [{k: v for k, v in record.items() if k != 'description'} for record in records]
+    if single:
+        return _dump(_shrink(records[0], budget))
+    for kept in range(len(records), 0, -1):
+        text = _dump(records[:kept] + ([{'omitted': len(records) - kept}] if kept < len(records) else []))
+        if estimate_tokens(text) <= budget:
+            return text
+    omitted = [{'omitted': len(records) - 1}] if len(records) > 1 else []
+    return _dump([_shrink(records[0], budget - estimate_tokens(_dump(omitted)))] + omitted)
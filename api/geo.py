@@ -0,0 +1,259 @@
+import os
+import re
+import math
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+DEFAULT_GEO_PATH = Path(__file__).resolve().parent.parent / ".cache" / "geo.sqlite3"
+
+# Geohash precision of the index buckets (~0.6 km x 1.2 km cells)
+INDEX_PRECISION = 6
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_EARTH_RADIUS_M = 6371000
+
+
+def geohash(lat: float, lng: float, precision: int = INDEX_PRECISION) -> str:
+    """Encode a coordinate as a geohash string."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    """(lat, lng) size in degrees of a geohash cell."""
+    lat_bits = (5 * precision) // 2
+    lng_bits = 5 * precision - lat_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def parse_lat_lng(text: str) -> Optional[Tuple[float, float]]:
+    """Parse a 'lat,lng' string, or return None if it is an address."""
+    match = re.fullmatch(r"\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*", text or "")
+    if not match:
+        return None
+    lat, lng = float(match.group(1)), float(match.group(2))
+    if -90 <= lat <= 90 and -180 <= lng <= 180:
+        return lat, lng
+    return None
+
+
+def normalize_address(address: str) -> str:
+    return " ".join((address or "").casefold().replace(",", " , ").split())
+
+
+class SpatialIndex:
+    """
+    In-memory geohash-bucketed index of places.
+
+    Radius queries only scan the buckets overlapping the search circle,
+    so "what is near X" is answered without any network call.
+    """
+
+    def __init__(self, precision: int = INDEX_PRECISION):
+        self.precision = precision
+        self._buckets: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._places: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, place: Dict[str, Any]):
+        """Insert or replace a place; it needs 'id', 'lat' and 'lng'."""
+        cell = geohash(place['lat'], place['lng'], self.precision)
+        with self._lock:
+            old = self._places.get(place['id'])
+            if old is not None:
+                self._buckets.get(old['_cell'], {}).pop(place['id'], None)
+            place = dict(place, _cell=cell)
+            self._places[place['id']] = place
+            self._buckets.setdefault(cell, {})[place['id']] = place
+
+    def _cells_around(self, lat: float, lng: float, radius_m: float) -> List[str]:
+        lat_size, lng_size = _cell_size(self.precision)
+        dlat = math.degrees(radius_m / _EARTH_RADIUS_M)
+        dlng = math.degrees(radius_m / (_EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 1e-6)))
+        cells = set()
+        # Step at half a cell so every overlapping cell is sampled at least once
+        steps_lat = int(2 * dlat / (lat_size / 2)) + 2
+        steps_lng = int(2 * dlng / (lng_size / 2)) + 2
+        for a in range(steps_lat + 1):
+            sample_lat = max(min(lat - dlat + a * lat_size / 2, 90.0), -90.0)
+            for b in range(steps_lng + 1):
+                sample_lng = (lng - dlng + b * lng_size / 2 + 180.0) % 360.0 - 180.0
+                cells.add(geohash(sample_lat, sample_lng, self.precision))
+        return list(cells)
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: float = 1000,
+        kind: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Places within radius_m of (lat, lng), nearest first, with a distance_m field."""
+        lat_size, lng_size = _cell_size(self.precision)
+        approx_cells = (radius_m / 111000 / lat_size + 1) * (radius_m / 111000 / lng_size + 1) * 4
+        with self._lock:
+            if approx_cells > len(self._places):
+                candidates = list(self._places.values())
+            else:
+                candidates = [
+                    place
+                    for cell in self._cells_around(lat, lng, radius_m)
+                    for place in self._buckets.get(cell, {}).values()
+                ]
+
+        results = []
+        for place in candidates:
+            if kind and place.get('kind') != kind:
+                continue
+            distance = haversine_m(lat, lng, place['lat'], place['lng'])
+            if distance <= radius_m:
+                result = {k: v for k, v in place.items() if k != '_cell'}
+                result['distance_m'] = round(distance)
+                results.append(result)
+        results.sort(key=lambda p: p['distance_m'])
+        return results[:limit]
+
+    def __len__(self):
+        return len(self._places)
+
+
+class GeoStore:
+    """
+    Persistent geocode cache plus the spatial index of every resolved place.
+
+    Geocoded addresses and places are written to SQLite so the index is
+    rebuilt from disk on startup; coordinates do not expire.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.environ.get("GEO_CACHE_PATH") or DEFAULT_GEO_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.index = SpatialIndex()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocodes (
+                address_key TEXT PRIMARY KEY,
+                address TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lng REAL NOT NULL,
+                formatted_address TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS places (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                kind TEXT,
+                source TEXT,
+                address TEXT,
+                lat REAL NOT NULL,
+                lng REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        for row in self._conn.execute("SELECT id, name, kind, source, address, lat, lng FROM places"):
+            self.index.add(dict(zip(("id", "name", "kind", "source", "address", "lat", "lng"), row)))
+
+    def get_geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        """Cached (lat, lng) of an address, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lat, lng FROM geocodes WHERE address_key = ?", (normalize_address(address),)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set_geocode(self, address: str, lat: float, lng: float, formatted_address: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_address(address), address, lat, lng, formatted_address, time.time())
+            )
+            self._conn.commit()
+
+    def add_place(
+        self,
+        place_id: str,
+        name: str,
+        lat: Optional[float],
+        lng: Optional[float],
+        kind: Optional[str] = None,
+        source: Optional[str] = None,
+        address: Optional[str] = None,
+        geocode: bool = False
+    ):
+        """
+        Record a resolved place; places without coordinates are ignored.
+
+        With geocode=True the address is also cached as a geocode of the
+        place's coordinates. Only pass it for full street addresses: listing
+        cities or partial vicinities would repoint the geocode of a whole area.
+        """
+        if lat is None or lng is None:
+            return
+        place = {
+            "id": str(place_id), "name": name, "kind": kind, "source": source,
+            "address": address, "lat": float(lat), "lng": float(lng),
+        }
+        self.index.add(place)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (place["id"], name, kind, source, address, place["lat"], place["lng"], time.time())
+            )
+            self._conn.commit()
+        if address and geocode:
+            self.set_geocode(address, place["lat"], place["lng"])
+
+    def nearby(self, lat: float, lng: float, radius_m: float = 1000, kind: Optional[str] = None, limit: int = 10):
+        return self.index.nearby(lat, lng, radius_m, kind, limit)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[GeoStore] = None
+_store_lock = threading.Lock()
+
+
+def get_geo_store() -> GeoStore:
+    """Return the process-wide geocode cache and place index."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = GeoStore()
+    return _store
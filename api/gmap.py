@@ -1,7 +1,29 @@
 import os
-import requests
+import asyncio
+from api.client import get_client, get_async_client
+from api.cache import cached, cache_enabled, get_cache
 from typing import Dict, Any, Optional, List, Tuple
 
+# Distance Matrix request limits: origins and destinations per request, elements per request
+MATRIX_MAX_SIDE = 25
+MATRIX_MAX_ELEMENTS = 100
+
+def _with_api_key(params: Dict[str, Any], api_key: Optional[str]) -> Dict[str, Any]:
+    """Add the Google Maps API key to the request parameters."""
+    # Use provided API key or get from environment
+    if api_key is None:
+        api_key = os.environ.get("GOOGLE_MAPS_API_KEY")
+        if not api_key:
+            raise ValueError("Google Maps API key not provided and not found in environment variables")
+    
+    # Add API key to parameters
+    params["key"] = api_key
+    return params
+
+def _is_cacheable(result: Dict[str, Any]) -> bool:
+    return result.get("status") in ("OK", "ZERO_RESULTS")
+
+@cached("google_maps", cacheable=_is_cacheable)
 def call_google_maps_api(
     endpoint: str,
     params: Dict[str, Any],
@@ -18,19 +40,10 @@ def call_google_maps_api(
     Returns:
         JSON response from the Google Maps API as a dictionary
     """
-    base_url = "https://maps.googleapis.com/maps/api/"
-    
-    # Use provided API key or get from environment
-    if api_key is None:
-        api_key = os.environ.get("GOOGLE_MAPS_API_KEY")
-        if not api_key:
-            raise ValueError("Google Maps API key not provided and not found in environment variables")
-    
-    # Add API key to parameters
-    params["key"] = api_key
+    params = _with_api_key(params, api_key)
     
     # Make the request
-    response = requests.get(f"{base_url}{endpoint}", params=params)
+    response = get_client().get("google_maps", endpoint, params=params)
     
     # Check if the request was successful
     response.raise_for_status()
@@ -38,6 +51,18 @@ def call_google_maps_api(
     # Return the JSON response
     return response.json()
 
+@cached("google_maps", cacheable=_is_cacheable)
+async def call_google_maps_api_async(
+    endpoint: str,
+    params: Dict[str, Any],
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of call_google_maps_api."""
+    params = _with_api_key(params, api_key)
+    response = await get_async_client().get("google_maps", endpoint, params=params)
+    response.raise_for_status()
+    return response.json()
+
 def geocode_address(address: str, api_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Geocode an address to get its coordinates.
@@ -55,6 +80,26 @@ def geocode_address(address: str, api_key: Optional[str] = None) -> Dict[str, An
     
     return call_google_maps_api("geocode/json", params, api_key)
 
+async def geocode_address_async(address: str, api_key: Optional[str] = None) -> Dict[str, Any]:
+    """Async variant of geocode_address."""
+    params = {
+        "address": address
+    }
+    
+    return await call_google_maps_api_async("geocode/json", params, api_key)
+
+def _directions_params(origin, destination, mode, waypoints):
+    params = {
+        "origin": origin,
+        "destination": destination,
+        "mode": mode
+    }
+    
+    if waypoints:
+        params["waypoints"] = "|".join(waypoints)
+    
+    return params
+
 def get_directions(
     origin: str,
     destination: str,
@@ -75,16 +120,33 @@ def get_directions(
     Returns:
         Directions results
     """
+    params = _directions_params(origin, destination, mode, waypoints)
+    return call_google_maps_api("directions/json", params, api_key)
+
+async def get_directions_async(
+    origin: str,
+    destination: str,
+    mode: str = "driving",
+    waypoints: Optional[List[str]] = None,
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of get_directions."""
+    params = _directions_params(origin, destination, mode, waypoints)
+    return await call_google_maps_api_async("directions/json", params, api_key)
+
+def _places_params(location, radius, type, keyword):
     params = {
-        "origin": origin,
-        "destination": destination,
-        "mode": mode
+        "location": location,
+        "radius": radius
     }
     
-    if waypoints:
-        params["waypoints"] = "|".join(waypoints)
+    if type:
+        params["type"] = type
     
-    return call_google_maps_api("directions/json", params, api_key)
+    if keyword:
+        params["keyword"] = keyword
+    
+    return params
 
 def search_places(
     location: str,
@@ -106,18 +168,29 @@ def search_places(
     Returns:
         Nearby places search results
     """
+    params = _places_params(location, radius, type, keyword)
+    return call_google_maps_api("place/nearbysearch/json", params, api_key)
+
+async def search_places_async(
+    location: str,
+    radius: int = 1500,
+    type: Optional[str] = None,
+    keyword: Optional[str] = None,
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of search_places."""
+    params = _places_params(location, radius, type, keyword)
+    return await call_google_maps_api_async("place/nearbysearch/json", params, api_key)
+
+def _place_details_params(place_id, fields):
     params = {
-        "location": location,
-        "radius": radius
+        "place_id": place_id
     }
     
-    if type:
-        params["type"] = type
-    
-    if keyword:
-        params["keyword"] = keyword
+    if fields:
+        params["fields"] = ",".join(fields)
     
-    return call_google_maps_api("place/nearbysearch/json", params, api_key)
+    return params
 
 def get_place_details(
     place_id: str,
@@ -135,14 +208,205 @@ def get_place_details(
     Returns:
         Detailed information about the place
     """
-    params = {
-        "place_id": place_id
+    params = _place_details_params(place_id, fields)
+    return call_google_maps_api("place/details/json", params, api_key)
+
+async def get_place_details_async(
+    place_id: str,
+    fields: Optional[List[str]] = None,
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of get_place_details."""
+    params = _place_details_params(place_id, fields)
+    return await call_google_maps_api_async("place/details/json", params, api_key)
+
+def _matrix_batches(
+    origins: List[str],
+    destinations: List[str]
+) -> List[Tuple[List[int], List[int]]]:
+    """Split an origins x destinations matrix into blocks that fit one request."""
+    dest_size = min(len(destinations), MATRIX_MAX_SIDE) or 1
+    origin_size = max(min(MATRIX_MAX_SIDE, MATRIX_MAX_ELEMENTS // dest_size), 1)
+    batches = []
+    for o in range(0, len(origins), origin_size):
+        for d in range(0, len(destinations), dest_size):
+            batches.append((
+                list(range(o, min(o + origin_size, len(origins)))),
+                list(range(d, min(d + dest_size, len(destinations)))),
+            ))
+    return batches
+
+def _matrix_params(origins, destinations, mode):
+    return {
+        "origins": "|".join(origins),
+        "destinations": "|".join(destinations),
+        "mode": mode
+    }
+
+def _merge_matrix(origins, destinations, batches, responses) -> Dict[str, Any]:
+    """Stitch batched Distance Matrix responses back into one full matrix."""
+    rows = [[{"status": "NOT_FOUND"} for _ in destinations] for _ in origins]
+    status = "OK"
+    for (origin_idx, dest_idx), response in zip(batches, responses):
+        if response.get("status") != "OK":
+            status = response.get("status", "UNKNOWN_ERROR")
+            continue
+        for i, row in zip(origin_idx, response.get("rows", [])):
+            for j, element in zip(dest_idx, row.get("elements", [])):
+                rows[i][j] = element
+    return {
+        "status": status,
+        "origin_addresses": list(origins),
+        "destination_addresses": list(destinations),
+        "rows": [{"elements": row} for row in rows],
     }
+
+def get_distance_matrix(
+    origins: List[str],
+    destinations: List[str],
+    mode: str = "driving",
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get travel durations and distances for every origin/destination pair.
     
-    if fields:
-        params["fields"] = ",".join(fields)
+    Large matrices are split into as few requests as the Distance Matrix
+    limits allow and merged back together.
     
-    return call_google_maps_api("place/details/json", params, api_key)
+    Args:
+        origins: Starting locations (addresses or lat,lng)
+        destinations: Ending locations (addresses or lat,lng)
+        mode: Transportation mode (driving, walking, bicycling, transit)
+        api_key: Google Maps API key (optional)
+        
+    Returns:
+        Distance Matrix results covering all origins and destinations
+    """
+    batches = _matrix_batches(origins, destinations)
+    responses = [
+        call_google_maps_api(
+            "distancematrix/json",
+            _matrix_params([origins[i] for i in origin_idx], [destinations[j] for j in dest_idx], mode),
+            api_key
+        )
+        for origin_idx, dest_idx in batches
+    ]
+    return _merge_matrix(origins, destinations, batches, responses)
+
+async def get_distance_matrix_async(
+    origins: List[str],
+    destinations: List[str],
+    mode: str = "driving",
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of get_distance_matrix; batches are requested concurrently."""
+    batches = _matrix_batches(origins, destinations)
+    responses = await asyncio.gather(*[
+        call_google_maps_api_async(
+            "distancematrix/json",
+            _matrix_params([origins[i] for i in origin_idx], [destinations[j] for j in dest_idx], mode),
+            api_key
+        )
+        for origin_idx, dest_idx in batches
+    ])
+    return _merge_matrix(origins, destinations, batches, responses)
+
+def _pair_params(origin, destination, mode):
+    return {"origin": origin, "destination": destination, "mode": mode}
+
+def _cached_pairs(origins, destinations, mode) -> Dict[Tuple[int, int], Dict[str, Any]]:
+    """Look up every origin/destination pair already in the response cache, in one batched query."""
+    if not cache_enabled():
+        return {}
+    pairs = [(i, j) for i in range(len(origins)) for j in range(len(destinations))]
+    elements = get_cache().get_many(
+        "google_maps", "distancematrix/pair",
+        [_pair_params(origins[i], destinations[j], mode) for i, j in pairs]
+    )
+    return {pair: element for pair, element in zip(pairs, elements) if element is not None}
+
+def _missing(origins, destinations, found):
+    """Origins and destinations that take part in at least one uncached pair."""
+    pairs = [(i, j) for i in range(len(origins)) for j in range(len(destinations)) if (i, j) not in found]
+    return sorted({i for i, _ in pairs}), sorted({j for _, j in pairs})
+
+def _fill_pairs(found, origins, destinations, origin_idx, dest_idx, matrix, mode):
+    """Record freshly fetched elements, caching each successful pair on its own (in one transaction)."""
+    fresh = []
+    for row_pos, i in enumerate(origin_idx):
+        for col_pos, j in enumerate(dest_idx):
+            element = matrix["rows"][row_pos]["elements"][col_pos]
+            found[(i, j)] = element
+            if element.get("status") == "OK":
+                fresh.append((_pair_params(origins[i], destinations[j], mode), element))
+    if fresh and cache_enabled():
+        get_cache().set_many("google_maps", "distancematrix/pair", fresh)
+
+def _travel_time_matrix(origins, destinations, mode, found) -> Dict[str, Any]:
+    durations, distances = [], []
+    for i in range(len(origins)):
+        duration_row, distance_row = [], []
+        for j in range(len(destinations)):
+            element = found.get((i, j), {})
+            ok = element.get("status") == "OK"
+            duration_row.append(element.get("duration", {}).get("value") if ok else None)
+            distance_row.append(element.get("distance", {}).get("value") if ok else None)
+        durations.append(duration_row)
+        distances.append(distance_row)
+    return {
+        "mode": mode,
+        "origins": list(origins),
+        "destinations": list(destinations),
+        "durations": durations,
+        "distances": distances,
+    }
+
+def get_travel_time_matrix(
+    origins: List[str],
+    destinations: List[str],
+    mode: str = "driving",
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get a duration/distance matrix, caching results per origin/destination pair.
+    
+    Only the pairs not already cached are requested from the Distance Matrix API.
+    
+    Args:
+        origins: Starting locations (addresses or lat,lng)
+        destinations: Ending locations (addresses or lat,lng)
+        mode: Transportation mode (driving, walking, bicycling, transit)
+        api_key: Google Maps API key (optional)
+        
+    Returns:
+        Dictionary with mode, origins, destinations and `durations` (seconds) /
+        `distances` (meters) matrices; unreachable pairs are None
+    """
+    found = _cached_pairs(origins, destinations, mode)
+    origin_idx, dest_idx = _missing(origins, destinations, found)
+    if origin_idx:
+        matrix = get_distance_matrix(
+            [origins[i] for i in origin_idx], [destinations[j] for j in dest_idx], mode, api_key
+        )
+        _fill_pairs(found, origins, destinations, origin_idx, dest_idx, matrix, mode)
+    return _travel_time_matrix(origins, destinations, mode, found)
+
+async def get_travel_time_matrix_async(
+    origins: List[str],
+    destinations: List[str],
+    mode: str = "driving",
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of get_travel_time_matrix."""
+    # The pair cache is sqlite; its reads and writes stay off the event loop
+    found = await asyncio.to_thread(_cached_pairs, origins, destinations, mode)
+    origin_idx, dest_idx = _missing(origins, destinations, found)
+    if origin_idx:
+        matrix = await get_distance_matrix_async(
+            [origins[i] for i in origin_idx], [destinations[j] for j in dest_idx], mode, api_key
+        )
+        await asyncio.to_thread(_fill_pairs, found, origins, destinations, origin_idx, dest_idx, matrix, mode)
+    return _travel_time_matrix(origins, destinations, mode, found)
 
 def main():
     """
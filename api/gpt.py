@@ -1,7 +1,16 @@
 import os
 from typing import Dict, List, Optional, Union, Any
 import openai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from api.client import openai_base_url
+
+def _build_messages(prompt: str, system_message: Optional[str]) -> List[Dict[str, str]]:
+    messages = []
+    if system_message:
+        messages.append({"role": "system", "content": system_message})
+    
+    messages.append({"role": "user", "content": prompt})
+    return messages
 
 def call_gpt41(
     prompt: str,
@@ -33,13 +42,9 @@ def call_gpt41(
     Returns:
         The model's response text or the full response object if streaming
     """
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=openai_base_url())
     
-    messages = []
-    if system_message:
-        messages.append({"role": "system", "content": system_message})
-    
-    messages.append({"role": "user", "content": prompt})
+    messages = _build_messages(prompt, system_message)
     
     response = client.chat.completions.create(
         model="gpt-4.1-nano",
@@ -59,6 +64,45 @@ def call_gpt41(
     else:
         return response.choices[0].message.content
 
+async def call_gpt41_async(
+    prompt: str,
+    system_message: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    top_p: float = 1.0,
+    frequency_penalty: float = 0.0,
+    presence_penalty: float = 0.0,
+    stream: bool = False,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Union[str, Dict[str, str]]] = None,
+) -> Union[str, Any]:
+    """
+    Async variant of call_gpt41 using the non-blocking OpenAI client.
+    
+    Takes the same arguments and returns the same values as call_gpt41.
+    """
+    client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=openai_base_url())
+    
+    messages = _build_messages(prompt, system_message)
+    
+    response = await client.chat.completions.create(
+        model="gpt-4.1-nano",
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        top_p=top_p,
+        frequency_penalty=frequency_penalty,
+        presence_penalty=presence_penalty,
+        stream=stream,
+        tools=tools,
+        tool_choice=tool_choice,
+    )
+    
+    if stream:
+        return response
+    else:
+        return response.choices[0].message.content
+
 def main():
     """
     Main function for testing the GPT-4.1 API call functionality.
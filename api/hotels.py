@@ -0,0 +1,122 @@
+import re
+import math
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, Any, Optional, List, Union
+
+from api.records import Listing, Hotel, parse_airbnb, parse_booking
+
+# Words that say nothing about which property a listing is
+_NAME_STOPWORDS = {"the", "hotel", "hotels", "apartment", "apartments", "by", "and", "a", "in", "of"}
+
+# Listings closer than this (meters) with similar names are treated as one property
+_SAME_PLACE_METERS = 150
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents/punctuation and drop filler words from a property name."""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(ch for ch in name if not unicodedata.combining(ch)).casefold()
+    words = re.findall(r"[a-z0-9]+", name)
+    return " ".join(w for w in words if w not in _NAME_STOPWORDS)
+
+
+def normalize_airbnb(response_json: Dict[str, Any]) -> List[Listing]:
+    """Convert an Airbnb search response into listings."""
+    return parse_airbnb(response_json)
+
+
+def normalize_booking(response_json: Dict[str, Any], checkin: str, checkout: str) -> List[Listing]:
+    """Convert a Booking.com searchHotels response into listings."""
+    return parse_booking(response_json, checkin, checkout)
+
+
+def _distance_meters(a: Union[Listing, Hotel], b: Union[Listing, Hotel]) -> Optional[float]:
+    if None in (a.lat, a.lng, b.lat, b.lng):
+        return None
+    lat1, lng1, lat2, lng2 = map(math.radians, (a.lat, a.lng, b.lat, b.lng))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6371000 * math.asin(math.sqrt(h))
+
+
+def is_same_property(a: Union[Listing, Hotel], b: Union[Listing, Hotel]) -> bool:
+    """Whether two listings likely describe the same property."""
+    name_a, name_b = normalize_name(a.name), normalize_name(b.name)
+    if not name_a or not name_b:
+        return False
+    similarity = SequenceMatcher(None, name_a, name_b).ratio()
+    distance = _distance_meters(a, b)
+    if distance is not None:
+        return distance <= _SAME_PLACE_METERS and similarity >= 0.75
+    return similarity >= 0.9
+
+
+def dedupe_hotels(listings: List[Listing]) -> List[Hotel]:
+    """Merge likely-identical properties, keeping the cheapest offer and every source."""
+    merged: List[Hotel] = []
+    for listing in listings:
+        for kept in merged:
+            if is_same_property(kept, listing):
+                kept.sources = sorted(set(kept.sources + [listing.source]))
+                cheaper = (listing.price_per_night or math.inf) < (kept.price_per_night or math.inf)
+                if cheaper:
+                    for name, value in listing.as_dict().items():
+                        if value is not None:
+                            setattr(kept, name, value)
+                break
+        else:
+            merged.append(Hotel.from_listing(listing))
+    return merged
+
+
+def rank_hotels(
+    hotels: List[Hotel],
+    price_max: Optional[float] = None,
+    limit: int = 8
+) -> List[Hotel]:
+    """Drop over-budget options and order by rating, then review count, then price."""
+    if price_max is not None:
+        hotels = [h for h in hotels if h.price_per_night is None or h.price_per_night <= price_max]
+
+    def sort_key(hotel):
+        return (
+            -(hotel.rating or 0),
+            -(hotel.reviews or 0),
+            hotel.price_per_night if hotel.price_per_night is not None else math.inf,
+        )
+
+    return sorted(hotels, key=sort_key)[:limit]
+
+
+def merge_hotel_results(
+    airbnb_json: Optional[Dict[str, Any]],
+    booking_json: Optional[Dict[str, Any]],
+    checkin: str,
+    checkout: str,
+    price_max: Optional[float] = None,
+    limit: int = 8
+) -> List[Hotel]:
+    """Normalize, dedupe and rank Airbnb and Booking.com results into one list."""
+    hotels = normalize_airbnb(airbnb_json) + normalize_booking(booking_json, checkin, checkout)
+    return rank_hotels(dedupe_hotels(hotels), price_max=price_max, limit=limit)
+
+
+def display_hotel_results(hotels: List[Hotel]) -> str:
+    if not hotels:
+        return "No hotels found."
+
+    results = f"Found {len(hotels)} hotels:\n" + "="*60 + "\n"
+    for idx, hotel in enumerate(hotels, 1):
+        price = f"${hotel.price_per_night:.0f}" if hotel.price_per_night is not None else "N/A"
+        rating = f"{hotel.rating:.2f}/5" if hotel.rating is not None else "No Rating"
+        reviews = f" ({hotel.reviews} reviews)" if hotel.reviews else ""
+
+        results += (f"{idx}. {hotel.name} [{', '.join(hotel.sources)}]\n")
+        results += (f"   🛏️ Type: {hotel.room_type or 'Unknown'}\n")
+        results += (f"   💵 Price: {price} per night\n")
+        results += (f"   ⭐ Rating: {rating}{reviews}\n")
+        if hotel.url:
+            results += (f"   🔗 Link: {hotel.url}\n")
+        results += ("-" * 60)
+        results += "\n"
+    return results
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Tuple
+from api.metrics import note_cache
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_TTL = 600
+
+
+def _size_of(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+class LRUCache:
+    """
+    Bounded in-memory LRU cache with a per-entry TTL.
+
+    Entries are evicted least-recently-used first once either the entry
+    count or the total stored size exceeds its limit.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        self.max_entries = max_entries or int(os.environ.get("API_MEMO_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.max_bytes = max_bytes or int(os.environ.get("API_MEMO_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.ttl = ttl or float(os.environ.get("API_MEMO_TTL", DEFAULT_TTL))
+        self._entries: "OrderedDict[Any, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.by_name: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, name: Optional[str], field: str):
+        if name is not None:
+            counters = self.by_name.setdefault(name, {"hits": 0, "misses": 0})
+            counters[field] += 1
+
+    def get(self, key: Any, name: Optional[str] = None) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key, counting the lookup under `name`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                self._count(name, "misses")
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._count(name, "hits")
+            return True, entry[0]
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None):
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Any):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "by_method": {name: dict(c) for name, c in self.by_name.items()},
+            }
+
+
+def memoized(cacheable: Optional[Callable[[Any], bool]] = None):
+    """
+    Decorator for manager methods that memoizes results in `self.memo`.
+
+    The key is the method name plus its bound arguments, so positional and
+    keyword calls with the same values share an entry. `cacheable` can keep
+    results such as error strings out of the cache.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        name = method.__name__
+
+        def make_key(self, args, kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())[1:]
+            return (name, json.dumps(arguments, sort_keys=True, default=str))
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                key = make_key(self, args, kwargs)
+                hit, value = self.memo.get(key, name)
+                note_cache("memo", "hit" if hit else "miss")
+                if hit:
+                    return value
+                value = await method(self, *args, **kwargs)
+                if cacheable is None or cacheable(value):
+                    self.memo.set(key, value)
+                return value
+
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = make_key(self, args, kwargs)
+            hit, value = self.memo.get(key, name)
+            note_cache("memo", "hit" if hit else "miss")
+            if hit:
+                return value
+            value = method(self, *args, **kwargs)
+            if cacheable is None or cacheable(value):
+                self.memo.set(key, value)
+            return value
+
+        return wrapper
+    return decorator
@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import atexit
+import threading
+import contextvars
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple, Iterator
+
+from api.tracing import start_span, end_span
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class ToolCall:
+    """What happened during one tool call, filled in by the layers it passes through."""
+
+    def __init__(self, agent: str, tool: str):
+        self.agent = agent
+        self.tool = tool
+        self.latency = 0.0
+        self.size = 0
+        self.error_class: Optional[str] = None
+        self.cache: Counter = Counter()
+        self.http: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def set_result(self, result: Any):
+        """Record the result size, and flag results that only carry an error message."""
+        content = result if isinstance(result, str) else json.dumps(result, default=str)
+        self.size = len(content.encode("utf-8"))
+        failed = (isinstance(result, dict) and "error" in result) or (
+            isinstance(result, str) and result.startswith("Error")
+        )
+        if failed and self.error_class is None:
+            self.error_class = "ErrorResult"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "agent": self.agent,
+            "tool": self.tool,
+            "latency_s": round(self.latency, 4),
+            "size_bytes": self.size,
+            "cache": {f"{layer}_{outcome}": n for (layer, outcome), n in self.cache.items()},
+            "http": {f"{provider}:{status}": n for (provider, status), n in self.http.items()},
+            "error_class": self.error_class,
+        }
+
+
+_current: contextvars.ContextVar[Optional[ToolCall]] = contextvars.ContextVar("tool_call", default=None)
+
+
+def note_cache(layer: str, outcome: str):
+    """Count a cache lookup ("memo"/"response", "hit"/"miss"/"stale") against the current tool call."""
+    call = _current.get()
+    if call is not None:
+        with call._lock:
+            call.cache[(layer, outcome)] += 1
+
+
+def note_http(provider: str, status: int):
+    """Count a provider HTTP status against the current tool call."""
+    call = _current.get()
+    if call is not None:
+        with call._lock:
+            call.http[(provider, str(status))] += 1
+            if status >= 400 and call.error_class is None:
+                call.error_class = f"HTTP{status}"
+
+
+def note_error(error: BaseException):
+    """Record the first provider-level exception seen by the current tool call."""
+    call = _current.get()
+    if call is not None:
+        with call._lock:
+            if call.error_class is None:
+                call.error_class = type(error).__name__
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            yield str(bound), total
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class ToolMetrics:
+    """
+    Aggregated tool-call metrics: counters and histograms by agent and tool.
+
+    Exported as Prometheus text or JSON; the most recent calls are kept
+    verbatim for debugging.
+    """
+
+    def __init__(self, recent: int = 200):
+        self._lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.size: Dict[Tuple[str, str], Histogram] = {}
+        self.cache: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.http: Counter = Counter()
+        self.recent = deque(maxlen=recent)
+
+    def record(self, call: ToolCall):
+        key = (call.agent, call.tool)
+        with self._lock:
+            self.calls[key + ("error" if call.error_class else "ok",)] += 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(call.latency)
+            self.size.setdefault(key, Histogram(SIZE_BUCKETS)).observe(call.size)
+            for (layer, outcome), n in call.cache.items():
+                self.cache[(call.tool, layer, outcome)] += n
+            for (provider, status), n in call.http.items():
+                self.http[(provider, status)] += n
+            if call.error_class:
+                self.errors[(call.tool, call.error_class)] += 1
+            self.recent.append(call.as_dict())
+
+    def reset(self):
+        with self._lock:
+            for table in (self.calls, self.latency, self.size, self.cache, self.errors, self.http, self.recent):
+                table.clear()
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP trip_tool_calls_total Tool calls by agent, tool and outcome.",
+                "# TYPE trip_tool_calls_total counter",
+            ]
+            for (agent, tool, status), n in sorted(self.calls.items()):
+                lines.append(f"trip_tool_calls_total{_labels(agent=agent, tool=tool, status=status)} {n}")
+            for name, help_text, table in (
+                ("trip_tool_latency_seconds", "Tool call latency.", self.latency),
+                ("trip_tool_result_bytes", "Size of tool results fed back to the agents.", self.size),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (agent, tool), histogram in sorted(table.items()):
+                    for bound, total in histogram.cumulative():
+                        lines.append(f"{name}_bucket{_labels(agent=agent, tool=tool, le=bound)} {total}")
+                    lines.append(f"{name}_sum{_labels(agent=agent, tool=tool)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_labels(agent=agent, tool=tool)} {histogram.count}")
+            lines += [
+                "# HELP trip_tool_cache_total Cache lookups made by tool calls.",
+                "# TYPE trip_tool_cache_total counter",
+            ]
+            for (tool, layer, outcome), n in sorted(self.cache.items()):
+                lines.append(f"trip_tool_cache_total{_labels(tool=tool, layer=layer, outcome=outcome)} {n}")
+            lines += [
+                "# HELP trip_tool_errors_total Failed tool calls by error class.",
+                "# TYPE trip_tool_errors_total counter",
+            ]
+            for (tool, error_class), n in sorted(self.errors.items()):
+                lines.append(f"trip_tool_errors_total{_labels(tool=tool, error_class=error_class)} {n}")
+            lines += [
+                "# HELP trip_provider_responses_total Provider HTTP responses by status.",
+                "# TYPE trip_provider_responses_total counter",
+            ]
+            for (provider, status), n in sorted(self.http.items()):
+                lines.append(f"trip_provider_responses_total{_labels(provider=provider, status=status)} {n}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        def histogram(h):
+            return {"count": h.count, "sum": round(h.sum, 6), "buckets": dict(h.cumulative())}
+
+        with self._lock:
+            return {
+                "calls": [
+                    {"agent": a, "tool": t, "status": s, "count": n} for (a, t, s), n in sorted(self.calls.items())
+                ],
+                "latency_seconds": {f"{a}/{t}": histogram(h) for (a, t), h in sorted(self.latency.items())},
+                "result_bytes": {f"{a}/{t}": histogram(h) for (a, t), h in sorted(self.size.items())},
+                "cache": [
+                    {"tool": t, "layer": l, "outcome": o, "count": n} for (t, l, o), n in sorted(self.cache.items())
+                ],
+                "errors": [{"tool": t, "error_class": e, "count": n} for (t, e), n in sorted(self.errors.items())],
+                "provider_responses": [
+                    {"provider": p, "status": s, "count": n} for (p, s), n in sorted(self.http.items())
+                ],
+                "recent": list(self.recent),
+            }
+
+    def write(self, path: str):
+        """Write a snapshot; a .json path gets JSON, anything else Prometheus text."""
+        content = json.dumps(self.to_dict(), indent=2) if path.endswith(".json") else self.prometheus_text()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+
+_metrics = ToolMetrics()
+
+
+def get_metrics() -> ToolMetrics:
+    """Return the process-wide tool metrics."""
+    return _metrics
+
+
+@contextmanager
+def tool_call(agent: str, tool: str) -> Iterator[ToolCall]:
+    """Measure one tool call; provider layers report into it through the context."""
+    call = ToolCall(agent, tool)
+    token = _current.set(call)
+    call_span, span_token = start_span("tool_call", agent=agent, tool=tool)
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        if call.error_class is None:
+            call.error_class = type(e).__name__
+        raise
+    finally:
+        call.latency = time.perf_counter() - started
+        _current.reset(token)
+        _metrics.record(call)
+        call_span.set("result_bytes", call.size)
+        call_span.set("error_class", call.error_class)
+        if call.error_class:
+            call_span.fail(RuntimeError(call.error_class))
+        end_span(call_span, span_token)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus text) and /metrics.json from a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] == "/metrics.json":
+                body, content_type = json.dumps(_metrics.to_dict()).encode("utf-8"), "application/json"
+            elif self.path.split("?")[0] == "/metrics":
+                body, content_type = _metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_configured = False
+_configured_lock = threading.Lock()
+
+
+def configure_metrics():
+    """
+    Start the exports requested by the environment, once per process.
+
+    METRICS_PORT serves the HTTP endpoint; METRICS_FILE is written at exit
+    (.json for JSON, anything else for Prometheus text).
+    """
+    global _configured
+    with _configured_lock:
+        if _configured:
+            return
+        _configured = True
+    port = os.environ.get("METRICS_PORT")
+    if port:
+        serve_metrics(int(port), os.environ.get("METRICS_HOST", "127.0.0.1"))
+    path = os.environ.get("METRICS_FILE")
+    if path:
+        atexit.register(_metrics.write, path)
@@ -0,0 +1,185 @@
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+# Sustained requests per second and burst size per provider
+DEFAULT_LIMITS = {
+    "google_maps": (50.0, 50),
+    "tripadvisor": (20.0, 20),
+    "yelp": (5.0, 10),
+    "airbnb": (5.0, 5),
+    "booking": (5.0, 5),
+}
+
+# Responses worth retrying: quota exhaustion and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Methods safe to send twice; others (e.g. Yelp's ai/chat POST) are only
+# retried when the provider cannot have processed them
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 20.0
+DEFAULT_MAX_ELAPSED = 45.0
+DEFAULT_MAX_WAIT = 60.0
+
+
+class RateLimited(Exception):
+    """Raised when a request would have to queue longer than the allowed wait."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token-bucket limiter that queues callers instead of rejecting them.
+
+    reserve() takes a token immediately, letting the balance go negative,
+    and returns how long the caller must wait for its turn, so concurrent
+    callers are served in arrival order at the configured rate. After a
+    429 the rate is halved and the bucket paused, then recovers gradually
+    on each successful request.
+    """
+
+    def __init__(self, rate: float, burst: int, max_wait: float = DEFAULT_MAX_WAIT):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if wait > self.max_wait:
+                raise RateLimited(f"rate limit queue wait {wait:.1f}s exceeds {self.max_wait:.0f}s")
+            self._tokens -= 1
+            return wait
+
+    def acquire(self):
+        """Block until this caller's turn."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttle(self, pause: float):
+        """Back off after the provider pushed back: halve the rate and pause the bucket."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.rate / 2, self.max_rate / 16)
+            self._tokens = min(self._tokens, 0.0) - pause * self.rate
+
+    def succeed(self):
+        """Recover the rate additively after a successful request."""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+def retryable(method: str, status: Optional[int] = None, connect_error: bool = False) -> bool:
+    """
+    Whether a failed attempt may be sent again.
+
+    Connection failures and 429s always qualify, since the provider never
+    processed the request; read timeouts and 5xx only for idempotent methods.
+    """
+    if connect_error or status == 429:
+        return True
+    return method.upper() in IDEMPOTENT_METHODS
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, honoring Retry-After when given.
+
+    Retries stop after max_retries, or once another would end more than
+    max_elapsed seconds after the request started.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_elapsed: float = DEFAULT_MAX_ELAPSED
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+
+    def allows(self, attempt: int, started: float, delay: float) -> bool:
+        """Whether retry number `attempt` (0-based) may still run after sleeping `delay` (started: time.monotonic())."""
+        return attempt < self.max_retries and time.monotonic() - started + delay <= self.max_elapsed
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to sleep before retry number `attempt` (0-based)."""
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def _env_limit(provider: str, default: Tuple[float, int]) -> Tuple[float, int]:
+    """API_RATE_<PROVIDER>=rate[:burst] overrides the default limit."""
+    value = os.environ.get(f"API_RATE_{provider.upper()}")
+    if not value:
+        return default
+    rate, _, burst = value.partition(":")
+    return float(rate), int(burst) if burst else max(int(float(rate)), 1)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+_retry_policy: Optional[RetryPolicy] = None
+
+
+def get_limiter(provider: str) -> TokenBucket:
+    """Return the process-wide token bucket of a provider."""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                rate, burst = _env_limit(provider, DEFAULT_LIMITS.get(provider, (10.0, 10)))
+                max_wait = float(os.environ.get("API_RATE_MAX_WAIT", DEFAULT_MAX_WAIT))
+                limiter = _limiters[provider] = TokenBucket(rate, burst, max_wait)
+    return limiter
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Return the retry policy shared by every provider call."""
+    global _retry_policy
+    if _retry_policy is None:
+        _retry_policy = RetryPolicy(
+            max_retries=int(os.environ.get("API_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+            base_delay=float(os.environ.get("API_RETRY_BASE_DELAY", DEFAULT_BASE_DELAY)),
+            max_delay=float(os.environ.get("API_RETRY_MAX_DELAY", DEFAULT_MAX_DELAY)),
+            max_elapsed=float(os.environ.get("API_RETRY_MAX_ELAPSED", DEFAULT_MAX_ELAPSED)),
+        )
+    return _retry_policy
@@ -0,0 +1,293 @@
+import re
+from datetime import date
+from typing import Dict, Any, Optional, List, Tuple
+
+
+class Record:
+    """
+    Base of the provider result records.
+
+    Subclasses only declare __slots__; fields are set by keyword and
+    default to None, which keeps each record a fixed, dict-free layout.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields: Any):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"{type(self).__name__} has no field(s) {', '.join(sorted(fields))}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def replace(self, **changes: Any) -> "Record":
+        """Copy of the record with some fields changed."""
+        return type(self)(**dict(self.as_dict(), **changes))
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and other.as_dict() == self.as_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items() if v is not None)
+        return f"{type(self).__name__}({fields})"
+
+
+class Attraction(Record):
+    """A TripAdvisor location, from a search result or a details lookup."""
+
+    __slots__ = (
+        "location_id", "name", "location_string", "category", "description", "web_url",
+        "address", "rating", "num_reviews", "price_level", "hours", "lat", "lng",
+    )
+
+
+class Restaurant(Record):
+    """A Yelp business."""
+
+    __slots__ = (
+        "id", "name", "url", "address", "phone", "rating", "review_count", "price", "categories",
+        "specialties", "summary", "delivery", "takeout", "wheelchair_accessible", "lat", "lng",
+    )
+
+
+_LISTING_FIELDS = (
+    "name", "source", "price_per_night", "total_price", "rating", "reviews", "room_type",
+    "address", "url", "label", "lat", "lng",
+)
+
+
+class Listing(Record):
+    """
+    One offer from one accommodation provider (Airbnb or Booking.com).
+
+    Prices are USD per night and ratings are on a 0-5 scale whatever the
+    provider reports.
+    """
+
+    __slots__ = _LISTING_FIELDS
+
+
+class Hotel(Record):
+    """A property after deduplication: the cheapest listing plus every provider offering it."""
+
+    __slots__ = _LISTING_FIELDS + ("sources",)
+
+    @classmethod
+    def from_listing(cls, listing: Listing) -> "Hotel":
+        return cls(sources=[listing.source], **listing.as_dict())
+
+
+class Step(Record):
+    """One maneuver of a leg; the instruction keeps Google's HTML."""
+
+    __slots__ = ("instruction", "distance_m", "duration_s", "distance_text", "duration_text")
+
+
+class Leg(Record):
+    """A route between two consecutive waypoints."""
+
+    __slots__ = (
+        "start_address", "end_address", "start_location", "end_location",
+        "distance_m", "duration_s", "distance_text", "duration_text", "steps",
+    )
+
+
+class Route(Record):
+    """A Google Maps directions route; totals are summed over its legs."""
+
+    __slots__ = ("summary", "distance_m", "duration_s", "legs")
+
+
+def to_float(value: Any) -> Optional[float]:
+    """
+    Number in a provider value such as 4.5, "4.87 (132)", "$1,240", "4,5" or "€1.234,50".
+
+    With both separators, the last one is the decimal point; a lone comma
+    is one only when it is not followed by exactly three digits.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"-?\d+(?:[.,]\d+)*", str(value))
+    if not match:
+        return None
+    number = match.group()
+    decimal = max(number.rfind("."), number.rfind(","))
+    if decimal < 0:
+        return float(number)
+    separator = number[decimal]
+    if number.count(separator) > 1 or (
+        separator == "," and "." not in number and len(number) - decimal - 1 == 3
+    ):
+        # Only thousands separators, as in "1,240" or "1.234.567"
+        return float(re.sub(r"[.,]", "", number))
+    return float(re.sub(r"[.,]", "", number[:decimal]) + "." + number[decimal + 1:])
+
+
+def to_int(value: Any) -> Optional[int]:
+    number = to_float(value)
+    return int(number) if number is not None else None
+
+
+def nights(checkin: str, checkout: str) -> int:
+    try:
+        return max((date.fromisoformat(checkout) - date.fromisoformat(checkin)).days, 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def _location(point: Optional[Dict[str, Any]]) -> Optional[Tuple[float, float]]:
+    if point and point.get('lat') is not None and point.get('lng') is not None:
+        return float(point['lat']), float(point['lng'])
+    return None
+
+
+def parse_attraction(item: Dict[str, Any]) -> Attraction:
+    return Attraction(
+        location_id=str(item['location_id']) if item.get('location_id') is not None else None,
+        name=item.get('name', 'Unknown'),
+        location_string=item.get('location_string'),
+        category=(item.get('category') or {}).get('name'),
+        description=item.get('description'),
+        web_url=item.get('web_url'),
+        address=(item.get('address_obj') or {}).get('address_string'),
+        rating=to_float(item.get('rating')),
+        num_reviews=to_int(item.get('num_reviews')),
+        price_level=item.get('price_level'),
+        hours=(item.get('hours') or {}).get('weekday_text', []),
+        lat=to_float(item.get('latitude')),
+        lng=to_float(item.get('longitude')),
+    )
+
+
+def parse_attractions(response_json: Optional[Dict[str, Any]]) -> List[Attraction]:
+    """Attractions of a TripAdvisor location search."""
+    return [parse_attraction(item) for item in (response_json or {}).get('data', [])]
+
+
+def parse_restaurants(response_json: Optional[Dict[str, Any]]) -> List[Restaurant]:
+    """Businesses of every entity of a Yelp Fusion AI chat response."""
+    restaurants = []
+    for entity in (response_json or {}).get('entities', []):
+        for business in entity.get('businesses', []):
+            attributes = business.get('attributes') or {}
+            coordinates = business.get('coordinates') or {}
+            restaurants.append(Restaurant(
+                id=business.get('id'),
+                name=business.get('name', 'Unknown'),
+                url=business.get('url'),
+                address=(business.get('location') or {}).get('formatted_address'),
+                phone=business.get('phone'),
+                rating=to_float(business.get('rating')),
+                review_count=to_int(business.get('review_count')),
+                price=business.get('price'),
+                categories=[c.get('title') for c in business.get('categories', []) if c.get('title')],
+                specialties=attributes.get('AboutThisBizSpecialties'),
+                summary=(business.get('summaries') or {}).get('short'),
+                delivery=bool(attributes.get('RestaurantsDelivery')),
+                takeout=bool(attributes.get('RestaurantsTakeOut')),
+                wheelchair_accessible=bool(attributes.get('WheelchairAccessible')),
+                lat=to_float(coordinates.get('latitude')),
+                lng=to_float(coordinates.get('longitude')),
+            ))
+    return restaurants
+
+
+def restaurants_intro(response_json: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The prose answer that accompanies a Yelp Fusion AI chat response."""
+    return ((response_json or {}).get('response') or {}).get('text')
+
+
+def parse_airbnb(response_json: Optional[Dict[str, Any]]) -> List[Listing]:
+    """Listings of an Airbnb searchPropertyByLocation response."""
+    listings = []
+    for item in (response_json or {}).get('data', {}).get('list', []):
+        listing_info = item.get('listing', {})
+        price_info = item.get('pricingQuote', {}).get('structuredStayDisplayPrice', {}).get('primaryLine', {})
+        coordinate = listing_info.get('coordinate', {})
+
+        # avgRatingLocalized looks like "4.87 (132)" or "New"
+        rating_text = str(listing_info.get('avgRatingLocalized') or "")
+        reviews = re.search(r"\((\d+)\)", rating_text)
+
+        listings.append(Listing(
+            name=listing_info.get('name', 'Unknown'),
+            source='Airbnb',
+            price_per_night=to_float(price_info.get('price')),
+            rating=to_float(rating_text.split("(")[0]) if rating_text else None,
+            reviews=int(reviews.group(1)) if reviews else None,
+            room_type=listing_info.get('roomTypeCategory'),
+            address=listing_info.get('city'),
+            url=listing_info.get('webURL'),
+            label=rating_text or None,
+            lat=to_float(coordinate.get('latitude', listing_info.get('lat'))),
+            lng=to_float(coordinate.get('longitude', listing_info.get('lng'))),
+        ))
+    return listings
+
+
+def parse_booking(response_json: Optional[Dict[str, Any]], checkin: str, checkout: str) -> List[Listing]:
+    """Listings of a Booking.com searchHotels response; the stay's total is spread over its nights."""
+    stay = nights(checkin, checkout)
+    listings = []
+    for item in (response_json or {}).get('data', {}).get('hotels', []):
+        prop = item.get('property', {})
+        total = to_float(prop.get('priceBreakdown', {}).get('grossPrice', {}).get('value'))
+        score = to_float(prop.get('reviewScore'))
+
+        listings.append(Listing(
+            name=prop.get('name') or str(item.get('accessibilityLabel', 'Unknown')).split('.')[0],
+            source='Booking.com',
+            price_per_night=round(total / stay, 2) if total is not None else None,
+            total_price=total,
+            # Booking.com scores out of 10
+            rating=round(score / 2, 2) if score is not None else None,
+            reviews=prop.get('reviewCount'),
+            room_type='Hotel',
+            address=prop.get('wishlistName'),
+            url=f"https://www.booking.com/hotel.html?hotel_id={item['hotel_id']}" if item.get('hotel_id') else None,
+            label=item.get('accessibilityLabel'),
+            lat=to_float(prop.get('latitude')),
+            lng=to_float(prop.get('longitude')),
+        ))
+    return listings
+
+
+def parse_route(response_json: Optional[Dict[str, Any]]) -> Optional[Route]:
+    """First route of a Google Maps directions response, or None."""
+    routes = (response_json or {}).get('routes') or []
+    if not routes:
+        return None
+    legs = []
+    for leg in routes[0].get('legs', []):
+        legs.append(Leg(
+            start_address=leg.get('start_address'),
+            end_address=leg.get('end_address'),
+            start_location=_location(leg.get('start_location')),
+            end_location=_location(leg.get('end_location')),
+            distance_m=(leg.get('distance') or {}).get('value'),
+            duration_s=(leg.get('duration') or {}).get('value'),
+            distance_text=(leg.get('distance') or {}).get('text'),
+            duration_text=(leg.get('duration') or {}).get('text'),
+            steps=[
+                Step(
+                    instruction=step.get('html_instructions', ''),
+                    distance_m=(step.get('distance') or {}).get('value'),
+                    duration_s=(step.get('duration') or {}).get('value'),
+                    distance_text=(step.get('distance') or {}).get('text'),
+                    duration_text=(step.get('duration') or {}).get('text'),
+                )
+                for step in leg.get('steps', [])
+            ],
+        ))
+    if not legs:
+        return None
+    return Route(
+        summary=routes[0].get('summary'),
+        distance_m=sum(leg.distance_m or 0 for leg in legs),
+        duration_s=sum(leg.duration_s or 0 for leg in legs),
+        legs=legs,
+    )
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import secrets
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Iterator
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+STATUS_ERROR = 2
+
+SERVICE_NAME = "ai-trip-planner"
+
+
+class Span:
+    """One timed operation of a trace; attributes follow OpenTelemetry naming."""
+
+    __slots__ = ("trace", "span_id", "parent", "name", "kind", "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent: Optional["Span"], kind: int, start_ns: int):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = 0
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def add(self, key: str, amount: float):
+        """Add to a numeric attribute of this span and every ancestor (e.g. token counts)."""
+        span = self
+        while span is not None:
+            span.attributes[key] = span.attributes.get(key, 0) + amount
+            span = span.parent
+
+    def fail(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+
+
+class _NoopSpan:
+    """Stands in for a span when no trace is being recorded."""
+
+    def set(self, key, value):
+        pass
+
+    def add(self, key, amount):
+        pass
+
+    def fail(self, error):
+        pass
+
+    def end(self, end_ns=None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def new_span(self, name: str, parent: Optional[Span], kind: int, start_ns: Optional[int] = None) -> Span:
+        span = Span(self, name, parent, kind, start_ns or time.time_ns())
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+
+
+def start_span(name: str, kind: int = KIND_INTERNAL, start_ns: Optional[int] = None, **attributes: Any):
+    """
+    Start a child of the current span and make it current.
+
+    Returns (span, token) for end_span; outside a trace this is a no-op.
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN, None
+    span = parent.trace.new_span(name, parent, kind, start_ns)
+    for key, value in attributes.items():
+        span.set(key, value)
+    return span, _current.set(span)
+
+
+def end_span(span, token, error: Optional[BaseException] = None):
+    """End a span from start_span and restore the previous current span."""
+    if token is None:
+        return
+    if error is not None:
+        span.fail(error)
+    span.end()
+    _current.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any) -> Iterator[Any]:
+    """Trace a block as a child of the current span."""
+    current, token = start_span(name, kind, **attributes)
+    try:
+        yield current
+    except BaseException as e:
+        end_span(current, token, e)
+        raise
+    end_span(current, token)
+
+
+def record_span(name: str, start_ns: int, end_ns: Optional[int] = None, kind: int = KIND_INTERNAL, **attributes: Any):
+    """Add an already finished operation (e.g. reported after the fact) under the current span."""
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    recorded = parent.trace.new_span(name, parent, kind, start_ns)
+    for key, value in attributes.items():
+        recorded.set(key, value)
+    recorded.end(end_ns)
+    return recorded
+
+
+def tracing_enabled() -> bool:
+    return bool(os.environ.get("TRACE_FILE"))
+
+
+@contextmanager
+def trace(name: str, path: Optional[str] = None, **attributes: Any) -> Iterator[Any]:
+    """
+    Record a whole trace rooted at this block and append it to a file.
+
+    The file (path, or TRACE_FILE) gets one OTLP/JSON export request per
+    line. Without either, nothing is recorded.
+    """
+    path = path or os.environ.get("TRACE_FILE")
+    if not path:
+        yield NOOP_SPAN
+        return
+    root = Trace().new_span(name, None, KIND_INTERNAL)
+    for key, value in attributes.items():
+        root.set(key, value)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.fail(e)
+        raise
+    finally:
+        _current.reset(token)
+        root.end()
+        export(root.trace, path)
+
+
+def _value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest of a trace; spans left open end with their root."""
+    root_end = max((s.end_ns or 0) for s in trace.spans) or time.time_ns()
+    spans = []
+    for s in trace.spans:
+        item = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": s.kind,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or root_end),
+            "attributes": [{"key": k, "value": _value(v)} for k, v in s.attributes.items()],
+            "status": {"code": s.status, "message": s.error} if s.error else {"code": s.status},
+        }
+        if s.parent is not None:
+            item["parentSpanId"] = s.parent.span_id
+        spans.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "trip_planner"}, "spans": spans}],
+        }]
+    }
+
+
+_export_lock = threading.Lock()
+
+
+def export(trace: Trace, path: str):
+    line = json.dumps(to_otlp(trace))
+    with _export_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
@@ -1,7 +1,28 @@
 import os
-import requests
-from typing import Dict, Any, Optional, List
+from api.client import get_client, get_async_client
+from api.cache import cached
+from typing import Dict, Any, Optional, List, Tuple
 
+def _prepare_request(
+    params: Dict[str, Any],
+    api_key: Optional[str]
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Attach the API key to the params and build the request headers."""
+    # Use provided API key or get from environment
+    if api_key is None:
+        api_key = os.environ.get("TRIPADVISOR_API_KEY")
+        if not api_key:
+            raise ValueError("TripAdvisor API key not provided and not found in environment variables")
+    
+    # Add API key to headers
+    headers = {
+        "accept": "application/json"
+    }
+    
+    params['key'] = api_key
+    return params, headers
+
+@cached("tripadvisor")
 def call_tripadvisor_api(
     endpoint: str,
     params: Dict[str, Any],
@@ -18,23 +39,10 @@ def call_tripadvisor_api(
     Returns:
         JSON response from the TripAdvisor API as a dictionary
     """
-    base_url = "https://api.content.tripadvisor.com/api/v1/"
-    
-    # Use provided API key or get from environment
-    if api_key is None:
-        api_key = os.environ.get("TRIPADVISOR_API_KEY")
-        if not api_key:
-            raise ValueError("TripAdvisor API key not provided and not found in environment variables")
-    
-    # Add API key to headers
-    headers = {
-        "accept": "application/json"
-    }
-    
-    params['key'] = api_key
+    params, headers = _prepare_request(params, api_key)
     
     # Make the request
-    response = requests.get(f"{base_url}{endpoint}", params=params, headers=headers)
+    response = get_client().get("tripadvisor", endpoint, params=params, headers=headers)
     
     # Check if the request was successful
     response.raise_for_status()
@@ -42,6 +50,30 @@ def call_tripadvisor_api(
     # Return the JSON response
     return response.json()
 
+@cached("tripadvisor")
+async def call_tripadvisor_api_async(
+    endpoint: str,
+    params: Dict[str, Any],
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of call_tripadvisor_api."""
+    params, headers = _prepare_request(params, api_key)
+    response = await get_async_client().get("tripadvisor", endpoint, params=params, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+def _attraction_search_params(location, category, limit, language):
+    params = {
+        "searchQuery": location,
+        "language": language,
+        "limit": limit
+    }
+    
+    if category:
+        params["category"] = category
+    
+    return params
+
 def search_attractions(
     location: str,
     category: Optional[str] = None,
@@ -62,17 +94,20 @@ def search_attractions(
     Returns:
         Search results for attractions
     """
-    params = {
-        "searchQuery": location,
-        "language": language,
-        "limit": limit
-    }
-    
-    if category:
-        params["category"] = category
-    
+    params = _attraction_search_params(location, category, limit, language)
     return call_tripadvisor_api("location/search", params, api_key)
 
+async def search_attractions_async(
+    location: str,
+    category: Optional[str] = None,
+    limit: int = 10,
+    language: str = "en",
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of search_attractions."""
+    params = _attraction_search_params(location, category, limit, language)
+    return await call_tripadvisor_api_async("location/search", params, api_key)
+
 def get_location_details(
     location_id: str,
     language: str = "en",
@@ -98,6 +133,20 @@ def get_location_details(
     
     return call_tripadvisor_api(f"location/{location_id}/details", params, api_key)
 
+async def get_location_details_async(
+    location_id: str,
+    language: str = "en",
+    currency: str = "USD",
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of get_location_details."""
+    params = {
+        "language": language,
+        "currency": currency
+    }
+    
+    return await call_tripadvisor_api_async(f"location/{location_id}/details", params, api_key)
+
 def search_tours(
     location_id: str,
     limit: int = 10,
@@ -123,6 +172,20 @@ def search_tours(
     
     return call_tripadvisor_api(f"location/{location_id}/attractions", params, api_key)
 
+async def search_tours_async(
+    location_id: str,
+    limit: int = 10,
+    language: str = "en",
+    api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async variant of search_tours."""
+    params = {
+        "language": language,
+        "limit": limit
+    }
+    
+    return await call_tripadvisor_api_async(f"location/{location_id}/attractions", params, api_key)
+
 def main():
     """
     Main function for testing the TripAdvisor API functionality.
@@ -1,24 +1,20 @@
-import requests
+import json
 import pprint
+from api.client import get_client, get_async_client
+from api.cache import cached
+from api.records import parse_restaurants, restaurants_intro
 
 
-def search_yelp_business_restaurants(
-        location,
-    yelp_api_key=None
-):
-    url = "https://api.yelp.com/v3/businesses/search"
-    querystring = {
-        "location": location,
-        "sorted_by": "best_match",
-        "limit": 3
-    }
-    headers = {
+def _yelp_headers(yelp_api_key):
+    return {
         'Authorization': f'Bearer {yelp_api_key}',
         'Content-Type': 'application/json'
     }
-    response = requests.get(url, headers=headers, params=querystring)
-    print(response.status_code)
-    print(response.json())
+
+
+def _yelp_results(response):
+    # print(response.status_code)
+    # print(response.json())
     if response.status_code != 200:
         print(f"Error: {response.status_code}")
         return None
@@ -27,95 +23,95 @@ def search_yelp_business_restaurants(
     return results
 
 
+def _business_querystring(location):
+    return {
+        "location": location,
+        "sorted_by": "best_match",
+        "limit": 3
+    }
+
+
+def _fusion_payload(food_category, location):
+    payload = {
+        "query": "What's a good " + food_category + " place in " + location + "?",
+    }
+    return json.dumps(payload)
+
+
+@cached("yelp")
+def search_yelp_business_restaurants(
+        location,
+    yelp_api_key=None
+):
+    querystring = _business_querystring(location)
+    headers = _yelp_headers(yelp_api_key)
+    response = get_client().get("yelp", "v3/businesses/search", headers=headers, params=querystring)
+    print(response.status_code)
+    print(response.json())
+    return _yelp_results(response)
+
 
+# Async variant of search_yelp_business_restaurants
+@cached("yelp")
+async def search_yelp_business_restaurants_async(
+        location,
+    yelp_api_key=None
+):
+    querystring = _business_querystring(location)
+    headers = _yelp_headers(yelp_api_key)
+    response = await get_async_client().get(
+        "yelp", "v3/businesses/search", headers=headers, params=querystring
+    )
+    return _yelp_results(response)
+
+
+
+@cached("yelp")
 def search_yelp_fusion_restaurants(
         food_category, 
         location,
     yelp_api_key=None
 ):
-    url = "https://api.yelp.com/ai/chat/v2"
-    
-    payload = {
-        "query": "What's a good " + food_category + " place in " + location + "?",
-    }
-    headers = {
-        'Authorization': f'Bearer {yelp_api_key}',
-        'Content-Type': 'application/json'
-    }
-    json_payload = json.dumps(payload)
-    response = requests.post(url, headers=headers, data=json_payload)
-    # print(response.status_code)
-    # print(response.json())
-    if response.status_code != 200:
-        print(f"Error: {response.status_code}")
-        return None
+    json_payload = _fusion_payload(food_category, location)
+    headers = _yelp_headers(yelp_api_key)
+    response = get_client().post("yelp", "ai/chat/v2", headers=headers, data=json_payload)
+    return _yelp_results(response)
 
-    results = response.json()
-    return results
 
+# Async variant of search_yelp_fusion_restaurants
+@cached("yelp")
+async def search_yelp_fusion_restaurants_async(
+        food_category, 
+        location,
+    yelp_api_key=None
+):
+    json_payload = _fusion_payload(food_category, location)
+    headers = _yelp_headers(yelp_api_key)
+    response = await get_async_client().post("yelp", "ai/chat/v2", headers=headers, content=json_payload)
+    return _yelp_results(response)
 
-def display_yelp_fusion_results(response_json):
-    results = ""
-    response_text = response_json.get('response', {}).get('text', 'No response text provided.')
-    entities = response_json.get('entities', [])
-    
-    # print(f"\n{response_text}\n" + "="*60)
-    results += f"\n{response_text}\n" + "="*60
+
+def display_yelp_fusion_results(restaurants, intro=None):
+    results = f"\n{intro or 'No response text provided.'}\n" + "="*60
     results += "\n"
     
-    if not entities:
-        # print("No businesses found.")
+    if not restaurants:
         results += "No businesses found."
-        return
-
-    businesses = entities[0].get('businesses', [])
-    
-    if not businesses:
-        # print("No businesses listed.")
-        results += "No businesses listed."
-        return
+        return results
     
-    for idx, business in enumerate(businesses, 1):
-        name = business.get('name', 'Unknown')
-        url = business.get('url', '#')
-        address = business.get('location', {}).get('formatted_address', 'Address not available')
-        phone = business.get('phone', 'Phone not available')
-        rating = business.get('rating', 'No rating')
-        review_count = business.get('review_count', 'No reviews')
-        price = business.get('price', 'Price not listed')
-        categories = [cat.get('title') for cat in business.get('categories', [])]
-        specialties = business.get('attributes', {}).get('AboutThisBizSpecialties', 'No specialties mentioned.')
-        summary = business.get('summaries', {}).get('short', 'No summary available.')
-        delivery = business.get('attributes', {}).get('RestaurantsDelivery', False)
-        takeout = business.get('attributes', {}).get('RestaurantsTakeOut', False)
-        wheelchair_accessible = business.get('attributes', {}).get('WheelchairAccessible', False)
-        
-        # print(f"{idx}. {name}")
-        # print(f"   📍 Address: {address}")
-        # print(f"   📞 Phone: {phone}")
-        # print(f"   ⭐ Rating: {rating} ({review_count} reviews)")
-        # print(f"   💵 Price Range: {price}")
-        # print(f"   🍽️ Categories: {', '.join(categories) if categories else 'Not specified'}")
-        # print(f"   🛵 Delivery Available: {'Yes' if delivery else 'No'}")
-        # print(f"   🥡 Takeout Available: {'Yes' if takeout else 'No'}")
-        # print(f"   ♿ Wheelchair Accessible: {'Yes' if wheelchair_accessible else 'No'}")
-        # print(f"   🛠️ Specialties: {specialties}")
-        # print(f"   📖 Summary: {summary}")
-        # print(f"   🔗 URL: {url}")
-        # print("-" * 60)
-
-        results += (f"{idx}. {name}\n")
-        results += (f"   📍 Address: {address}\n")
-        results += (f"   📞 Phone: {phone}\n")
-        results += (f"   ⭐ Rating: {rating} ({review_count} reviews)\n")
-        results += (f"   💵 Price Range: {price}\n")
-        results += (f"   🍽️ Categories: {', '.join(categories) if categories else 'Not specified'}\n")
-        results += (f"   🛵 Delivery Available: {'Yes' if delivery else 'No'}\n")
-        results += (f"   🥡 Takeout Available: {'Yes' if takeout else 'No'}\n")
-        results += (f"   ♿ Wheelchair Accessible: {'Yes' if wheelchair_accessible else 'No'}\n")
-        results += (f"   🛠️ Specialties: {specialties}\n")
-        results += (f"   📖 Summary: {summary}\n")
-        results += (f"   🔗 URL: {url}\n")
+    for idx, restaurant in enumerate(restaurants, 1):
+        results += (f"{idx}. {restaurant.name}\n")
+        results += (f"   📍 Address: {restaurant.address or 'Address not available'}\n")
+        results += (f"   📞 Phone: {restaurant.phone or 'Phone not available'}\n")
+        results += (f"   ⭐ Rating: {restaurant.rating or 'No rating'} ({restaurant.review_count or 'No'} reviews)\n")
+        results += (f"   💵 Price Range: {restaurant.price or 'Price not listed'}\n")
+        results += (f"   🍽️ Categories: {', '.join(restaurant.categories) if restaurant.categories else 'Not specified'}\n")
+        results += (f"   🛵 Delivery Available: {'Yes' if restaurant.delivery else 'No'}\n")
+        results += (f"   🥡 Takeout Available: {'Yes' if restaurant.takeout else 'No'}\n")
+        results += (f"   ♿ Wheelchair Accessible: {'Yes' if restaurant.wheelchair_accessible else 'No'}\n")
+        results += (f"   🛠️ Specialties: {restaurant.specialties or 'No specialties mentioned.'}\n")
+        results += (f"   📖 Summary: {restaurant.summary or 'No summary available.'}\n")
+        results += (f"   🔗 URL: {restaurant.url or '#'}\n")
         results += ("-" * 60)
         results += ("\n")
 
@@ -183,7 +179,7 @@ if __name__ == "__main__":
     print(f"Searching for {cuisine} restaurants in {location}...")
     results = search_yelp_fusion_restaurants(food_category=cuisine, location=location, yelp_api_key=api_key)
     if results:
-        formatted_results = display_yelp_fusion_results(results)
+        formatted_results = display_yelp_fusion_results(parse_restaurants(results), restaurants_intro(results))
         print(formatted_results)
     else:
         print("No results found or an error occurred.")
@@ -195,7 +191,7 @@ if __name__ == "__main__":
     print(f"Searching for {cuisine} restaurants in {location}...")
     results = search_yelp_fusion_restaurants(food_category=cuisine, location=location, yelp_api_key=api_key)
     if results:
-        formatted_results = display_yelp_fusion_results(results)
+        formatted_results = display_yelp_fusion_results(parse_restaurants(results), restaurants_intro(results))
         print(formatted_results)
     else:
         print("No results found or an error occurred.")
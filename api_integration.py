@@ -2,22 +2,388 @@
 
 import os
 import json
-from api.airbnb import search_airbnb, display_airbnb_results
-from api.booking import search_booking_hotel, display_booking_results
-from api.yelp import search_yelp_fusion_restaurants, display_yelp_fusion_results
-from api.tripadvisor import search_attractions, get_location_details, search_tours
-from api.gmap import search_places, get_place_details, get_directions
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from api.airbnb import search_airbnb, search_airbnb_async, display_airbnb_results
+from api.booking import search_booking_hotel, search_booking_hotel_async, display_booking_results
+from api.yelp import (
+    search_yelp_fusion_restaurants, search_yelp_fusion_restaurants_async, display_yelp_fusion_results
+)
+from api.tripadvisor import (
+    search_attractions, search_attractions_async,
+    get_location_details, get_location_details_async,
+    search_tours
+)
+from api.gmap import (
+    search_places, search_places_async, get_place_details,
+    geocode_address, geocode_address_async,
+    get_directions, get_directions_async,
+    get_travel_time_matrix, get_travel_time_matrix_async
+)
+from api.client import get_client, get_async_client
+from api.cache import coalescing_stats
+from api.circuit import breaker_states
+from api.memo import LRUCache, memoized
+from api.hotels import merge_hotel_results, display_hotel_results
+from api.geo import get_geo_store, parse_lat_lng
+from api.records import (
+    parse_attraction, parse_attractions, parse_restaurants, restaurants_intro,
+    parse_airbnb, parse_booking, parse_route
+)
+from api.compact import (
+    COMPACT, output_mode as default_output_mode, token_budget,
+    compact_json, compact_attractions, compact_location_details, compact_directions,
+    compact_hotels, compact_airbnb, compact_booking, compact_restaurants, compact_nearby
+)
+
+# find_nearby kinds mapped to Google Places types for the fallback search
+_PLACE_TYPES = {
+    'attraction': 'tourist_attraction',
+    'restaurant': 'restaurant',
+    'hotel': 'lodging',
+}
+
+
+# Opens a reply that covers only the providers that answered
+PARTIAL = "Partial results"
+
+
+def _is_result(value):
+    """Error strings from a failed call, and partial results, must not be memoized"""
+    return not (isinstance(value, str) and value.startswith(("Error", PARTIAL)))
+
+
+def _unavailable(results):
+    """Note naming the providers whose call failed, given their results by provider name"""
+    failed = [f"{name} unavailable ({error})" for name, error in results.items() if isinstance(error, Exception)]
+    return f"{PARTIAL}: {'; '.join(failed)}.\n" if failed else ""
+
+
+def _is_details(value):
+    """Only locations that were found are memoized; lookups that raise never are"""
+    return value is not None
+
+
+def _outcome(result):
+    """Turn a provider failure into an empty result so the other providers still count"""
+    if isinstance(result, Exception):
+        print(f"Provider call failed: {result}")
+        return None
+    return result
+
+
+def _index_location_details(store, location_id, attraction):
+    if attraction:
+        store.add_place(
+            f"tripadvisor:{location_id}",
+            attraction.name,
+            attraction.lat,
+            attraction.lng,
+            kind='attraction',
+            source='TripAdvisor',
+            address=attraction.address,
+            geocode=True
+        )
+
+
+def _index_restaurants(store, restaurants):
+    for restaurant in restaurants:
+        store.add_place(
+            f"yelp:{restaurant.id or restaurant.name}",
+            restaurant.name,
+            restaurant.lat,
+            restaurant.lng,
+            kind='restaurant',
+            source='Yelp',
+            address=restaurant.address
+        )
+
+
+def _index_hotels(store, hotels):
+    for hotel in hotels:
+        store.add_place(
+            f"{hotel.source.lower()}:{hotel.url or hotel.name}",
+            hotel.name,
+            hotel.lat,
+            hotel.lng,
+            kind='hotel',
+            source=', '.join(hotel.sources),
+            address=hotel.address
+        )
+
+
+def _index_places(store, results, kind='place'):
+    for place in (results or {}).get('results', []):
+        location = place.get('geometry', {}).get('location', {})
+        store.add_place(
+            f"google:{place.get('place_id', place.get('name'))}",
+            place.get('name', 'Unknown'),
+            location.get('lat'),
+            location.get('lng'),
+            kind=kind,
+            source='Google Maps',
+            address=place.get('vicinity')
+        )
+
+
+def _index_directions(store, origin, destination, route):
+    """Directions already carry the coordinates of both ends; keep them as geocodes"""
+    if route:
+        first, last = route.legs[0], route.legs[-1]
+        if first.start_location:
+            store.set_geocode(origin, *first.start_location, first.start_address)
+        if last.end_location:
+            store.set_geocode(destination, *last.end_location, last.end_address)
+
+
+def _geocode_result(results):
+    if results and results.get('results'):
+        result = results['results'][0]
+        location = result['geometry']['location']
+        return location['lat'], location['lng'], result.get('formatted_address')
+    return None
+
+
+def _format_nearby(location, places, budget=None):
+    if not places:
+        return f"No known places near {location}."
+    if budget is not None:
+        return compact_nearby(places, budget)
+    return json.dumps([
+        {
+            'name': place['name'],
+            'kind': place['kind'],
+            'distance_m': place['distance_m'],
+            'address': place['address'],
+            'source': place['source'],
+        }
+        for place in places
+    ], indent=2)
+
+
+def _format_attractions(attractions, budget=None):
+    if not attractions:
+        return "No attraction results found."
+    if budget is not None:
+        return compact_attractions(attractions, budget)
+    return json.dumps([
+        {
+            'name': attraction.name,
+            'location_id': attraction.location_id or '',
+            'location_string': attraction.location_string or '',
+            'category': attraction.category or 'Unknown'
+        }
+        for attraction in attractions
+    ], indent=2)
+
+
+def _location_details(attraction):
+    return {
+        'name': attraction.name,
+        'description': attraction.description or 'No description available',
+        'web_url': attraction.web_url or '',
+        'address': attraction.address or 'Unknown',
+        'rating': attraction.rating if attraction.rating is not None else 'No rating',
+        'num_reviews': attraction.num_reviews or 0,
+        'price_level': attraction.price_level or 'Unknown',
+        'hours': attraction.hours
+    }
+
+
+def _format_location_details(attraction, budget=None):
+    if attraction and budget is not None:
+        return compact_json(compact_location_details(attraction), budget)
+    if attraction:
+        return json.dumps(_location_details(attraction), indent=2)
+    return "No location details found."
+
+
+def _format_location_details_batch(location_ids, outcomes, budget=None):
+    """One combined list for a batch; failed lookups carry an error instead of details"""
+    combined = []
+    for location_id, outcome in zip(location_ids, outcomes):
+        if isinstance(outcome, Exception):
+            combined.append({'location_id': location_id, 'error': str(outcome)})
+        elif outcome and budget is not None:
+            combined.append(compact_location_details(outcome, location_id))
+        elif outcome:
+            combined.append(dict(location_id=location_id, **_location_details(outcome)))
+        else:
+            combined.append({'location_id': location_id, 'error': 'No location details found.'})
+    if budget is not None:
+        return compact_json(combined, budget)
+    return json.dumps(combined)
+
+
+def _unique_ids(location_ids):
+    return list(dict.fromkeys(str(location_id) for location_id in location_ids))
+
+
+def _format_directions(route, budget=None):
+    if route:
+        if budget is not None:
+            return compact_directions(route, budget)
+        leg = route.legs[0]
+        directions = {
+            'distance': leg.distance_text,
+            'duration': leg.duration_text,
+            'steps': [
+                {
+                    'instruction': step.instruction,
+                    'distance': step.distance_text,
+                    'duration': step.duration_text
+                }
+                for step in leg.steps
+            ]
+        }
+        
+        return json.dumps(directions, indent=2)
+    return "No directions found."
+
+
+def _format_travel_time_matrix(matrix, budget=None):
+    """Compact matrix for agents: minutes and kilometers, null where no route exists"""
+    if not any(v is not None for row in matrix['durations'] for v in row):
+        return "No travel times found."
+    
+    compact = {
+        'mode': matrix['mode'],
+        'origins': matrix['origins'],
+        'destinations': matrix['destinations'],
+        'minutes': [[round(v / 60) if v is not None else None for v in row] for row in matrix['durations']],
+        'km': [[round(v / 1000, 1) if v is not None else None for v in row] for row in matrix['distances']],
+    }
+    if budget is not None:
+        return json.dumps(compact, separators=(",", ":"))
+    return json.dumps(compact)
+
 
 class ApiManager:
     """Manages API calls and formats results for agent consumption"""
     
-    def __init__(self):
+    def __init__(self, output_mode=None):
         # Load API keys from environment variables
         self.yelp_api_key = os.environ.get("YELP_API_KEY")
         self.rapidapi_key = os.environ.get("RAPIDAPI_KEY")
         self.tripadvisor_api_key = os.environ.get("TRIPADVISOR_API_KEY")
         self.google_api_key = os.environ.get("GOOGLE_API_KEY")
+        # Shared pooled HTTP client used by every api/ module
+        self.client = get_client()
+        # Worker threads for fanning out independent provider calls
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get("API_MAX_WORKERS", 8)),
+            thread_name_prefix="api"
+        )
+        # In-process LRU+TTL memo for repeated calls within a session
+        self.memo = LRUCache()
+        # Persistent geocode cache and spatial index of every resolved place
+        self.geo = get_geo_store()
+        # "compact" results are projected tables within a per-tool token budget (TOOL_OUTPUT_MODE)
+        self.compact = (output_mode or default_output_mode()) == COMPACT
     
+    def _budget(self, tool):
+        """Token budget of a tool's result in compact mode, None in verbose mode"""
+        return token_budget(tool) if self.compact else None
+    
+    def cache_stats(self):
+        """Hit/miss counters of the in-process memo"""
+        return self.memo.stats()
+    
+    def coalescing_stats(self):
+        """Provider calls executed vs. shared with an identical call in flight"""
+        return coalescing_stats()
+    
+    def provider_status(self):
+        """Circuit breaker state (closed/open/half_open) of every provider called so far"""
+        return breaker_states()
+    
+    def geocode(self, address):
+        """(lat, lng) of an address or 'lat,lng' string, from the geocode cache when possible"""
+        coordinates = parse_lat_lng(address) or self.geo.get_geocode(address)
+        if coordinates:
+            return coordinates
+        resolved = _geocode_result(geocode_address(address, api_key=self.google_api_key))
+        if resolved is None:
+            return None
+        self.geo.set_geocode(address, *resolved)
+        return resolved[:2]
+    
+    def find_nearby(self, location, radius_m=1000, kind=None, limit=10):
+        """Places near a location answered from the local index, searching Google only when it has none"""
+        try:
+            coordinates = self.geocode(location)
+            if coordinates is None:
+                return f"Could not locate {location}."
+            
+            places = self.geo.nearby(*coordinates, radius_m=radius_m, kind=kind, limit=limit)
+            if not places:
+                results = search_places(
+                    location=f"{coordinates[0]},{coordinates[1]}",
+                    radius=radius_m,
+                    type=_PLACE_TYPES.get(kind),
+                    api_key=self.google_api_key
+                )
+                _index_places(self.geo, results, kind=kind or 'place')
+                places = self.geo.nearby(*coordinates, radius_m=radius_m, kind=kind, limit=limit)
+            return _format_nearby(location, places, self._budget("find_nearby"))
+        except Exception as e:
+            return f"Error finding nearby places: {str(e)}"
+    
+    def close(self):
+        """Release the pooled provider connections"""
+        self.executor.shutdown(wait=False)
+        self.client.close()
+    
+    def _gather(self, *calls):
+        """Run (func, kwargs) calls concurrently; failures come back as exceptions"""
+        # Run each call in a copy of the caller's context so per-tool-call metrics follow it
+        futures = [self.executor.submit(contextvars.copy_context().run, func, **kwargs) for func, kwargs in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    @memoized(cacheable=_is_result)
+    def search_hotels(self, location, checkin, checkout, adults=2, price_max=300, limit=8):
+        """Search Airbnb and Booking.com concurrently and return one merged, ranked list"""
+        airbnb_results, booking_results = self._gather(
+            (search_airbnb, dict(
+                location=location,
+                checkin=checkin,
+                checkout=checkout,
+                adults=adults,
+                pricemax=price_max,
+                totalrecords=limit,
+                rapidapi_key=self.rapidapi_key
+            )),
+            (search_booking_hotel, dict(
+                query=location,
+                arrival_date=checkin,
+                departure_date=checkout,
+                adults=adults,
+                page_number=1,
+                price_max=price_max,
+                rapidapi_key=self.rapidapi_key
+            )),
+        )
+        if isinstance(airbnb_results, Exception) and isinstance(booking_results, Exception):
+            return f"Error retrieving hotel data: {str(airbnb_results)}; {str(booking_results)}"
+        
+        hotels = merge_hotel_results(
+            _outcome(airbnb_results), _outcome(booking_results),
+            checkin, checkout, price_max=price_max, limit=limit
+        )
+        _index_hotels(self.geo, hotels)
+        note = _unavailable({"Airbnb": airbnb_results, "Booking.com": booking_results})
+        if self.compact:
+            return note + compact_hotels(hotels, self._budget("search_hotels"))
+        return note + display_hotel_results(hotels)
+    
+    @memoized(cacheable=_is_result)
     def search_hotels_airbnb(self, location, checkin, checkout, adults=2, price_max=300, total_records=5):
         """Search for Airbnb accommodations"""
         try:
@@ -31,12 +397,16 @@ class ApiManager:
                 rapidapi_key=self.rapidapi_key
             )
             
+            listings = parse_airbnb(results)
+            if results and self.compact:
+                return compact_airbnb(listings, self._budget("search_hotels_airbnb"))
             if results:
-                return display_airbnb_results(results)
+                return display_airbnb_results(listings)
             return "No Airbnb results found."
         except Exception as e:
             return f"Error retrieving Airbnb data: {str(e)}"
     
+    @memoized(cacheable=_is_result)
     def search_hotels_booking(self, location, checkin, checkout, adults=2, price_max=300, page_number=1):
         """Search for hotels on Booking.com"""
         try:
@@ -50,12 +420,16 @@ class ApiManager:
                 rapidapi_key=self.rapidapi_key
             )
             
+            listings = parse_booking(results, checkin, checkout)
+            if results and self.compact:
+                return compact_booking(listings, self._budget("search_hotels_booking"))
             if results:
-                return display_booking_results(results)
+                return display_booking_results(listings)
             return "No Booking.com results found."
         except Exception as e:
             return f"Error retrieving Booking.com data: {str(e)}"
     
+    @memoized(cacheable=_is_result)
     def search_restaurants(self, cuisine, location):
         """Search for restaurants using Yelp Fusion API"""
         try:
@@ -65,12 +439,17 @@ class ApiManager:
                 yelp_api_key=self.yelp_api_key
             )
             
+            restaurants = parse_restaurants(results)
+            _index_restaurants(self.geo, restaurants)
+            if results and self.compact:
+                return compact_restaurants(restaurants, restaurants_intro(results), self._budget("search_restaurants"))
             if results:
-                return display_yelp_fusion_results(results)
+                return display_yelp_fusion_results(restaurants, restaurants_intro(results))
             return "No restaurant results found."
         except Exception as e:
             return f"Error retrieving restaurant data: {str(e)}"
     
+    @memoized(cacheable=_is_result)
     def search_attractions(self, location, category=None, limit=10):
         """Search for attractions using TripAdvisor API"""
         try:
@@ -81,21 +460,11 @@ class ApiManager:
                 api_key=self.tripadvisor_api_key
             )
             
-            attractions = []
-            if results and 'data' in results:
-                for attraction in results['data']:
-                    attractions.append({
-                        'name': attraction.get('name', 'Unknown'),
-                        'location_id': attraction.get('location_id', ''),
-                        'location_string': attraction.get('location_string', ''),
-                        'category': attraction.get('category', {}).get('name', 'Unknown')
-                    })
-                
-                return json.dumps(attractions, indent=2)
-            return "No attraction results found."
+            return _format_attractions(parse_attractions(results), self._budget("search_attractions"))
         except Exception as e:
             return f"Error retrieving attraction data: {str(e)}"
     
+    @memoized(cacheable=_is_result)
     def get_location_details(self, location_id):
         """Get TripAdvisor location details"""
         try:
@@ -104,23 +473,36 @@ class ApiManager:
                 api_key=self.tripadvisor_api_key
             )
             
-            if results:
-                details = {
-                    'name': results.get('name', 'Unknown'),
-                    'description': results.get('description', 'No description available'),
-                    'web_url': results.get('web_url', ''),
-                    'address': results.get('address_obj', {}).get('address_string', 'Unknown'),
-                    'rating': results.get('rating', 'No rating'),
-                    'num_reviews': results.get('num_reviews', '0'),
-                    'price_level': results.get('price_level', 'Unknown'),
-                    'hours': results.get('hours', {}).get('weekday_text', [])
-                }
-                
-                return json.dumps(details, indent=2)
-            return "No location details found."
+            attraction = parse_attraction(results) if results else None
+            _index_location_details(self.geo, location_id, attraction)
+            return _format_location_details(attraction, self._budget("get_location_details"))
         except Exception as e:
             return f"Error retrieving location details: {str(e)}"
     
+    @memoized(cacheable=_is_details)
+    def _location_details_raw(self, location_id):
+        results = get_location_details(
+            location_id=location_id,
+            api_key=self.tripadvisor_api_key
+        )
+        attraction = parse_attraction(results) if results else None
+        _index_location_details(self.geo, location_id, attraction)
+        return attraction
+    
+    def get_location_details_batch(self, location_ids):
+        """
+        Get TripAdvisor details for many locations concurrently as one combined result
+        
+        Each location is memoized on its own, so failed lookups are retried on the next batch.
+        """
+        location_ids = _unique_ids(location_ids)
+        outcomes = self._gather(*[
+            (self._location_details_raw, dict(location_id=location_id))
+            for location_id in location_ids
+        ])
+        return _format_location_details_batch(location_ids, outcomes, self._budget("get_location_details_batch"))
+    
+    @memoized(cacheable=_is_result)
     def get_directions(self, origin, destination, mode="driving"):
         """Get directions using Google Maps API"""
         try:
@@ -131,22 +513,287 @@ class ApiManager:
                 api_key=self.google_api_key
             )
             
-            if results and 'routes' in results and results['routes']:
-                route = results['routes'][0]
-                directions = {
-                    'distance': route['legs'][0]['distance']['text'],
-                    'duration': route['legs'][0]['duration']['text'],
-                    'steps': []
-                }
-                
-                for step in route['legs'][0]['steps']:
-                    directions['steps'].append({
-                        'instruction': step['html_instructions'],
-                        'distance': step['distance']['text'],
-                        'duration': step['duration']['text']
-                    })
-                
-                return json.dumps(directions, indent=2)
-            return "No directions found."
-        except Exception as e:
-            return f"Error retrieving directions: {str(e)}"
\ No newline at end of file
+            route = parse_route(results)
+            _index_directions(self.geo, origin, destination, route)
+            return _format_directions(route, self._budget("get_directions"))
+        except Exception as e:
+            return f"Error retrieving directions: {str(e)}"
+    
+    def travel_time_matrix(self, origins, destinations=None, mode="driving"):
+        """Raw duration (seconds) / distance (meters) matrix; destinations default to origins"""
+        return get_travel_time_matrix(
+            origins=list(origins),
+            destinations=list(destinations or origins),
+            mode=mode,
+            api_key=self.google_api_key
+        )
+    
+    @memoized(cacheable=_is_result)
+    def get_travel_time_matrix(self, origins, destinations=None, mode="driving"):
+        """Get travel times between many places in one batched Distance Matrix call"""
+        try:
+            return _format_travel_time_matrix(
+                self.travel_time_matrix(origins, destinations, mode), self._budget("get_travel_time_matrix")
+            )
+        except Exception as e:
+            return f"Error retrieving travel times: {str(e)}"
+
+
+class AsyncApiManager:
+    """Non-blocking ApiManager: same methods and results, awaited on one event loop"""
+    
+    def __init__(self, output_mode=None):
+        # Load API keys from environment variables
+        self.yelp_api_key = os.environ.get("YELP_API_KEY")
+        self.rapidapi_key = os.environ.get("RAPIDAPI_KEY")
+        self.tripadvisor_api_key = os.environ.get("TRIPADVISOR_API_KEY")
+        self.google_api_key = os.environ.get("GOOGLE_API_KEY")
+        # In-process LRU+TTL memo for repeated calls within a session
+        self.memo = LRUCache()
+        # Persistent geocode cache and spatial index of every resolved place; its sqlite I/O runs in worker threads
+        self.geo = get_geo_store()
+        # "compact" results are projected tables within a per-tool token budget (TOOL_OUTPUT_MODE)
+        self.compact = (output_mode or default_output_mode()) == COMPACT
+    
+    def _budget(self, tool):
+        """Token budget of a tool's result in compact mode, None in verbose mode"""
+        return token_budget(tool) if self.compact else None
+    
+    def cache_stats(self):
+        """Hit/miss counters of the in-process memo"""
+        return self.memo.stats()
+    
+    def coalescing_stats(self):
+        """Provider calls executed vs. shared with an identical call in flight"""
+        return coalescing_stats()
+    
+    def provider_status(self):
+        """Circuit breaker state (closed/open/half_open) of every provider called so far"""
+        return breaker_states()
+    
+    async def geocode(self, address):
+        """(lat, lng) of an address or 'lat,lng' string, from the geocode cache when possible"""
+        coordinates = parse_lat_lng(address) or await asyncio.to_thread(self.geo.get_geocode, address)
+        if coordinates:
+            return coordinates
+        resolved = _geocode_result(await geocode_address_async(address, api_key=self.google_api_key))
+        if resolved is None:
+            return None
+        await asyncio.to_thread(self.geo.set_geocode, address, *resolved)
+        return resolved[:2]
+    
+    async def find_nearby(self, location, radius_m=1000, kind=None, limit=10):
+        """Places near a location answered from the local index, searching Google only when it has none"""
+        try:
+            coordinates = await self.geocode(location)
+            if coordinates is None:
+                return f"Could not locate {location}."
+            
+            places = self.geo.nearby(*coordinates, radius_m=radius_m, kind=kind, limit=limit)
+            if not places:
+                results = await search_places_async(
+                    location=f"{coordinates[0]},{coordinates[1]}",
+                    radius=radius_m,
+                    type=_PLACE_TYPES.get(kind),
+                    api_key=self.google_api_key
+                )
+                await asyncio.to_thread(_index_places, self.geo, results, kind=kind or 'place')
+                places = self.geo.nearby(*coordinates, radius_m=radius_m, kind=kind, limit=limit)
+            return _format_nearby(location, places, self._budget("find_nearby"))
+        except Exception as e:
+            return f"Error finding nearby places: {str(e)}"
+    
+    async def aclose(self):
+        """Release the pooled async connections of the running event loop"""
+        await get_async_client().aclose()
+    
+    @memoized(cacheable=_is_result)
+    async def search_hotels(self, location, checkin, checkout, adults=2, price_max=300, limit=8):
+        """Search Airbnb and Booking.com concurrently and return one merged, ranked list"""
+        airbnb_results, booking_results = await asyncio.gather(
+            search_airbnb_async(
+                location=location,
+                checkin=checkin,
+                checkout=checkout,
+                adults=adults,
+                pricemax=price_max,
+                totalrecords=limit,
+                rapidapi_key=self.rapidapi_key
+            ),
+            search_booking_hotel_async(
+                query=location,
+                arrival_date=checkin,
+                departure_date=checkout,
+                adults=adults,
+                page_number=1,
+                price_max=price_max,
+                rapidapi_key=self.rapidapi_key
+            ),
+            return_exceptions=True
+        )
+        if isinstance(airbnb_results, Exception) and isinstance(booking_results, Exception):
+            return f"Error retrieving hotel data: {str(airbnb_results)}; {str(booking_results)}"
+        
+        hotels = merge_hotel_results(
+            _outcome(airbnb_results), _outcome(booking_results),
+            checkin, checkout, price_max=price_max, limit=limit
+        )
+        await asyncio.to_thread(_index_hotels, self.geo, hotels)
+        note = _unavailable({"Airbnb": airbnb_results, "Booking.com": booking_results})
+        if self.compact:
+            return note + compact_hotels(hotels, self._budget("search_hotels"))
+        return note + display_hotel_results(hotels)
+    
+    @memoized(cacheable=_is_result)
+    async def search_hotels_airbnb(self, location, checkin, checkout, adults=2, price_max=300, total_records=5):
+        """Search for Airbnb accommodations"""
+        try:
+            results = await search_airbnb_async(
+                location=location,
+                checkin=checkin,
+                checkout=checkout,
+                adults=adults,
+                pricemax=price_max,
+                totalrecords=total_records,
+                rapidapi_key=self.rapidapi_key
+            )
+            
+            listings = parse_airbnb(results)
+            if results and self.compact:
+                return compact_airbnb(listings, self._budget("search_hotels_airbnb"))
+            if results:
+                return display_airbnb_results(listings)
+            return "No Airbnb results found."
+        except Exception as e:
+            return f"Error retrieving Airbnb data: {str(e)}"
+    
+    @memoized(cacheable=_is_result)
+    async def search_hotels_booking(self, location, checkin, checkout, adults=2, price_max=300, page_number=1):
+        """Search for hotels on Booking.com"""
+        try:
+            results = await search_booking_hotel_async(
+                query=location,
+                arrival_date=checkin,
+                departure_date=checkout,
+                adults=adults,
+                page_number=page_number,
+                price_max=price_max,
+                rapidapi_key=self.rapidapi_key
+            )
+            
+            listings = parse_booking(results, checkin, checkout)
+            if results and self.compact:
+                return compact_booking(listings, self._budget("search_hotels_booking"))
+            if results:
+                return display_booking_results(listings)
+            return "No Booking.com results found."
+        except Exception as e:
+            return f"Error retrieving Booking.com data: {str(e)}"
+    
+    @memoized(cacheable=_is_result)
+    async def search_restaurants(self, cuisine, location):
+        """Search for restaurants using Yelp Fusion API"""
+        try:
+            results = await search_yelp_fusion_restaurants_async(
+                food_category=cuisine,
+                location=location,
+                yelp_api_key=self.yelp_api_key
+            )
+            
+            restaurants = parse_restaurants(results)
+            await asyncio.to_thread(_index_restaurants, self.geo, restaurants)
+            if results and self.compact:
+                return compact_restaurants(restaurants, restaurants_intro(results), self._budget("search_restaurants"))
+            if results:
+                return display_yelp_fusion_results(restaurants, restaurants_intro(results))
+            return "No restaurant results found."
+        except Exception as e:
+            return f"Error retrieving restaurant data: {str(e)}"
+    
+    @memoized(cacheable=_is_result)
+    async def search_attractions(self, location, category=None, limit=10):
+        """Search for attractions using TripAdvisor API"""
+        try:
+            results = await search_attractions_async(
+                location=location,
+                category=category,
+                limit=limit,
+                api_key=self.tripadvisor_api_key
+            )
+            
+            return _format_attractions(parse_attractions(results), self._budget("search_attractions"))
+        except Exception as e:
+            return f"Error retrieving attraction data: {str(e)}"
+    
+    @memoized(cacheable=_is_result)
+    async def get_location_details(self, location_id):
+        """Get TripAdvisor location details"""
+        try:
+            results = await get_location_details_async(
+                location_id=location_id,
+                api_key=self.tripadvisor_api_key
+            )
+            
+            attraction = parse_attraction(results) if results else None
+            await asyncio.to_thread(_index_location_details, self.geo, location_id, attraction)
+            return _format_location_details(attraction, self._budget("get_location_details"))
+        except Exception as e:
+            return f"Error retrieving location details: {str(e)}"
+    
+    @memoized(cacheable=_is_details)
+    async def _location_details_raw(self, location_id):
+        results = await get_location_details_async(
+            location_id=location_id,
+            api_key=self.tripadvisor_api_key
+        )
+        attraction = parse_attraction(results) if results else None
+        await asyncio.to_thread(_index_location_details, self.geo, location_id, attraction)
+        return attraction
+    
+    async def get_location_details_batch(self, location_ids):
+        """
+        Get TripAdvisor details for many locations concurrently as one combined result
+        
+        Each location is memoized on its own, so failed lookups are retried on the next batch.
+        """
+        location_ids = _unique_ids(location_ids)
+        outcomes = await asyncio.gather(*[
+            self._location_details_raw(location_id) for location_id in location_ids
+        ], return_exceptions=True)
+        return _format_location_details_batch(location_ids, outcomes, self._budget("get_location_details_batch"))
+    
+    @memoized(cacheable=_is_result)
+    async def get_directions(self, origin, destination, mode="driving"):
+        """Get directions using Google Maps API"""
+        try:
+            results = await get_directions_async(
+                origin=origin,
+                destination=destination,
+                mode=mode,
+                api_key=self.google_api_key
+            )
+            
+            route = parse_route(results)
+            await asyncio.to_thread(_index_directions, self.geo, origin, destination, route)
+            return _format_directions(route, self._budget("get_directions"))
+        except Exception as e:
+            return f"Error retrieving directions: {str(e)}"
+    
+    async def travel_time_matrix(self, origins, destinations=None, mode="driving"):
+        """Raw duration (seconds) / distance (meters) matrix; destinations default to origins"""
+        return await get_travel_time_matrix_async(
+            origins=list(origins),
+            destinations=list(destinations or origins),
+            mode=mode,
+            api_key=self.google_api_key
+        )
+    
+    @memoized(cacheable=_is_result)
+    async def get_travel_time_matrix(self, origins, destinations=None, mode="driving"):
+        """Get travel times between many places in one batched Distance Matrix call"""
+        try:
+            return _format_travel_time_matrix(
+                await self.travel_time_matrix(origins, destinations, mode), self._budget("get_travel_time_matrix")
+            )
+        except Exception as e:
+            return f"Error retrieving travel times: {str(e)}"
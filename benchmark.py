@@ -0,0 +1,350 @@
+# ai-trip-planner-agents/benchmark.py
+
+"""
+End-to-end planning benchmark.
+
+Runs full itineraries through the trip_planner build/run flow without a
+human in the loop, against the local stand-in server (stub_server.py) for
+both the LLM and every travel provider, and reports per scenario:
+
+- wall time per layer (Area, City, Within-City, plus orchestrator/user),
+  split into speaker selection and agent reply time
+- group chat rounds and LLM requests
+- tool calls, tool latency and bytes of tool output per tool name
+- provider requests that reached the stand-in server
+
+Results are written as JSON so two versions can be compared with --compare.
+
+Usage:
+    python benchmark.py [--scenarios FILE.jsonl] [--rounds 30] [--repeat 1]
+                        [--latency 0.05] [--llm-latency 0.3] [--warm]
+                        [--output benchmark_results.json] [--compare OLD.json]
+"""
+
+import io
+import os
+import logging
+import warnings
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import contextlib
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+from stub_server import StubServer
+
+CONFIGS_DIR = Path(__file__).resolve().parent / "configs"
+
+# Layer keys of agent_config_main.yaml and how results name them
+LAYERS = {
+    "area_layer": "Area",
+    "city_layer": "City",
+    "within_city_layer": "Within-City",
+}
+
+SCENARIOS = [
+    {
+        "name": "paris_weekend",
+        "message": "Plan a 3-day trip to Paris in early June for two adults, mid-range budget, "
+                   "focused on museums and food. Follow the layered approach and use the APIs.",
+    },
+    {
+        "name": "japan_two_cities",
+        "message": "Plan a 7-day trip to Tokyo and Kyoto in April for a couple. We like temples, "
+                   "street food and walking. Budget about 250 USD per night for hotels.",
+    },
+    {
+        "name": "italy_road_trip",
+        "message": "Plan a 10-day trip through Rome, Florence and Venice in September for a family "
+                   "of four, with one museum per day and easy transport between cities.",
+    },
+]
+
+
+def load_scenarios(path: Optional[str]) -> List[Dict[str, str]]:
+    """
+    Scenarios from a JSONL file, or the built-in set.
+
+    Each line is an object with the prompt under "message", "prompt" or
+    "body" and an optional "name" (or "request_id"/"title").
+    """
+    if not path:
+        return SCENARIOS
+    scenarios = []
+    with open(path, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            if line.strip():
+                item = json.loads(line)
+                name = item.get("name") or item.get("request_id") or item.get("title") or f"scenario_{i}"
+                message = item.get("message") or item.get("prompt") or item["body"]
+                scenarios.append({"name": name, "message": message})
+    return scenarios
+
+
+def agent_layers(config: Dict[str, Any]) -> Dict[str, str]:
+    """Map each agent name to the layer it belongs to."""
+    layers = {"User": "User"}
+    planner = config["travel_planner_agents"]
+    for key, label in LAYERS.items():
+        for agent in planner.get(key, {}).values():
+            if isinstance(agent, dict) and "name" in agent:
+                layers[agent["name"]] = label
+    layers[planner["orchestrator"]["name"]] = "Orchestrator"
+    # Runs the Within-City layer in per-city sub-conversations
+    layers["WithinCityPlanner"] = "Within-City"
+    return layers
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    """Collects timings and tool statistics of one planning run."""
+
+    def __init__(self, layers: Dict[str, str]):
+        self.layers = layers
+        self.layer_stats = defaultdict(lambda: {"wall_s": 0.0, "selection_s": 0.0, "reply_s": 0.0, "rounds": 0})
+        self.tools = defaultdict(lambda: {"calls": 0, "errors": 0, "wall_s": 0.0, "output_bytes": 0})
+        self._reply_started = None
+        self._selected = None
+
+    def layer(self, speaker) -> str:
+        return self.layers.get(getattr(speaker, "name", None), "Other")
+
+    def instrument(self, groupchat, user_proxy):
+        """Wrap speaker selection, message appends and every tool function."""
+        select_speaker, append = groupchat.select_speaker, groupchat.append
+
+        def timed_select_speaker(last_speaker, selector):
+            started = time.perf_counter()
+            speaker = select_speaker(last_speaker, selector)
+            now = time.perf_counter()
+            stats = self.layer_stats[self.layer(speaker)]
+            stats["selection_s"] += now - started
+            stats["wall_s"] += now - started
+            self._reply_started, self._selected = now, speaker
+            return speaker
+
+        def timed_append(message, speaker):
+            if self._reply_started is not None and speaker is self._selected:
+                elapsed = time.perf_counter() - self._reply_started
+                stats = self.layer_stats[self.layer(speaker)]
+                stats["reply_s"] += elapsed
+                stats["wall_s"] += elapsed
+                stats["rounds"] += 1
+                self._reply_started = None
+            return append(message, speaker)
+
+        groupchat.select_speaker = timed_select_speaker
+        groupchat.append = timed_append
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # overriding the tools on purpose
+            user_proxy.register_function({
+                name: self._timed_tool(name, func) for name, func in user_proxy.function_map.items()
+            })
+
+    def _timed_tool(self, name, func):
+        def wrapper(*args, **kwargs):
+            stats = self.tools[name]
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                stats["errors"] += 1
+                raise
+            finally:
+                stats["calls"] += 1
+                stats["wall_s"] += time.perf_counter() - started
+            content = result if isinstance(result, str) else json.dumps(result, default=str)
+            stats["output_bytes"] += len(content.encode("utf-8"))
+            if isinstance(result, dict) and "error" in result:
+                stats["errors"] += 1
+            return result
+        return wrapper
+
+    def report(self) -> Dict[str, Any]:
+        def rounded(stats):
+            return {k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()}
+
+        return {
+            "layers": {name: rounded(stats) for name, stats in sorted(self.layer_stats.items())},
+            "tools": {name: rounded(stats) for name, stats in sorted(self.tools.items())},
+            "tool_calls": sum(t["calls"] for t in self.tools.values()),
+            "tool_output_bytes": sum(t["output_bytes"] for t in self.tools.values()),
+        }
+
+
+def stub_environment(latency: float, llm_latency: float) -> StubServer:
+    """
+    Point this process at a fresh stand-in server with throwaway caches.
+
+    Must run before trip_planner is imported. Returns the (not yet started) server.
+    """
+    # The stand-in model has no price entry; keep autogen's cost warnings out of the report
+    logging.getLogger("autogen.oai.client").setLevel(logging.ERROR)
+    workdir = tempfile.mkdtemp(prefix="trip-bench-")
+    os.environ.update({
+        "API_CACHE_PATH": os.path.join(workdir, "api_responses.sqlite3"),
+        "GEO_CACHE_PATH": os.path.join(workdir, "geo.sqlite3"),
+        "BOOKING_DEST_INDEX_PATH": os.path.join(workdir, "booking_destinations.json"),
+    })
+    for key in ("OPENAI_API_KEY", "GOOGLE_MAPS_API_KEY", "TRIPADVISOR_API_KEY", "RAPIDAPI_KEY", "YELP_API_KEY"):
+        os.environ.setdefault(key, "stub")
+
+    server = StubServer(latency={"*": latency, "openai": llm_latency}, seed=0)
+    os.environ.update(server.env())
+    return server
+
+
+def _reset_caches():
+    """Start a scenario cold: drop the response cache and the planner's memo."""
+    from api.cache import get_cache
+    import trip_planner
+
+    get_cache().clear()
+    trip_planner.api_manager.memo.clear()
+
+
+def run_scenario(scenario: Dict[str, str], server: StubServer, rounds: int, verbose: bool = False) -> Dict[str, Any]:
+    """Plan one itinerary end to end and return its measurements."""
+    import trip_planner
+
+    recorders = []
+
+    def setup(config, agents, groupchat):
+        recorders.append(Recorder(agent_layers(config)))
+        recorders[0].instrument(groupchat, agents["user_proxy"])
+
+    config, agents, groupchat, manager = trip_planner.build_planner(
+        configs_dir=str(CONFIGS_DIR),
+        human_input_mode="NEVER",
+        max_round=rounds,
+        llm_overrides={"cache_seed": None},
+        setup=setup,
+    )
+    recorder = recorders[0]
+
+    before = server.stats()["requests"]
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with output:
+        trip_planner.run_planner(agents, manager, scenario["message"])
+    wall = time.perf_counter() - started
+    after = server.stats()["requests"]
+
+    requests_made = {p: after.get(p, 0) - before.get(p, 0) for p in after if after.get(p, 0) - before.get(p, 0)}
+    result = {
+        "name": scenario["name"],
+        "wall_s": round(wall, 4),
+        "rounds": len(groupchat.messages),
+        "llm_requests": requests_made.pop("openai", 0),
+        "provider_requests": requests_made,
+    }
+    result.update(recorder.report())
+    return result
+
+
+def _median_run(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Pick the run with the median wall time and attach the spread."""
+    ordered = sorted(runs, key=lambda r: r["wall_s"])
+    result = dict(ordered[len(ordered) // 2])
+    if len(runs) > 1:
+        result["wall_s_runs"] = [r["wall_s"] for r in runs]
+    return result
+
+
+def summarize(scenarios: List[Dict[str, Any]]) -> Dict[str, Any]:
+    totals = {"wall_s": 0.0, "rounds": 0, "llm_requests": 0, "tool_calls": 0, "tool_output_bytes": 0, "layers": {}}
+    for scenario in scenarios:
+        for key in ("wall_s", "rounds", "llm_requests", "tool_calls", "tool_output_bytes"):
+            totals[key] += scenario[key]
+        for layer, stats in scenario["layers"].items():
+            totals["layers"][layer] = round(totals["layers"].get(layer, 0.0) + stats["wall_s"], 4)
+    totals["wall_s"] = round(totals["wall_s"], 4)
+    return totals
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Human-readable deltas of the headline metrics against a previous result file."""
+    lines = [f"Compared with {baseline.get('git_commit') or 'baseline'}:"]
+    old_scenarios = {s["name"]: s for s in baseline.get("scenarios", [])}
+    for scenario in current["scenarios"]:
+        old = old_scenarios.get(scenario["name"])
+        if old is None:
+            continue
+        parts = []
+        for key in ("wall_s", "rounds", "llm_requests", "tool_calls", "tool_output_bytes"):
+            new_value, old_value = scenario[key], old.get(key, 0)
+            change = f" ({(new_value - old_value) / old_value:+.0%})" if old_value else ""
+            parts.append(f"{key} {old_value} -> {new_value}{change}")
+        lines.append(f"  {scenario['name']}: " + ", ".join(parts))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end trip planning benchmark against stubbed backends")
+    parser.add_argument("--scenarios", help="JSONL file of {\"name\", \"message\"} scenarios")
+    parser.add_argument("--rounds", type=int, default=30, help="Group chat max_round per scenario")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the median run is reported")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean provider latency in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Mean LLM latency in seconds")
+    parser.add_argument("--warm", action="store_true", help="Keep caches between scenarios and runs")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent conversation")
+    args = parser.parse_args()
+
+    server = stub_environment(args.latency, args.llm_latency)
+    scenarios = load_scenarios(args.scenarios)
+
+    results = []
+    with server:
+        for scenario in scenarios:
+            runs = []
+            for _ in range(args.repeat):
+                if not args.warm:
+                    _reset_caches()
+                runs.append(run_scenario(scenario, server, args.rounds, args.verbose))
+            results.append(_median_run(runs))
+            print(f"{scenario['name']}: {results[-1]['wall_s']:.2f}s, "
+                  f"{results[-1]['rounds']} rounds, {results[-1]['tool_calls']} tool calls", file=sys.stderr)
+
+    import autogen
+    report = {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "autogen": getattr(autogen, "__version__", None),
+        "settings": {
+            "rounds": args.rounds,
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "llm_latency": args.llm_latency,
+            "warm": args.warm,
+        },
+        "scenarios": results,
+        "totals": summarize(results),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print("\n".join(compare(report, json.load(f))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# ai-trip-planner-agents/context_window.py
+
+import os
+import re
+import json
+import threading
+from typing import Dict, List, Any, Optional, Iterable
+
+import autogen
+
+from api.compact import estimate_tokens, truncate
+
+# Prompt budget of one agent, unless CONTEXT_TOKEN_BUDGET(_<AGENT>) says otherwise
+DEFAULT_CONTEXT_BUDGET = 4000
+
+# Share of the budget the rolling summary may take
+SUMMARY_SHARE = 0.25
+
+# Longest line of the rolling summary
+SUMMARY_LINE_CHARS = 120
+
+
+def context_budget(agent_name: str) -> int:
+    """Prompt budget of an agent: CONTEXT_TOKEN_BUDGET_<AGENT>, else CONTEXT_TOKEN_BUDGET."""
+    value = os.environ.get(f"CONTEXT_TOKEN_BUDGET_{agent_name.upper()}") or os.environ.get("CONTEXT_TOKEN_BUDGET")
+    return int(value) if value else DEFAULT_CONTEXT_BUDGET
+
+
+def _tokens(message: Dict[str, Any]) -> int:
+    text = str(message.get("content") or "")
+    if message.get("function_call"):
+        text += json.dumps(message["function_call"], default=str)
+    return estimate_tokens(text)
+
+
+def _summary_line(message: Dict[str, Any]) -> str:
+    name = message.get("name") or message.get("role")
+    call = message.get("function_call")
+    if call:
+        return f"- {name} called {call.get('name')}({truncate(call.get('arguments'), 60)})"
+    content = str(message.get("content") or "")
+    if message.get("role") in ("function", "tool"):
+        return f"- {name} returned {len(content)} chars: {truncate(content, 60)}"
+    return f"- {name}: {truncate(content, SUMMARY_LINE_CHARS)}"
+
+
+class ContextWindow:
+    """
+    Per-agent prompt pruning, registered as a process_all_messages_before_reply hook.
+
+    The shared transcript stays whole; each LLM call of the agent is sent a
+    view of it that fits the agent's token budget:
+
+    - the opening request and the traveler's own messages,
+    - the latest verified output of every layer (each agent's last answer
+      before its verification agent confirmed with "Verified"), plus the
+      output of agents listed in `pinned`,
+    - as many of the most recent messages as the rest of the budget allows,
+    - a rolling one-line-per-message summary of everything else.
+
+    Summary lines and verified outputs are worked out once per message, as
+    the transcript grows.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        layers: Dict[str, List[str]],
+        pinned: Iterable[str] = (),
+        user: str = "User",
+        verified_pattern: Optional[str] = None
+    ):
+        """
+        Args:
+            budget: Prompt tokens the agent may be sent
+            layers: Agents each verification agent verifies, by verifier name
+            pinned: Agents whose latest output is always kept
+            user: Name of the traveler's messages
+            verified_pattern: Verdict that accepts a layer (as in speaker_selection.yaml)
+        """
+        self.budget = budget
+        self.layers = layers
+        self.pinned = set(pinned)
+        self.user = user
+        self.verified = re.compile(verified_pattern or r"^\W*verified\b", re.IGNORECASE | re.MULTILINE)
+        self._lock = threading.Lock()
+        self._reset()
+        self.prompts = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def _reset(self):
+        self._seen = 0
+        self._first: Optional[Dict[str, Any]] = None
+        self._last: Optional[Dict[str, Any]] = None
+        self._lines: List[str] = []
+        self._latest: Dict[str, int] = {}
+        self._keep: Dict[str, List[int]] = {}
+        self._user: List[int] = []
+
+    def _scan(self, messages: List[Dict[str, Any]]):
+        """Take in the messages added since the last call."""
+        if self._seen and (
+            len(messages) < self._seen
+            or messages[0] is not self._first
+            or messages[self._seen - 1] is not self._last
+        ):
+            # A new chat, such as each of LayerScheduler's turns and reruns,
+            # even when it is at least as long as the last one
+            self._reset()
+        for index in range(self._seen, len(messages)):
+            message = messages[index]
+            self._lines.append(_summary_line(message))
+            name = message.get("name")
+            if not message.get("content") or message.get("function_call") or message.get("role") in ("function", "tool"):
+                continue
+            if name == self.user and index > 0:
+                self._user.append(index)
+            self._latest[name] = index
+            if name in self.pinned:
+                self._keep[name] = [index]
+            elif name in self.layers and self.verified.search(str(message["content"])):
+                outputs = [self._latest[agent] for agent in self.layers[name] if agent in self._latest]
+                self._keep[name] = outputs + [index]
+        self._seen = len(messages)
+        if messages:
+            self._first, self._last = messages[0], messages[-1]
+
+    def _summary(self, dropped: List[int]) -> Optional[Dict[str, Any]]:
+        if not dropped:
+            return None
+        budget = int(self.budget * SUMMARY_SHARE)
+        lines, used = [], 0
+        # Most recent first, so older lines are the ones left out
+        for index in reversed(dropped):
+            cost = estimate_tokens(self._lines[index])
+            if used + cost > budget:
+                break
+            lines.append(self._lines[index])
+            used += cost
+        lines.reverse()
+        header = f"Summary of {len(dropped)} earlier messages left out of this prompt"
+        if len(lines) < len(dropped):
+            header += f" ({len(dropped) - len(lines)} oldest not listed)"
+        return {"role": "user", "name": "ContextSummary", "content": header + ":\n" + "\n".join(lines)}
+
+    def __call__(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._scan(messages)
+            total = sum(_tokens(m) for m in messages)
+            self.prompts += 1
+            self.tokens_in += total
+            if total <= self.budget:
+                self.tokens_out += total
+                return messages
+
+            keep = {0, *self._user, *(i for indexes in self._keep.values() for i in indexes)}
+            used = sum(_tokens(messages[i]) for i in keep) + int(self.budget * SUMMARY_SHARE)
+            # The most recent messages, always at least the last one
+            start = len(messages)
+            while start > 1 and (start == len(messages) or used + _tokens(messages[start - 1]) <= self.budget):
+                start -= 1
+                if start not in keep:
+                    used += _tokens(messages[start])
+            # A function result is not sent without the call it answers
+            while start < len(messages) - 1 and messages[start].get("role") in ("function", "tool"):
+                start += 1
+            keep.update(range(start, len(messages)))
+
+            dropped = [i for i in range(len(messages)) if i not in keep]
+            view = [messages[0]]
+            summary = self._summary(dropped)
+            if summary:
+                view.append(summary)
+            view += [messages[i] for i in sorted(keep) if i > 0]
+            self.tokens_out += sum(_tokens(m) for m in view)
+            return view
+
+    def stats(self) -> Dict[str, int]:
+        """Prompts pruned so far, with their tokens before and after."""
+        with self._lock:
+            return {"prompts": self.prompts, "tokens_in": self.tokens_in, "tokens_out": self.tokens_out}
+
+
+def verified_layers(config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Agents each layer's verification agent verifies, by verifier name."""
+    layers = {}
+    for layer in config["travel_planner_agents"].values():
+        verifier = (layer.get("verification_agent") or {}).get("name")
+        if verifier:
+            layers[verifier] = [
+                entry["name"] for key, entry in layer.items()
+                if key != "verification_agent" and isinstance(entry, dict) and "name" in entry
+            ]
+    return layers
+
+
+def register_context_windows(
+    agents: Dict[str, autogen.Agent],
+    config: Dict[str, Any],
+    pinned: Iterable[str] = ()
+) -> Dict[str, ContextWindow]:
+    """
+    Prune the prompts of every LLM agent to its context budget.
+
+    CONTEXT_WINDOW=off leaves prompts whole.
+
+    Returns:
+        The registered windows by agent name
+    """
+    if os.environ.get("CONTEXT_WINDOW", "on").lower() in ("off", "0"):
+        return {}
+    layers = verified_layers(config)
+    verified_pattern = (config.get("speaker_selection") or {}).get("verified_pattern")
+    windows = {}
+    for agent in agents.values():
+        if not isinstance(agent, autogen.ConversableAgent) or not agent.llm_config:
+            continue
+        windows[agent.name] = ContextWindow(
+            context_budget(agent.name), layers, pinned=pinned, verified_pattern=verified_pattern
+        )
+        agent.register_hook("process_all_messages_before_reply", windows[agent.name])
+    return windows
@@ -0,0 +1,157 @@
+# ai-trip-planner-agents/layer_scheduler.py
+
+import re
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Optional
+
+import autogen
+
+from api.tracing import span
+
+# Function calls one agent may make before it has to answer; an agent still
+# calling functions after that fails its turn (and with it the layer run)
+MAX_FUNCTION_CALLS = 5
+
+
+def layer_stages(layer: Dict[str, Any]) -> List[List[str]]:
+    """
+    Agents of a layer config grouped into stages by their declared `inputs`.
+
+    Every agent of a stage only needs outputs of earlier stages; the stages
+    give the order of the layer's transcript (config order within a stage).
+
+    Raises:
+        ValueError: if an input is not an agent of the layer, or inputs form a cycle
+    """
+    inputs = {
+        entry["name"]: list(entry.get("inputs") or [])
+        for entry in layer.values()
+        if isinstance(entry, dict) and "name" in entry
+    }
+    for name, needs in inputs.items():
+        unknown = [need for need in needs if need not in inputs]
+        if unknown:
+            raise ValueError(f"{name} has inputs outside its layer: {', '.join(unknown)}")
+    stages, done = [], set()
+    while len(done) < len(inputs):
+        stage = [name for name, needs in inputs.items() if name not in done and set(needs) <= done]
+        if not stage:
+            raise ValueError(f"Cyclic inputs among: {', '.join(n for n in inputs if n not in done)}")
+        stages.append(stage)
+        done.update(stage)
+    return stages
+
+
+def declares_inputs(layer: Dict[str, Any]) -> bool:
+    return any(isinstance(entry, dict) and "inputs" in entry for entry in layer.values())
+
+
+class LayerScheduler:
+    """
+    Runs one layer's agents as a dependency graph instead of taking turns.
+
+    Each agent sees the brief and the final outputs of its declared inputs,
+    and starts as soon as those are in, so independent agents run at the
+    same time and the verification agent runs once all of its inputs have
+    joined. A rejected verdict reruns the layer with the verifier's feedback
+    added to the brief.
+    """
+
+    def __init__(
+        self,
+        layer: Dict[str, Any],
+        agents: Dict[str, autogen.ConversableAgent],
+        executor: autogen.ConversableAgent,
+        verified_pattern: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_attempts: int = 2,
+        max_messages: Optional[int] = None
+    ):
+        """
+        Args:
+            layer: Layer config whose agents declare `inputs`
+            agents: The layer's agents by name
+            executor: Agent that executes their function calls
+            verified_pattern: Verdict that accepts the layer (as in speaker_selection.yaml)
+            max_workers: Agents run at once (default: all of them)
+            max_attempts: Runs of the layer before a rejected plan is returned as is
+            max_messages: No rerun starts once the transcript has this many messages
+        """
+        self.stages = layer_stages(layer)
+        self.inputs = {
+            entry["name"]: list(entry.get("inputs") or [])
+            for entry in layer.values()
+            if isinstance(entry, dict) and "name" in entry
+        }
+        self.verifier = (layer.get("verification_agent") or {}).get("name")
+        self.agents = agents
+        self.executor = executor
+        self.verified = re.compile(verified_pattern or r"^\W*verified\b", re.IGNORECASE | re.MULTILINE)
+        self.max_workers = max_workers or len(self.inputs)
+        self.max_attempts = max_attempts
+        self.max_messages = max_messages
+
+    def _turn(self, name: str, brief: str, outputs: Dict[str, str]) -> List[Dict[str, Any]]:
+        """One agent's reply to the brief and its inputs, function calls included."""
+        agent = self.agents[name]
+        messages = [{"role": "user", "name": "User", "content": brief}]
+        messages += [{"role": "user", "name": need, "content": outputs[need]} for need in self.inputs[name]]
+        transcript = []
+        with span("layer.agent", agent=name) as agent_span:
+            for calls in range(MAX_FUNCTION_CALLS + 1):
+                reply = agent.generate_reply(messages=messages, sender=self.executor)
+                message = reply if isinstance(reply, dict) else {"content": reply}
+                message = {**message, "role": "assistant", "name": name}
+                messages.append(message)
+                transcript.append(message)
+                if not message.get("function_call"):
+                    break
+                if calls == MAX_FUNCTION_CALLS:
+                    # A function result is no answer; dependants must not take one as this agent's output
+                    raise RuntimeError(f"{name} was still calling functions after {MAX_FUNCTION_CALLS} calls")
+                result = self.executor.generate_reply(messages=messages, sender=agent)
+                result = result if isinstance(result, dict) else {"role": "function", "content": result}
+                messages.append(result)
+                transcript.append(result)
+            agent_span.set("messages", len(transcript))
+        return transcript
+
+    def _run_once(self, brief: str) -> Dict[str, List[Dict[str, Any]]]:
+        transcripts: Dict[str, List[Dict[str, Any]]] = {}
+        outputs: Dict[str, str] = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="layer") as pool:
+            while len(transcripts) < len(self.inputs):
+                for name, needs in self.inputs.items():
+                    if name not in transcripts and name not in running.values() and set(needs) <= outputs.keys():
+                        # Each agent runs in a copy of this context so its spans nest under the layer
+                        future = pool.submit(contextvars.copy_context().run, self._turn, name, brief, dict(outputs))
+                        running[future] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    transcripts[name] = future.result()
+                    outputs[name] = str(transcripts[name][-1].get("content") or "")
+        return transcripts
+
+    def run(self, brief: str) -> List[Dict[str, Any]]:
+        """
+        Run the layer for a brief.
+
+        Returns:
+            The brief followed by every agent's messages, in stage order
+        """
+        messages = [{"role": "user", "name": "User", "content": brief}]
+        request = brief
+        for attempt in range(self.max_attempts):
+            with span("layer", attempt=attempt, agents=len(self.inputs)):
+                transcripts = self._run_once(request)
+            messages += [message for stage in self.stages for name in stage for message in transcripts[name]]
+            verdict = str(transcripts[self.verifier][-1].get("content") or "") if self.verifier in transcripts else ""
+            if not self.verifier or self.verified.search(verdict):
+                break
+            if self.max_messages is not None and len(messages) >= self.max_messages:
+                break
+            request = f"{brief}\n\n{self.verifier} rejected the previous plan:\n{verdict}"
+        return messages
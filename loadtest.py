@@ -0,0 +1,213 @@
+# ai-trip-planner-agents/loadtest.py
+
+"""
+Concurrent-session load generator.
+
+Drives many simultaneous planning sessions in one process against the local
+stand-in server (stub_server.py) and reports throughput (sessions/minute),
+p50/p95/p99 session latency, failures and per-provider request rates.
+With --sweep it steps through increasing concurrency levels and reports the
+saturation point: the level after which adding sessions no longer raises
+throughput.
+
+Prompts are read from a requests.jsonl-style file (one JSON object per line
+with the prompt under "message", "prompt" or "body"); sessions cycle
+through them. Without --prompts the benchmark scenarios are used.
+
+Usage:
+    python loadtest.py [--prompts FILE.jsonl] [--concurrency 8] [--sessions 32]
+                       [--sweep 1,2,4,8,16,32] [--waves 3] [--rounds 20]
+                       [--latency 0.1] [--llm-latency 0.5] [--no-cache]
+                       [--output loadtest_results.json]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Sequence
+
+from benchmark import CONFIGS_DIR, load_scenarios, stub_environment, _git_commit
+
+# A level must raise throughput by this much over the best lower level to count as unsaturated
+DEFAULT_MIN_GAIN = 0.1
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a sequence of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-pct * len(ordered) // 100)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_session(prompt: Dict[str, str], rounds: int) -> Dict[str, Any]:
+    """Run one planning session and return its latency and outcome."""
+    import trip_planner
+
+    started = time.perf_counter()
+    try:
+        _, agents, groupchat, manager = trip_planner.build_planner(
+            configs_dir=str(CONFIGS_DIR),
+            human_input_mode="NEVER",
+            max_round=rounds,
+            llm_overrides={"cache_seed": None},
+        )
+        trip_planner.run_planner(agents, manager, prompt["message"])
+        error = None
+        messages = len(groupchat.messages)
+    except Exception as e:
+        error = type(e).__name__
+        messages = 0
+    return {
+        "name": prompt["name"],
+        "latency_s": time.perf_counter() - started,
+        "rounds": messages,
+        "error": error,
+    }
+
+
+def run_level(
+    prompts: List[Dict[str, str]],
+    server,
+    concurrency: int,
+    sessions: int,
+    rounds: int
+) -> Dict[str, Any]:
+    """Run `sessions` sessions with `concurrency` in flight at once and summarize them."""
+    before = server.stats()["requests"]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(
+            lambda i: run_session(prompts[i % len(prompts)], rounds), range(sessions)
+        ))
+    elapsed = time.perf_counter() - started
+    after = server.stats()["requests"]
+
+    latencies = [r["latency_s"] for r in results if r["error"] is None]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["error"] is not None:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    request_rates = {
+        provider: round((after.get(provider, 0) - before.get(provider, 0)) / elapsed, 3)
+        for provider in sorted(after)
+        if after.get(provider, 0) - before.get(provider, 0)
+    }
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "completed": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "sessions_per_min": round(len(latencies) / elapsed * 60, 2),
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies, default=0.0), 3),
+        },
+        "mean_rounds": round(sum(r["rounds"] for r in results) / len(results), 1) if results else 0,
+        "requests_per_s": request_rates,
+    }
+
+
+def saturation_point(levels: List[Dict[str, Any]], min_gain: float = DEFAULT_MIN_GAIN) -> Dict[str, Any]:
+    """
+    Highest concurrency level that still raised throughput meaningfully.
+
+    Walks the levels in increasing concurrency and stops at the first one
+    whose sessions/minute is less than (1 + min_gain) times the best so far.
+    """
+    best = None
+    for level in sorted(levels, key=lambda l: l["concurrency"]):
+        if best is not None and level["sessions_per_min"] < best["sessions_per_min"] * (1 + min_gain):
+            return {
+                "concurrency": best["concurrency"],
+                "sessions_per_min": best["sessions_per_min"],
+                "p95_s": best["latency_s"]["p95"],
+                "saturated": True,
+            }
+        if best is None or level["sessions_per_min"] > best["sessions_per_min"]:
+            best = level
+    return {
+        "concurrency": best["concurrency"] if best else None,
+        "sessions_per_min": best["sessions_per_min"] if best else None,
+        "p95_s": best["latency_s"]["p95"] if best else None,
+        "saturated": False,
+    }
+
+
+def _print_level(level: Dict[str, Any]):
+    latency = level["latency_s"]
+    print(
+        f"concurrency {level['concurrency']:>3}: {level['sessions_per_min']:>8.1f} sessions/min, "
+        f"p50 {latency['p50']:.2f}s p95 {latency['p95']:.2f}s p99 {latency['p99']:.2f}s, "
+        f"{sum(level['errors'].values())} failed",
+        file=sys.stderr,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent planning-session load test against stubbed backends")
+    parser.add_argument("--prompts", help="requests.jsonl-style file of trip prompts")
+    parser.add_argument("--concurrency", type=int, default=8, help="Sessions in flight at once")
+    parser.add_argument("--sessions", type=int, help="Total sessions (default: 4 x concurrency)")
+    parser.add_argument("--sweep", help="Comma-separated concurrency levels to find the saturation point")
+    parser.add_argument("--waves", type=int, default=3, help="Sessions per level in a sweep, as multiples of its concurrency")
+    parser.add_argument("--min-gain", type=float, default=DEFAULT_MIN_GAIN,
+                        help="Throughput gain below which a sweep level counts as saturated")
+    parser.add_argument("--rounds", type=int, default=20, help="Group chat max_round per session")
+    parser.add_argument("--latency", type=float, default=0.1, help="Mean provider latency in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean LLM latency in seconds")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the provider response cache")
+    parser.add_argument("--output", default="loadtest_results.json")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        os.environ["API_CACHE_DISABLED"] = "1"
+    server = stub_environment(args.latency, args.llm_latency)
+    prompts = load_scenarios(args.prompts)
+
+    if args.sweep:
+        plan = [(level, level * args.waves) for level in (int(v) for v in args.sweep.split(","))]
+    else:
+        plan = [(args.concurrency, args.sessions or args.concurrency * 4)]
+
+    levels = []
+    with server, contextlib.redirect_stdout(io.StringIO()):
+        for concurrency, sessions in plan:
+            levels.append(run_level(prompts, server, concurrency, sessions, args.rounds))
+            _print_level(levels[-1])
+
+    report = {
+        "git_commit": _git_commit(),
+        "settings": {
+            "rounds": args.rounds,
+            "latency": args.latency,
+            "llm_latency": args.llm_latency,
+            "cache": not args.no_cache,
+            "prompts": len(prompts),
+        },
+        "levels": levels,
+    }
+    if args.sweep:
+        report["saturation"] = saturation_point(levels, args.min_gain)
+        saturation = report["saturation"]
+        print(
+            f"Saturation: {saturation['sessions_per_min']} sessions/min at concurrency "
+            f"{saturation['concurrency']}" + ("" if saturation["saturated"] else " (not reached)"),
+            file=sys.stderr,
+        )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# ai-trip-planner-agents/route_optimizer.py
+
+from typing import List, Optional, Sequence, Tuple
+
+# Up to this many stops (start excluded) the ordering is solved exactly
+EXACT_LIMIT = 10
+
+# Cost used for pairs with no route so they are only taken as a last resort
+UNREACHABLE = 10 ** 9
+
+
+def _cost_matrix(matrix: Sequence[Sequence[Optional[float]]]) -> List[List[float]]:
+    return [
+        [0 if i == j else (UNREACHABLE if v is None else v) for j, v in enumerate(row)]
+        for i, row in enumerate(matrix)
+    ]
+
+
+def route_cost(cost: Sequence[Sequence[float]], order: Sequence[int], return_to_start: bool = True) -> float:
+    """Total travel cost of visiting `order`, optionally returning to its first node."""
+    total = sum(cost[a][b] for a, b in zip(order, order[1:]))
+    if return_to_start and len(order) > 1:
+        total += cost[order[-1]][order[0]]
+    return total
+
+
+def _held_karp(cost: List[List[float]], start: int, return_to_start: bool) -> List[int]:
+    """Exact minimum-cost ordering by dynamic programming over subsets."""
+    stops = [i for i in range(len(cost)) if i != start]
+    n = len(stops)
+    full = (1 << n) - 1
+    # best[mask][k]: cheapest path from start through `mask`, ending at stops[k]
+    best = [[float("inf")] * n for _ in range(1 << n)]
+    parent = [[-1] * n for _ in range(1 << n)]
+    for k, stop in enumerate(stops):
+        best[1 << k][k] = cost[start][stop]
+
+    for mask in range(1, 1 << n):
+        for k in range(n):
+            current = best[mask][k]
+            if current == float("inf") or not mask & (1 << k):
+                continue
+            for nxt in range(n):
+                if mask & (1 << nxt):
+                    continue
+                new_mask = mask | (1 << nxt)
+                candidate = current + cost[stops[k]][stops[nxt]]
+                if candidate < best[new_mask][nxt]:
+                    best[new_mask][nxt] = candidate
+                    parent[new_mask][nxt] = k
+
+    def closing(k):
+        return cost[stops[k]][start] if return_to_start else 0
+
+    last = min(range(n), key=lambda k: best[full][k] + closing(k))
+    order, mask = [], full
+    while last != -1:
+        order.append(stops[last])
+        mask, last = mask & ~(1 << last), parent[mask][last]
+    return [start] + order[::-1]
+
+
+def _nearest_neighbour(cost: List[List[float]], start: int) -> List[int]:
+    order, remaining = [start], set(range(len(cost))) - {start}
+    while remaining:
+        nxt = min(remaining, key=lambda j: cost[order[-1]][j])
+        order.append(nxt)
+        remaining.remove(nxt)
+    return order
+
+
+def _two_opt(cost: List[List[float]], order: List[int], return_to_start: bool) -> List[int]:
+    """Reverse segments while that shortens the route; the start stays first."""
+    best_cost = route_cost(cost, order, return_to_start)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                # Re-evaluate the whole route since travel times may be asymmetric
+                candidate_cost = route_cost(cost, candidate, return_to_start)
+                if candidate_cost < best_cost:
+                    order, best_cost, improved = candidate, candidate_cost, True
+    return order
+
+
+def optimize_route(
+    matrix: Sequence[Sequence[Optional[float]]],
+    start: int = 0,
+    return_to_start: bool = True
+) -> Tuple[List[int], float]:
+    """
+    Find the minimum-travel order to visit every node of a travel-time matrix.
+
+    Args:
+        matrix: Square matrix of travel times; None marks a pair with no route
+        start: Index of the node the route starts from (e.g. the hotel)
+        return_to_start: Whether the route ends back at the start node
+
+    Returns:
+        (order of node indices beginning with start, total travel time)
+    """
+    cost = _cost_matrix(matrix)
+    if len(cost) <= 2:
+        order = [start] + [i for i in range(len(cost)) if i != start]
+    elif len(cost) - 1 <= EXACT_LIMIT:
+        order = _held_karp(cost, start, return_to_start)
+    else:
+        order = _two_opt(cost, _nearest_neighbour(cost, start), return_to_start)
+    return order, route_cost(cost, order, return_to_start)
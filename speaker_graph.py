@@ -0,0 +1,126 @@
+# ai-trip-planner-agents/speaker_graph.py
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Optional, Union
+
+import autogen
+
+# Speaker selection methods the graph hands ambiguous turns back to
+AUTO = "auto"
+
+# Transition target that ends the conversation
+END = "END"
+
+
+class SpeakerGraph:
+    """
+    Rule-based speaker selection for the planner's group chat.
+
+    Used as GroupChat.speaker_selection_method: after each message the next
+    speaker is read from a transition graph (configs/speaker_selection.yaml)
+    instead of asking the LLM. Function calls go to the agent that executes
+    them and their results back to the caller. Turns the graph cannot decide
+    (a verifier rejecting, a question to the user, a free-form user message)
+    fall back to "auto", where the LLM picks among the agents the graph
+    allows after the last speaker.
+
+    A target may list alternatives (the first agent present in the chat is
+    taken), and END finishes the conversation.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.start = config["start"]
+        self.transitions: Dict[str, Union[str, Dict[str, Any]]] = config.get("transitions", {})
+        self.verified = re.compile(config.get("verified_pattern", r"^\W*verified\b"), re.IGNORECASE | re.MULTILINE)
+        # Agent a question may be addressed to; questions are left to the LLM
+        self.ask = config.get("ask")
+        self._decisions: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _names(target: Union[str, List[str], None]) -> List[str]:
+        if target is None:
+            return []
+        return [target] if isinstance(target, str) else list(target)
+
+    def _targets(self, name: str) -> List[str]:
+        rule = self.transitions.get(name)
+        if isinstance(rule, dict):
+            return self._names(rule.get("verified")) + self._names(rule.get("rejected"))
+        return self._names(rule)
+
+    def allowed_transitions(self, agents: List[autogen.Agent]) -> Dict[autogen.Agent, List[autogen.Agent]]:
+        """
+        Speaker graph for GroupChat(allowed_or_disallowed_speaker_transitions=...).
+
+        It bounds the LLM's choice on fallback turns; agents without a rule
+        may hand over to anyone.
+        """
+        by_name = {agent.name: agent for agent in agents}
+        graph = {}
+        for agent in agents:
+            targets = self._targets(agent.name)
+            if not targets:
+                graph[agent] = [a for a in agents if a is not agent]
+                continue
+            if self.ask and self.ask != agent.name:
+                targets = targets + [self.ask]
+            graph[agent] = [by_name[name] for name in dict.fromkeys(targets) if name in by_name]
+            if not graph[agent]:
+                graph[agent] = [a for a in agents if a is not agent]
+        return graph
+
+    def _decide(self, how: str, choice):
+        with self._lock:
+            self._decisions[how] += 1
+        return choice
+
+    def stats(self) -> Dict[str, int]:
+        """Turns decided by the graph ("rule") vs. left to the LLM ("llm")."""
+        with self._lock:
+            return dict(self._decisions)
+
+    def __call__(self, last_speaker: autogen.Agent, groupchat: autogen.GroupChat) -> Union[autogen.Agent, str, None]:
+        messages = groupchat.messages
+        last = messages[-1] if messages else {}
+        names = groupchat.agent_names
+
+        def agent(name: Optional[str]):
+            return groupchat.agent_by_name(name) if name in names else None
+
+        # Function calls: autogen routes them to the executing agent without the LLM
+        if last.get("function_call") or last.get("tool_calls"):
+            return self._decide("rule", AUTO)
+        # Function results go back to the agent that asked for them
+        if last.get("role") in ("function", "tool"):
+            for message in reversed(messages[:-1]):
+                if message.get("function_call") or message.get("tool_calls"):
+                    caller = agent(message.get("name"))
+                    if caller is not None:
+                        return self._decide("rule", caller)
+                    break
+            return self._decide("llm", AUTO)
+        # The opening request
+        if len(messages) <= 1 and agent(self.start) is not None:
+            return self._decide("rule", agent(self.start))
+
+        content = str(last.get("content") or "").strip()
+        if self.ask and content.endswith("?"):
+            return self._decide("llm", AUTO)
+        rule = self.transitions.get(last_speaker.name)
+        if isinstance(rule, dict):
+            rule = rule.get("verified") if self.verified.search(content) else None
+        for name in self._names(rule):
+            if name == END:
+                # Ends the chat (autogen stops on NoEligibleSpeaker)
+                return self._decide("rule", None)
+            if agent(name) is not None:
+                return self._decide("rule", agent(name))
+        return self._decide("llm", AUTO)
+
+
+def create_speaker_graph(config: Dict[str, Any], section: str = "speaker_selection") -> Optional[SpeakerGraph]:
+    """Speaker graph of a section of the planner config, or None if it has no such section."""
+    return SpeakerGraph(config[section]) if config.get(section) else None
@@ -0,0 +1,695 @@
+# ai-trip-planner-agents/stub_server.py
+
+"""
+Local stand-in for every external service the planner talks to.
+
+Serves the Google Maps, TripAdvisor, Yelp, Airbnb and Booking.com endpoints
+used under api/ plus OpenAI chat completions, each under /<provider>/, e.g.
+http://127.0.0.1:8765/google_maps/geocode/json. Point the planner at it with
+
+    export API_STUB_URL=http://127.0.0.1:8765
+
+(or per provider with <PROVIDER>_BASE_URL / OPENAI_BASE_URL).
+
+Responses come from recorded fixtures when one matches the request and are
+otherwise synthesized deterministically from the request parameters. In
+record mode requests are forwarded to the live APIs and their responses
+saved as fixtures for later replay. Latency and error injection are
+configurable globally or per provider.
+
+Usage:
+    python stub_server.py [--port 8765] [--mode replay|record] [--fixtures DIR]
+                          [--latency 0.2] [--latency booking=1.5]
+                          [--error-rate 0.05] [--error-status 503] [--seed 0]
+"""
+
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+from typing import Dict, Any, Optional, List, Tuple
+
+import requests
+from api.client import PROVIDERS
+from api.cache import make_key, _normalize
+from api.geo import haversine_m, parse_lat_lng
+
+OPENAI_URL = "https://api.openai.com/v1/"
+
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Synthesized places are scattered around this point
+_CENTER = (48.8566, 2.3522)
+
+# Average door-to-door speed per travel mode, in meters per second
+_SPEEDS = {"driving": 8.3, "walking": 1.25, "bicycling": 4.2, "transit": 5.5}
+
+# Request headers forwarded upstream in record mode
+_FORWARD_HEADERS = ("authorization", "x-rapidapi-key", "x-rapidapi-host", "accept", "content-type")
+
+
+def _seed(*parts: Any) -> int:
+    text = "|".join(str(part) for part in parts)
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _point(text: str) -> Tuple[float, float]:
+    """Coordinates of a 'lat,lng' string, or a stable pseudo-location for an address."""
+    coordinates = parse_lat_lng(text)
+    if coordinates:
+        return coordinates
+    seed = _seed("point", " ".join(str(text).casefold().split()))
+    return (
+        round(_CENTER[0] + ((seed % 10000) / 10000 - 0.5) * 0.1, 6),
+        round(_CENTER[1] + ((seed // 10000 % 10000) / 10000 - 0.5) * 0.14, 6),
+    )
+
+
+def _rating(*parts: Any) -> float:
+    return round(3.5 + (_seed("rating", *parts) % 15) / 10, 1)
+
+
+def _text(value: float, unit: str) -> str:
+    return f"{value:.1f} km" if unit == "km" else f"{max(round(value), 1)} mins"
+
+
+def _leg(origin: str, destination: str, mode: str) -> Dict[str, Any]:
+    start, end = _point(origin), _point(destination)
+    meters = round(haversine_m(*start, *end) * 1.3)
+    seconds = round(meters / _SPEEDS.get(mode, _SPEEDS["driving"])) + (60 if meters else 0)
+    return {
+        "distance": {"text": _text(meters / 1000, "km"), "value": meters},
+        "duration": {"text": _text(seconds / 60, "min"), "value": seconds},
+        "start_address": origin,
+        "end_address": destination,
+        "start_location": {"lat": start[0], "lng": start[1]},
+        "end_location": {"lat": end[0], "lng": end[1]},
+    }
+
+
+# --- Provider synthesizers: (params, body) -> response JSON ---
+
+def _google_geocode(params, body):
+    address = params.get("address", "")
+    lat, lng = _point(address)
+    return {
+        "status": "OK",
+        "results": [{
+            "formatted_address": address,
+            "geometry": {"location": {"lat": lat, "lng": lng}},
+            "place_id": f"stub-{_seed(address) % 10 ** 8}",
+        }],
+    }
+
+
+def _google_directions(params, body):
+    origin, destination = params.get("origin", ""), params.get("destination", "")
+    mode = params.get("mode", "driving")
+    leg = _leg(origin, destination, mode)
+    thirds = [round(leg["distance"]["value"] / 3), round(leg["duration"]["value"] / 3)]
+    leg["steps"] = [
+        {
+            "html_instructions": f"Step {i} towards <b>{destination}</b>",
+            "distance": {"text": _text(thirds[0] / 1000, "km"), "value": thirds[0]},
+            "duration": {"text": _text(thirds[1] / 60, "min"), "value": thirds[1]},
+            "travel_mode": mode.upper(),
+        }
+        for i in range(1, 4)
+    ]
+    return {"status": "OK", "routes": [{"summary": f"{origin} to {destination}", "legs": [leg]}]}
+
+
+def _google_nearby(params, body):
+    lat, lng = _point(params.get("location", ""))
+    label = params.get("keyword") or params.get("type") or "place"
+    radius = float(params.get("radius", 1000))
+    results = []
+    for i in range(5):
+        seed = _seed("nearby", lat, lng, label, i)
+        angle, distance = (seed % 360) * math.pi / 180, (seed // 360 % 1000) / 1000 * radius
+        results.append({
+            "place_id": f"stub-{seed % 10 ** 8}",
+            "name": f"{label.title()} {i + 1}",
+            "vicinity": f"{i + 1} Stub Street",
+            "rating": _rating(seed),
+            "types": [params.get("type") or "point_of_interest"],
+            "geometry": {"location": {
+                "lat": round(lat + distance * math.cos(angle) / 111000, 6),
+                "lng": round(lng + distance * math.sin(angle) / (111000 * math.cos(math.radians(lat))), 6),
+            }},
+        })
+    return {"status": "OK", "results": results}
+
+
+def _google_details(params, body):
+    place_id = params.get("place_id", "")
+    lat, lng = _point(place_id)
+    return {
+        "status": "OK",
+        "result": {
+            "place_id": place_id,
+            "name": f"Place {place_id}",
+            "formatted_address": f"{_seed(place_id) % 200 + 1} Stub Street",
+            "rating": _rating(place_id),
+            "geometry": {"location": {"lat": lat, "lng": lng}},
+            "opening_hours": {"weekday_text": ["Monday: 9:00 AM - 6:00 PM"]},
+        },
+    }
+
+
+def _google_matrix(params, body):
+    origins = [o for o in params.get("origins", "").split("|") if o]
+    destinations = [d for d in params.get("destinations", "").split("|") if d]
+    mode = params.get("mode", "driving")
+    rows = []
+    for origin in origins:
+        elements = []
+        for destination in destinations:
+            leg = _leg(origin, destination, mode)
+            elements.append({"status": "OK", "distance": leg["distance"], "duration": leg["duration"]})
+        rows.append({"elements": elements})
+    return {
+        "status": "OK",
+        "origin_addresses": origins,
+        "destination_addresses": destinations,
+        "rows": rows,
+    }
+
+
+def _tripadvisor_location(location_id: str) -> Dict[str, Any]:
+    lat, lng = _point(f"tripadvisor:{location_id}")
+    return {
+        "location_id": location_id,
+        "name": f"Attraction {location_id}",
+        "description": f"Stand-in description of attraction {location_id}.",
+        "web_url": f"https://www.tripadvisor.com/Attraction-{location_id}",
+        "address_obj": {"address_string": f"{_seed(location_id) % 200 + 1} Stub Avenue"},
+        "rating": str(_rating(location_id)),
+        "num_reviews": str(_seed("reviews", location_id) % 5000),
+        "price_level": "$$",
+        "latitude": str(lat),
+        "longitude": str(lng),
+        "category": {"name": "attraction"},
+        "hours": {"weekday_text": ["Monday: 09:00 - 18:00"]},
+    }
+
+
+def _tripadvisor_search(params, body):
+    query = params.get("searchQuery", "")
+    limit = int(params.get("limit", 10))
+    data = []
+    for i in range(min(limit, 10)):
+        location_id = str(_seed("location", query, i) % 10 ** 7)
+        location = _tripadvisor_location(location_id)
+        data.append({
+            "location_id": location_id,
+            "name": f"{query} Attraction {i + 1}",
+            "address_obj": location["address_obj"],
+        })
+    return {"data": data}
+
+
+def _tripadvisor_details(params, body, location_id):
+    return _tripadvisor_location(location_id)
+
+
+def _tripadvisor_attractions(params, body, location_id):
+    return {"data": [
+        _tripadvisor_location(str(_seed("tour", location_id, i) % 10 ** 7)) for i in range(5)
+    ]}
+
+
+def _yelp_business(location: str, i: int) -> Dict[str, Any]:
+    seed = _seed("yelp", location, i)
+    lat, lng = _point(f"yelp:{seed}")
+    return {
+        "id": f"stub-{seed % 10 ** 8}",
+        "name": f"Restaurant {i + 1} of {location}",
+        "rating": _rating(seed),
+        "review_count": seed % 900,
+        "phone": f"+33 1 00 00 {seed % 100:02d} {i:02d}",
+        "price": "$" * (seed % 3 + 1),
+        "coordinates": {"latitude": lat, "longitude": lng},
+        "location": {"formatted_address": f"{seed % 200 + 1} Stub Boulevard, {location}"},
+    }
+
+
+def _yelp_search(params, body):
+    location = params.get("location", "")
+    return {
+        "businesses": [_yelp_business(location, i) for i in range(int(params.get("limit", 3)))],
+        "total": int(params.get("limit", 3)),
+    }
+
+
+def _yelp_chat(params, body):
+    query = (body or {}).get("query", "")
+    return {
+        "response": {"text": f"Here are some good places for: {query}"},
+        "entities": [{"businesses": [_yelp_business(query, i) for i in range(3)]}],
+    }
+
+
+def _airbnb_search(params, body):
+    location = params.get("location", "")
+    price_max = float(params.get("priceMax") or 500)
+    listings = []
+    for i in range(int(params.get("totalRecords") or 10)):
+        seed = _seed("airbnb", location, i)
+        lat, lng = _point(f"airbnb:{seed}")
+        listings.append({
+            "listing": {
+                "id": str(seed % 10 ** 9),
+                "name": f"Apartment {i + 1} in {location}",
+                "city": location,
+                "avgRatingLocalized": f"{_rating(seed)} ({seed % 300})",
+                "roomTypeCategory": "entire_home",
+                "webURL": f"https://www.airbnb.com/rooms/{seed % 10 ** 9}",
+                "coordinate": {"latitude": lat, "longitude": lng},
+            },
+            "pricingQuote": {"structuredStayDisplayPrice": {"primaryLine": {
+                "price": f"${round(price_max * (0.4 + (seed % 60) / 100))}",
+            }}},
+        })
+    return {"status": True, "data": {"list": listings}}
+
+
+def _booking_destination(params, body):
+    query = params.get("query", "")
+    return {"status": True, "data": [{
+        "dest_id": str(-(_seed("dest", query.casefold()) % 10 ** 7)),
+        "search_type": "city",
+        "name": query,
+        "label": query,
+    }]}
+
+
+def _booking_hotels(params, body):
+    dest_id = params.get("dest_id", "")
+    price_max = float(params.get("price_max") or 500)
+    hotels = []
+    for i in range(10):
+        seed = _seed("booking", dest_id, i)
+        lat, lng = _point(f"booking:{seed}")
+        name = f"Hotel {i + 1} ({dest_id})"
+        price = round(price_max * (0.5 + (seed % 50) / 100), 2)
+        hotels.append({
+            "hotel_id": seed % 10 ** 7,
+            "accessibilityLabel": f"{name}. {_rating(seed) * 2} Rating. {price} USD",
+            "property": {
+                "name": name,
+                "reviewScore": _rating(seed) * 2,
+                "reviewCount": seed % 2000,
+                "latitude": lat,
+                "longitude": lng,
+                "wishlistName": "Stub City",
+                "priceBreakdown": {"grossPrice": {"value": price, "currency": "USD"}},
+            },
+        })
+    return {"status": True, "data": {"hotels": hotels}}
+
+
+# --- OpenAI chat completions ---
+
+_SAMPLE_ARGS = (
+    (("checkin", "arrival", "start_date", "date"), "2025-06-01"),
+    (("checkout", "departure", "end_date"), "2025-06-04"),
+    (("location", "city", "address", "origin", "destination", "query", "place"), "Paris"),
+)
+
+
+def _sample_value(name: str, schema: Dict[str, Any]) -> Any:
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "array":
+        return [_sample_value(name, schema.get("items", {})) for _ in range(2)]
+    if kind in ("integer", "number"):
+        return 2
+    if kind == "boolean":
+        return True
+    for names, value in _SAMPLE_ARGS:
+        if any(part in name.lower() for part in names):
+            return value
+    return "Paris"
+
+
+def _sample_arguments(function: Dict[str, Any]) -> str:
+    parameters = function.get("parameters", {})
+    properties = parameters.get("properties", {})
+    return json.dumps({
+        name: _sample_value(name, properties.get(name, {}))
+        for name in parameters.get("required", [])
+    })
+
+
+def _chat_completion(params, body):
+    """
+    Scripted assistant: picks speakers round-robin when asked to select the
+    next role, calls one of the offered functions unless it just received a
+    function result, and otherwise answers with a short text (a verification
+    agent always verifies).
+    """
+    messages = body.get("messages", [])
+    last = messages[-1] if messages else {}
+    content = str(last.get("content") or "")
+    message: Dict[str, Any] = {"role": "assistant", "content": None}
+
+    roles = None
+    if "select the next role" in content:
+        listed = content.split("select the next role from", 1)[1].split("to play", 1)[0]
+        roles = [role.strip(" '\"") for role in listed.strip(" []").split(",") if role.strip(" '\"")]
+    functions = body.get("functions") or [t["function"] for t in body.get("tools") or []]
+    system = str(messages[0].get("content") if messages else "")
+
+    if roles:
+        speakers = [m.get("name") for m in messages if m.get("name") in roles]
+        previous = speakers[-1] if speakers else None
+        message["content"] = roles[(roles.index(previous) + 1) % len(roles)] if previous else roles[0]
+    elif functions and last.get("role") not in ("function", "tool"):
+        function = functions[_seed(system, len(messages)) % len(functions)]
+        call = {"name": function["name"], "arguments": _sample_arguments(function)}
+        if body.get("tools"):
+            message["tool_calls"] = [{"id": f"call_{_seed(system, len(messages))}", "type": "function", "function": call}]
+        else:
+            message["function_call"] = call
+    elif "- Cities (in order):" in system:
+        # A two-city itinerary in the CityPlannerAgent's output format
+        message["content"] = (
+            "- Cities (in order):\n  1. Paris\n  2. Lyon\n"
+            "- Days per City (exact allocation):\n  - Paris: 2\n  - Lyon: 1"
+        )
+    elif 'confirm with "Verified' in system:
+        message["content"] = f"Verified: stand-in check {len(messages)} passed."
+    else:
+        message["content"] = f"Stand-in reply {len(messages)}: noted, continuing with the plan."
+
+    prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    completion_tokens = len(json.dumps(message)) // 4
+    finish = "tool_calls" if "tool_calls" in message else "function_call" if "function_call" in message else "stop"
+    return {
+        "id": f"chatcmpl-stub-{_seed(json.dumps(messages, sort_keys=True)) % 10 ** 10}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4.1-nano"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+# (provider, path pattern) -> synthesizer; {id} captures a path segment
+ROUTES = [
+    ("google_maps", "geocode/json", _google_geocode),
+    ("google_maps", "directions/json", _google_directions),
+    ("google_maps", "place/nearbysearch/json", _google_nearby),
+    ("google_maps", "place/details/json", _google_details),
+    ("google_maps", "distancematrix/json", _google_matrix),
+    ("tripadvisor", "location/search", _tripadvisor_search),
+    ("tripadvisor", "location/{id}/details", _tripadvisor_details),
+    ("tripadvisor", "location/{id}/attractions", _tripadvisor_attractions),
+    ("yelp", "v3/businesses/search", _yelp_search),
+    ("yelp", "ai/chat/v2", _yelp_chat),
+    ("airbnb", "searchPropertyByLocationV2", _airbnb_search),
+    ("booking", "hotels/searchDestination", _booking_destination),
+    ("booking", "hotels/searchHotels", _booking_hotels),
+    ("openai", "chat/completions", _chat_completion),
+]
+
+
+def _route(provider: str, path: str):
+    parts = path.strip("/").split("/")
+    for route_provider, pattern, handler in ROUTES:
+        pattern_parts = pattern.split("/")
+        if route_provider != provider or len(pattern_parts) != len(parts):
+            continue
+        captured = []
+        for expected, actual in zip(pattern_parts, parts):
+            if expected == "{id}":
+                captured.append(actual)
+            elif expected != actual:
+                break
+        else:
+            return handler, captured
+    return None, []
+
+
+class FixtureStore:
+    """
+    Recorded responses on disk, one JSON file per request.
+
+    Files live under <dir>/<provider>/ and are keyed like the response cache,
+    so credentials never end up in a fixture.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or DEFAULT_FIXTURES_DIR)
+
+    def _file(self, provider: str, path: str, params: Dict[str, Any]) -> Path:
+        slug = path.strip("/").replace("/", "_") or "root"
+        return self.path / provider / f"{slug}-{make_key(provider, path, params)[:16]}.json"
+
+    def get(self, provider: str, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        file = self._file(provider, path, params)
+        if not file.exists():
+            return None
+        return json.loads(file.read_text(encoding="utf-8"))
+
+    def put(self, provider: str, path: str, params: Dict[str, Any], status: int, body: Any):
+        file = self._file(provider, path, params)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        fixture = {"provider": provider, "path": path, "params": _normalize(params), "status": status, "body": body}
+        file.write_text(json.dumps(fixture, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def _per_provider(values: Optional[List[str]], cast=float) -> Dict[str, Any]:
+    """Parse ['0.2', 'booking=1.5'] into {'*': 0.2, 'booking': 1.5}."""
+    parsed = {}
+    for value in values or []:
+        provider, _, number = value.rpartition("=")
+        parsed[provider or "*"] = cast(number)
+    return parsed
+
+
+class StubServer:
+    """
+    Threaded HTTP server emulating every provider and the OpenAI API.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind; 0 picks a free one
+        fixtures: Directory of recorded fixtures
+        mode: "replay" serves fixtures or synthesized data; "record" forwards
+            to the live APIs and saves what they return
+        latency: Mean added latency in seconds, as {provider or '*': seconds}
+        error_rate: Share of requests answered with error_status, per provider
+        error_status: HTTP status of injected errors
+        seed: Seed of the latency/error randomness
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fixtures: Optional[str] = None,
+        mode: str = "replay",
+        latency: Optional[Dict[str, float]] = None,
+        error_rate: Optional[Dict[str, float]] = None,
+        error_status: int = 503,
+        seed: int = 0
+    ):
+        if mode not in ("replay", "record"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.mode = mode
+        self.fixtures = FixtureStore(fixtures)
+        self.latency = latency or {}
+        self.error_rate = error_rate or {}
+        self.error_status = error_status
+        self.requests = Counter()
+        self.errors = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the planner at this server."""
+        return {"API_STUB_URL": self.url}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": dict(self.requests), "errors": dict(self.errors)}
+
+    def _setting(self, table: Dict[str, float], provider: str) -> float:
+        return table.get(provider, table.get("*", 0.0))
+
+    def _inject(self, provider: str) -> Optional[int]:
+        """Sleep for the configured latency and maybe pick an error status."""
+        with self._lock:
+            self.requests[provider] += 1
+            jitter = self._random.uniform(0.5, 1.5)
+            failed = self._random.random() < self._setting(self.error_rate, provider)
+            if failed:
+                self.errors[provider] += 1
+        delay = self._setting(self.latency, provider) * jitter
+        if delay > 0:
+            time.sleep(delay)
+        return self.error_status if failed else None
+
+    def _record(self, provider, path, method, params, body, headers):
+        upstream = OPENAI_URL if provider == "openai" else PROVIDERS[provider]
+        response = requests.request(
+            method,
+            f"{upstream}{path}",
+            params=params,
+            data=body,
+            headers={k: v for k, v in headers.items() if k.lower() in _FORWARD_HEADERS},
+            timeout=60,
+        )
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {"error": response.text}
+        if response.status_code < 500:
+            self.fixtures.put(provider, path, self._fixture_params(params, body), response.status_code, payload)
+        return response.status_code, payload
+
+    @staticmethod
+    def _fixture_params(params, body):
+        if not body:
+            return params
+        try:
+            return {**params, "_body": json.loads(body)}
+        except ValueError:
+            return {**params, "_body": body.decode("utf-8", "replace")}
+
+    def handle(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        """Answer one request as (status, JSON payload)."""
+        split = urlsplit(target)
+        provider, _, path = split.path.lstrip("/").partition("/")
+        if provider == "_stats":
+            return 200, self.stats()
+        if provider != "openai" and provider not in PROVIDERS:
+            return 404, {"error": f"Unknown provider: {provider}"}
+        if provider == "openai" and path.startswith("v1/"):
+            path = path[len("v1/"):]
+        params = dict(parse_qsl(split.query, keep_blank_values=True))
+
+        status = self._inject(provider)
+        if status is not None:
+            return status, {"error": {"message": f"Injected {status} from stub server", "code": status}}
+
+        if self.mode == "record":
+            return self._record(provider, path, method, params, body, headers)
+
+        fixture = self.fixtures.get(provider, path, self._fixture_params(params, body))
+        if fixture is not None:
+            return fixture["status"], fixture["body"]
+
+        handler, captured = _route(provider, path)
+        if handler is None:
+            return 404, {"error": f"No stand-in for {provider}/{path}"}
+        try:
+            parsed_body = json.loads(body) if body else None
+        except ValueError:
+            return 400, {"error": "Request body is not JSON"}
+        return 200, handler(params, parsed_body, *captured)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, payload = server.handle(self.command, self.path, dict(self.headers), body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status in (429, 503):
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubServer":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in server for the planner's external APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=("replay", "record"), default="replay")
+    parser.add_argument("--fixtures", default=str(DEFAULT_FIXTURES_DIR))
+    parser.add_argument("--latency", action="append", metavar="[PROVIDER=]SECONDS",
+                        help="Mean added latency, globally or per provider (repeatable)")
+    parser.add_argument("--error-rate", action="append", metavar="[PROVIDER=]RATE",
+                        help="Share of requests failing with --error-status (repeatable)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubServer(
+        host=args.host,
+        port=args.port,
+        fixtures=args.fixtures,
+        mode=args.mode,
+        latency=_per_provider(args.latency),
+        error_rate=_per_provider(args.error_rate),
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    print(f"Stub server ({args.mode}) listening on {server.url}")
+    print(f"  export API_STUB_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,25 @@
 # trip_planner.py with API integration
 
 import os
+import json
 import yaml
 import autogen
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timezone
+from autogen.logger.base_logger import BaseLogger
+from autogen.agentchat.groupchat import NoEligibleSpeaker
+from typing import Dict, List, Any, Optional, Callable
 from pathlib import Path
 from pprint import pprint
 from api_integration import ApiManager
+from api.client import openai_base_url
+from api.metrics import tool_call, configure_metrics
+from api.blobs import blob_session, offload, read_blob
+from api.tracing import trace, span, start_span, end_span, record_span, tracing_enabled, KIND_CLIENT
+from route_optimizer import optimize_route, UNREACHABLE
+from speaker_graph import SpeakerGraph, create_speaker_graph
+from within_city import WithinCityPlanner
+from layer_scheduler import LayerScheduler, declares_inputs
+from context_window import register_context_windows
 
 # Custom YAML loader with include functionality
 class YamlLoader(yaml.SafeLoader):
@@ -38,6 +51,10 @@ def get_attraction_details(location_id):
     """Get detailed information about an attraction"""
     return api_manager.get_location_details(location_id=location_id)
 
+def get_attraction_details_batch(location_ids):
+    """Get detailed information about several attractions in one call"""
+    return api_manager.get_location_details_batch(location_ids=location_ids)
+
 def restaurant_search(cuisine, city):
     """Search for restaurants by cuisine in a city"""
     return api_manager.search_restaurants(cuisine=cuisine, location=city)
@@ -62,6 +79,17 @@ def hotel_search_booking(city, checkin, checkout, adults=2, price_max=300):
         price_max=price_max
     )
 
+def hotel_search(city, checkin, checkout, adults=2, price_max=300, limit=8):
+    """Search Airbnb and Booking.com at once and return one ranked list"""
+    return api_manager.search_hotels(
+        location=city,
+        checkin=checkin,
+        checkout=checkout,
+        adults=adults,
+        price_max=price_max,
+        limit=limit
+    )
+
 def get_travel_directions(origin, destination, mode="transit"):
     """Get directions between two locations"""
     return api_manager.get_directions(
@@ -70,14 +98,63 @@ def get_travel_directions(origin, destination, mode="transit"):
         mode=mode
     )
 
+def get_travel_time_matrix(origins, destinations=None, mode="transit"):
+    """Get travel times between every origin and destination in one call"""
+    return api_manager.get_travel_time_matrix(
+        origins=origins,
+        destinations=destinations,
+        mode=mode
+    )
+
+def find_nearby(location, radius_m=1000, kind=None, limit=10):
+    """Find already-known places near a location"""
+    return api_manager.find_nearby(
+        location=location,
+        radius_m=radius_m,
+        kind=kind,
+        limit=limit
+    )
+
+def optimize_day_route(hotel, sites, mode="transit", return_to_hotel=True):
+    """Order a day's sites for the least total travel time, starting from the hotel"""
+    try:
+        places = [hotel] + [site for site in sites if site != hotel]
+        matrix = api_manager.travel_time_matrix(origins=places, mode=mode)
+        order, total = optimize_route(matrix["durations"], start=0, return_to_start=return_to_hotel)
+        if return_to_hotel:
+            order = order + [0]
+        
+        legs = []
+        for a, b in zip(order, order[1:]):
+            seconds = matrix["durations"][a][b]
+            legs.append({
+                "from": places[a],
+                "to": places[b],
+                "minutes": round(seconds / 60) if seconds is not None else None
+            })
+        return json.dumps({
+            "mode": mode,
+            "order": [places[i] for i in order],
+            "legs": legs,
+            "total_minutes": round(total / 60) if total < UNREACHABLE else None
+        })
+    except Exception as e:
+        return f"Error optimizing route: {str(e)}"
+
 # Define function schemas for agents
 function_map = {
     "site_search": site_search,
     "get_attraction_details": get_attraction_details,
+    "get_attraction_details_batch": get_attraction_details_batch,
     "restaurant_search": restaurant_search,
     "hotel_search_airbnb": hotel_search_airbnb,
     "hotel_search_booking": hotel_search_booking,
+    "hotel_search": hotel_search,
     "get_travel_directions": get_travel_directions,
+    "get_travel_time_matrix": get_travel_time_matrix,
+    "find_nearby": find_nearby,
+    "optimize_day_route": optimize_day_route,
+    "read_blob": read_blob,
 }
 
 # Create function calling configs
@@ -118,6 +195,21 @@ rag_function_specs = [
             "required": ["location_id"]
         }
     },
+    {
+        "name": "get_attraction_details_batch",
+        "description": "Get detailed information about several attractions at once",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The TripAdvisor location IDs"
+                }
+            },
+            "required": ["location_ids"]
+        }
+    },
     {
         "name": "restaurant_search",
         "description": "Search for restaurants by cuisine type in a city",
@@ -196,6 +288,40 @@ rag_function_specs = [
             "required": ["city", "checkin", "checkout"]
         }
     },
+    {
+        "name": "hotel_search",
+        "description": "Search Airbnb and Booking.com together and return one deduplicated list ranked by rating and price",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "city": {
+                    "type": "string",
+                    "description": "The city to search in"
+                },
+                "checkin": {
+                    "type": "string",
+                    "description": "Check-in date in YYYY-MM-DD format"
+                },
+                "checkout": {
+                    "type": "string",
+                    "description": "Check-out date in YYYY-MM-DD format"
+                },
+                "adults": {
+                    "type": "integer",
+                    "description": "Number of adults"
+                },
+                "price_max": {
+                    "type": "integer",
+                    "description": "Maximum price per night"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of hotels to return"
+                }
+            },
+            "required": ["city", "checkin", "checkout"]
+        }
+    },
     {
         "name": "get_travel_directions",
         "description": "Get directions between two locations",
@@ -218,23 +344,182 @@ rag_function_specs = [
             },
             "required": ["origin", "destination"]
         }
+    },
+    {
+        "name": "get_travel_time_matrix",
+        "description": "Get travel times and distances between every origin and destination in one call",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "origins": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Starting locations (addresses or place names)"
+                },
+                "destinations": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Destination locations; defaults to the origins for an all-pairs matrix"
+                },
+                "mode": {
+                    "type": "string",
+                    "description": "Transportation mode (driving, walking, transit, bicycling)",
+                    "enum": ["driving", "walking", "transit", "bicycling"]
+                }
+            },
+            "required": ["origins"]
+        }
+    },
+    {
+        "name": "find_nearby",
+        "description": "Find attractions, restaurants or hotels near a location, answered from places already looked up",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "Address, place name or 'lat,lng' to search around"
+                },
+                "radius_m": {
+                    "type": "integer",
+                    "description": "Search radius in meters"
+                },
+                "kind": {
+                    "type": "string",
+                    "description": "Optional kind of place",
+                    "enum": ["attraction", "restaurant", "hotel", "place"]
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return"
+                }
+            },
+            "required": ["location"]
+        }
+    },
+    {
+        "name": "optimize_day_route",
+        "description": "Order a day's sites to minimize total travel time, starting (and by default ending) at the hotel",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "hotel": {
+                    "type": "string",
+                    "description": "Hotel name or address the day starts from"
+                },
+                "sites": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Sites to visit that day (names or addresses)"
+                },
+                "mode": {
+                    "type": "string",
+                    "description": "Transportation mode (driving, walking, transit, bicycling)",
+                    "enum": ["driving", "walking", "transit", "bicycling"]
+                },
+                "return_to_hotel": {
+                    "type": "boolean",
+                    "description": "Whether the day ends back at the hotel"
+                }
+            },
+            "required": ["hotel", "sites"]
+        }
+    },
+    {
+        "name": "read_blob",
+        "description": "Read a large tool result that was stored out of band, from the handle given in its place",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "Handle of the stored result (e.g. blob-3)"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Character to start reading at (default 0)"
+                },
+                "length": {
+                    "type": "integer",
+                    "description": "Characters to read (at most 4000)"
+                }
+            },
+            "required": ["handle"]
+        }
     }
 ]
 
-def create_agents(config: Dict, llm_config: Dict) -> Dict[str, autogen.AssistantAgent]:
-    """Create all agents defined in the configuration."""
-    agents = {}
-    
-    # Create the user proxy agent with function calling capability
-    agents["user_proxy"] = autogen.UserProxyAgent(
+def create_user_proxy(human_input_mode: str = "ALWAYS") -> autogen.UserProxyAgent:
+    """Create the user proxy agent, which also executes the agents' function calls."""
+    return autogen.UserProxyAgent(
         name="User",
-        human_input_mode="ALWAYS",
+        human_input_mode=human_input_mode,
         code_execution_config={
             "work_dir": "coding",
             "use_docker": False,
         },
         function_map=function_map
     )
+
+def create_within_city_agents(config: Dict, base_llm_config: Dict) -> Dict[str, autogen.AssistantAgent]:
+    """Create the Within-City layer agents (sites, food, hotel, transport, verification)."""
+    agents = {}
+    
+    within_city_layer = config["travel_planner_agents"]["within_city_layer"]
+    
+    site_agent_config = within_city_layer["agent_0_sites"]
+    agents[site_agent_config["name"]] = autogen.AssistantAgent(
+        name=site_agent_config["name"],
+        system_message=site_agent_config["system_message"],
+        llm_config=base_llm_config
+    )
+    
+    food_agent_config = within_city_layer["agent_1_restaurants"]
+    agents[food_agent_config["name"]] = autogen.AssistantAgent(
+        name=food_agent_config["name"],
+        system_message=food_agent_config["system_message"],
+        llm_config=base_llm_config
+    )
+    
+    hotel_agent_config = within_city_layer["agent_2_hotel"]
+    agents[hotel_agent_config["name"]] = autogen.AssistantAgent(
+        name=hotel_agent_config["name"],
+        system_message=hotel_agent_config["system_message"],
+        llm_config=base_llm_config
+    )
+    
+    transport_agent_config = within_city_layer["agent_3_transport"]
+    agents[transport_agent_config["name"]] = autogen.AssistantAgent(
+        name=transport_agent_config["name"],
+        system_message=transport_agent_config["system_message"],
+        llm_config=base_llm_config
+    )
+    
+    activity_verification_config = within_city_layer["verification_agent"]
+    agents[activity_verification_config["name"]] = autogen.AssistantAgent(
+        name=activity_verification_config["name"],
+        system_message=activity_verification_config["system_message"],
+        llm_config=base_llm_config
+    )
+    
+    return agents
+
+def create_agents(
+    config: Dict,
+    llm_config: Dict,
+    human_input_mode: str = "ALWAYS",
+    within_city: bool = True
+) -> Dict[str, autogen.AssistantAgent]:
+    """
+    Create all agents defined in the configuration.
+    
+    With within_city=False the Within-City layer agents are left out, for
+    when WithinCityPlanner runs that layer per city instead.
+    """
+    agents = {}
+    
+    # Create the user proxy agent with function calling capability
+    agents["user_proxy"] = create_user_proxy(human_input_mode)
     
     # Create base LLM config with function calling
     base_llm_config = {
@@ -287,43 +572,9 @@ def create_agents(config: Dict, llm_config: Dict) -> Dict[str, autogen.Assistant
         llm_config=base_llm_config
     )
     
-    # Create within-city layer agents
-    within_city_layer = config["travel_planner_agents"]["within_city_layer"]
-    
-    site_agent_config = within_city_layer["agent_0_sites"]
-    agents[site_agent_config["name"]] = autogen.AssistantAgent(
-        name=site_agent_config["name"],
-        system_message=site_agent_config["system_message"],
-        llm_config=base_llm_config
-    )
-    
-    food_agent_config = within_city_layer["agent_1_restaurants"]
-    agents[food_agent_config["name"]] = autogen.AssistantAgent(
-        name=food_agent_config["name"],
-        system_message=food_agent_config["system_message"],
-        llm_config=base_llm_config
-    )
-    
-    hotel_agent_config = within_city_layer["agent_2_hotel"]
-    agents[hotel_agent_config["name"]] = autogen.AssistantAgent(
-        name=hotel_agent_config["name"],
-        system_message=hotel_agent_config["system_message"],
-        llm_config=base_llm_config
-    )
-    
-    transport_agent_config = within_city_layer["agent_3_transport"]
-    agents[transport_agent_config["name"]] = autogen.AssistantAgent(
-        name=transport_agent_config["name"],
-        system_message=transport_agent_config["system_message"],
-        llm_config=base_llm_config
-    )
-    
-    activity_verification_config = within_city_layer["verification_agent"]
-    agents[activity_verification_config["name"]] = autogen.AssistantAgent(
-        name=activity_verification_config["name"],
-        system_message=activity_verification_config["system_message"],
-        llm_config=base_llm_config
-    )
+    # Create within-city layer agents (unless each city gets its own sub-conversation)
+    if within_city:
+        agents.update(create_within_city_agents(config, base_llm_config))
     
     # Create orchestrator agent
     orchestrator_config = config["travel_planner_agents"]["orchestrator"]
@@ -335,56 +586,291 @@ def create_agents(config: Dict, llm_config: Dict) -> Dict[str, autogen.Assistant
     
     return agents
 
-def create_group_chat(agents: Dict[str, autogen.Agent]) -> autogen.GroupChat:
-    """Create a group chat with all agents."""
+class TracedGroupChat(autogen.GroupChat):
+    """
+    Group chat that records each round as a span when a session is traced.
+    
+    A round runs from speaker selection until the selected speaker's message
+    is appended; LLM, function call and HTTP spans of the reply nest under it.
+    """
+    
+    def _start_round(self, last_speaker: autogen.Agent):
+        self._end_round(None)
+        self._round = start_span("groupchat.round", round=len(self.messages), last_speaker=last_speaker.name)
+    
+    def _end_round(self, speaker: Optional[autogen.Agent]):
+        round_span, token = getattr(self, "_round", (None, None))
+        if round_span is None:
+            return
+        self._round = (None, None)
+        if speaker is not None:
+            round_span.set("speaker", speaker.name)
+        try:
+            end_span(round_span, token)
+        except ValueError:
+            # Ended from another context than it was started in
+            round_span.end()
+    
+    def _selection_method(self) -> str:
+        method = self.speaker_selection_method
+        return method if isinstance(method, str) else type(method).__name__
+    
+    def select_speaker(self, last_speaker: autogen.Agent, selector: autogen.ConversableAgent) -> autogen.Agent:
+        self._start_round(last_speaker)
+        with span("speaker_selection", method=self._selection_method()) as selection:
+            try:
+                speaker = super().select_speaker(last_speaker, selector)
+            except NoEligibleSpeaker:
+                # The selection method ended the chat
+                speaker = None
+            selection.set("speaker", speaker.name if speaker else None)
+        if speaker is None:
+            self._end_round(None)
+            raise NoEligibleSpeaker("The speaker selection method ended the chat.")
+        return speaker
+    
+    async def a_select_speaker(self, last_speaker: autogen.Agent, selector: autogen.ConversableAgent) -> autogen.Agent:
+        self._start_round(last_speaker)
+        with span("speaker_selection", method=self._selection_method()) as selection:
+            try:
+                speaker = await super().a_select_speaker(last_speaker, selector)
+            except NoEligibleSpeaker:
+                # The selection method ended the chat
+                speaker = None
+            selection.set("speaker", speaker.name if speaker else None)
+        if speaker is None:
+            self._end_round(None)
+            raise NoEligibleSpeaker("The speaker selection method ended the chat.")
+        return speaker
+    
+    def append(self, message: Dict, speaker: autogen.Agent):
+        super().append(message, speaker)
+        self._end_round(speaker)
+
+class CompletionSpanLogger(BaseLogger):
+    """autogen runtime logger that turns every chat completion into a span of the current trace."""
+    
+    def start(self) -> str:
+        return "trace"
+    
+    def log_chat_completion(self, invocation_id, client_id, wrapper_id, source, request, response, is_cached, cost, start_time):
+        started = datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+        completion = record_span(
+            "llm.completion",
+            int(started.timestamp() * 1e6) * 1000,
+            kind=KIND_CLIENT,
+            agent=getattr(source, "name", source),
+            model=request.get("model"),
+            cached=bool(is_cached),
+            cost=float(cost or 0),
+        )
+        usage = getattr(response, "usage", None)
+        if isinstance(response, str):
+            completion.fail(RuntimeError(response))
+        elif usage is not None:
+            completion.add("llm.prompt_tokens", usage.prompt_tokens)
+            completion.add("llm.completion_tokens", usage.completion_tokens)
+    
+    def log_new_agent(self, agent, init_args):
+        pass
+    
+    def log_event(self, source, name, **kwargs):
+        pass
+    
+    def log_new_wrapper(self, wrapper, init_args):
+        pass
+    
+    def log_new_client(self, client, wrapper, init_args):
+        pass
+    
+    def log_function_use(self, source, function, args, returns):
+        pass
+    
+    def stop(self):
+        pass
+    
+    def get_connection(self):
+        return None
+
+def configure_tracing():
+    """Report chat completions as spans when TRACE_FILE is set, unless another autogen logger runs."""
+    if tracing_enabled() and not autogen.runtime_logging.logging_enabled():
+        autogen.runtime_logging.start(logger=CompletionSpanLogger())
+
+def create_group_chat(
+    agents: Dict[str, autogen.Agent],
+    max_round: int = 50,
+    speaker_graph: Optional[SpeakerGraph] = None
+) -> autogen.GroupChat:
+    """
+    Create a group chat with all agents.
+    
+    With a speaker graph the next speaker follows its rules, and the LLM only
+    picks (among the agents the graph allows) on turns the rules leave open.
+    """
     agent_list = list(agents.values())
     
-    return autogen.GroupChat(
+    if speaker_graph is None:
+        return TracedGroupChat(
+            agents=agent_list,
+            messages=[],
+            max_round=max_round
+        )
+    return TracedGroupChat(
         agents=agent_list,
         messages=[],
-        max_round=50
+        max_round=max_round,
+        speaker_selection_method=speaker_graph,
+        allowed_or_disallowed_speaker_transitions=speaker_graph.allowed_transitions(agent_list),
+        speaker_transitions_type="allowed"
     )
 
-def handle_function_call(agent_name, func_call: Dict[str, Any]) -> Any:
-    """Handle function calls made by agents"""
+def handle_function_call(agent_name, func_call: Dict[str, Any], functions: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Handle function calls made by agents.
+    
+    Every call is measured (latency, result size, cache hits, provider HTTP
+    statuses, error class) and aggregated into the process-wide tool metrics,
+    and traced as a span when the session is.
+    
+    Args:
+        agent_name: Name of the agent that requested the call
+        func_call: The function_call message entry ({"name", "arguments"})
+        functions: Functions to dispatch to (defaults to function_map)
+    """
+    functions = function_map if functions is None else functions
     func_name = func_call.get("name")
     func_args = func_call.get("arguments", {})
 
     print(f"\n[API Call] {agent_name} is calling {func_name} with args: {func_args}\n")
     
-    if func_name not in function_map:
-        return {"error": f"Function {func_name} not found"}
-    
-    try:
-        result = function_map[func_name](**func_args)
+    with tool_call(agent_name, func_name) as call:
+        if isinstance(func_args, str):
+            try:
+                func_args = json.loads(func_args) if func_args.strip() else {}
+            except json.JSONDecodeError as e:
+                call.error_class = "InvalidArguments"
+                return {"error": f"Invalid arguments for {func_name}: {str(e)}"}
+        
+        if func_name not in functions:
+            call.error_class = "UnknownFunction"
+            return {"error": f"Function {func_name} not found"}
+        
+        try:
+            result = functions[func_name](**func_args)
+        except Exception as e:
+            call.error_class = type(e).__name__
+            return {"error": f"Error executing {func_name}: {str(e)}"}
+        call.set_result(result)
         return result
-    except Exception as e:
-        return {"error": f"Error executing {func_name}: {str(e)}"}
 
 def register_function_callbacks(agents: Dict[str, autogen.Agent]):
-    """Register function callbacks for agents that support function calling."""
+    """Route function calls through handle_function_call on the agents that execute them."""
     for name, agent in agents.items():
-        if isinstance(agent, autogen.AssistantAgent):
-            def trigger(message, sender=None):
-                """Trigger only if the message contains a function_call."""
-                return isinstance(message, dict) and "function_call" in message
+        if not agent.function_map:
+            continue
+        
+        def reply_func(recipient, messages=None, sender=None, config=None):
+            """Execute the function_call of the last message, on behalf of the agent that sent it."""
+            if messages is None:
+                messages = recipient.chat_messages[sender]
+            message = messages[-1] if messages else {}
+            function_call = message.get("function_call")
+            if not function_call:
+                return False, None
+            
+            result = handle_function_call(message.get("name", "unknown"), function_call, recipient.function_map)
+            content = result if isinstance(result, str) else json.dumps(result, default=str)
+            if function_call.get("name") != "read_blob":
+                # Large results stay in the session's blob store; the message carries a handle
+                content = offload(content)
+            return True, {"name": function_call.get("name"), "role": "function", "content": content}
+        
+        # Take the place of autogen's built-in executor so human input still comes first
+        agent.replace_reply_func(autogen.ConversableAgent.generate_function_call_reply, reply_func)
 
-            def reply_func(sender, message, agent_name=name):
-                """Handle the actual function call."""
-                function_call = message.get("function_call")
-                if function_call:
-                    return handle_function_call(agent_name, function_call)
-                return None
 
-            agent.register_reply(trigger, reply_func)
+def create_city_chat(config: Dict, llm_config: Dict, max_round: int = 50) -> Callable[[str], List[Dict]]:
+    """
+    Create one city's Within-City sub-conversation.
+    
+    When the layer's agents declare their inputs it runs as a dependency
+    graph (LayerScheduler); LAYER_SCHEDULER=chat, or a layer without inputs,
+    runs it as a group chat following within_city_selection.yaml instead.
+    max_round bounds the group chat's rounds, or the scheduler's reruns
+    after a rejection.
+    
+    Returns:
+        A function from the city's brief to the conversation's messages
+    """
+    agents = {"user_proxy": create_user_proxy("NEVER")}
+    agents.update(create_within_city_agents(config, {**llm_config, "functions": rag_function_specs}))
+    register_function_callbacks(agents)
+    register_context_windows(agents, config)
+    user_proxy = agents.pop("user_proxy")
+    
+    layer = config["travel_planner_agents"]["within_city_layer"]
+    if declares_inputs(layer) and os.environ.get("LAYER_SCHEDULER") != "chat":
+        selection = config.get("within_city_selection") or {}
+        scheduler = LayerScheduler(
+            layer, agents, user_proxy, verified_pattern=selection.get("verified_pattern"), max_messages=max_round
+        )
+        return scheduler.run
+    
+    groupchat = create_group_chat(
+        {"user_proxy": user_proxy, **agents}, max_round=max_round,
+        speaker_graph=create_speaker_graph(config, "within_city_selection")
+    )
+    manager = autogen.GroupChatManager(groupchat=groupchat, llm_config=llm_config)
+    
+    def run(brief: str) -> List[Dict]:
+        user_proxy.initiate_chat(manager, message=brief, silent=True)
+        return groupchat.messages
+    
+    return run
 
+TRIP_REQUEST = """
+        I'd like to plan a trip. Please help me create a detailed itinerary by asking me
+        relevant questions about my preferences, destination interests, time frame, budget,
+        and any special requirements.
+        
+        The planning should follow the layered approach:
+        1. First determine timing and seasonality
+        2. Then select cities and inter-city transportation
+        3. Finally plan specific activities within each city
+        
+        Each recommendation should be verified by the appropriate verification agent before proceeding.
+        Each agent should use relevant APIs to retrieve real data when needed.
+        """
 
-def main():
-    # Create configs directory path
-    configs_dir = Path("configs")
+def build_planner(
+    configs_dir: str = "configs",
+    human_input_mode: str = "ALWAYS",
+    max_round: int = 50,
+    llm_overrides: Optional[Dict[str, Any]] = None,
+    setup: Optional[Any] = None
+):
+    """
+    Create the agents, group chat and chat manager of the planner.
+    
+    Args:
+        configs_dir: Directory holding agent_config_main.yaml
+        human_input_mode: Input mode of the user proxy ("ALWAYS" for interactive runs, "NEVER" for unattended ones)
+        max_round: Maximum number of group chat rounds
+        llm_overrides: Extra LLM config entries (e.g. {"cache_seed": None})
+        setup: Optional callable(config, agents, groupchat) run before the chat manager
+            is created, e.g. to instrument the group chat (the manager works on a copy of it)
+        
+    Returns:
+        (config, agents, groupchat, manager)
+    """
+    # Start the metrics exports requested by METRICS_PORT / METRICS_FILE
+    configure_metrics()
+    # Trace completions into TRACE_FILE
+    configure_tracing()
     
     # Load agent configuration
-    config = load_agent_config(configs_dir / "agent_config_main.yaml")
+    config = load_agent_config(Path(configs_dir) / "agent_config_main.yaml")
     
     # LLM configuration
     llm_config = {
@@ -392,36 +878,64 @@ def main():
         "temperature": 0.7,
         "api_key": os.environ.get("OPENAI_API_KEY"),  # Make sure to set your API key as an environment variable
     }
+    if openai_base_url():
+        # e.g. the local stand-in server (API_STUB_URL)
+        llm_config["base_url"] = openai_base_url()
+    llm_config.update(llm_overrides or {})
+    
+    # Both need the rule-based speaker graphs; SPEAKER_SELECTION=auto lets the LLM pick every speaker
+    rules = os.environ.get("SPEAKER_SELECTION") != "auto"
+    # Each city gets its own concurrent Within-City sub-conversation; WITHIN_CITY_PARALLEL=0 keeps one transcript
+    per_city = rules and os.environ.get("WITHIN_CITY_PARALLEL", "1") != "0" and "within_city_selection" in config
     
     # Create agents
-    agents = create_agents(config, llm_config)
+    agents = create_agents(config, llm_config, human_input_mode=human_input_mode, within_city=not per_city)
+    if per_city:
+        agents["within_city_planner"] = WithinCityPlanner(
+            lambda: create_city_chat(config, llm_config, max_round=int(os.environ.get("WITHIN_CITY_MAX_ROUND", 30))),
+            verifier=config["travel_planner_agents"]["within_city_layer"]["verification_agent"]["name"],
+            verified_pattern=config["within_city_selection"].get("verified_pattern")
+        )
     
     # Register function callbacks
     register_function_callbacks(agents)
     
+    # Each agent is sent the verified layer outputs, recent messages and a summary, within its token budget
+    register_context_windows(agents, config, pinned=["WithinCityPlanner"])
+    
     # Create group chat
-    groupchat = create_group_chat(agents)
+    speaker_graph = create_speaker_graph(config) if rules else None
+    groupchat = create_group_chat(agents, max_round=max_round, speaker_graph=speaker_graph)
+    if setup is not None:
+        setup(config, agents, groupchat)
     
     # Create chat manager
     manager = autogen.GroupChatManager(groupchat=groupchat, llm_config=llm_config)
     
+    return config, agents, groupchat, manager
+
+def run_planner(agents: Dict[str, autogen.Agent], manager: autogen.GroupChatManager, message: str = TRIP_REQUEST):
+    """
+    Start the trip planning conversation and return the chat result.
+    
+    With TRACE_FILE set, the session is recorded as one trace and appended
+    to that file as OTLP/JSON. Large tool results go to a blob store that
+    lives as long as the session (BLOB_STORE).
+    """
+    with trace("planning_session", agents=len(agents), max_round=manager.groupchat.max_round) as session:
+        with blob_session() as blobs:
+            result = agents["user_proxy"].initiate_chat(manager, message=message)
+            session.set("rounds", len(manager.groupchat.messages))
+            if blobs is not None:
+                session.set("blobs.offloaded", blobs.stats()["offloaded"])
+                session.set("blobs.stored_bytes", blobs.stats()["stored_bytes"])
+        return result
+
+def main(message: str = TRIP_REQUEST, human_input_mode: str = "ALWAYS", max_round: int = 50):
+    _, agents, _, manager = build_planner(human_input_mode=human_input_mode, max_round=max_round)
+    
     # Start the trip planning process
-    agents["user_proxy"].initiate_chat(
-        manager,
-        message="""
-        I'd like to plan a trip. Please help me create a detailed itinerary by asking me
-        relevant questions about my preferences, destination interests, time frame, budget,
-        and any special requirements.
-        
-        The planning should follow the layered approach:
-        1. First determine timing and seasonality
-        2. Then select cities and inter-city transportation
-        3. Finally plan specific activities within each city
-        
-        Each recommendation should be verified by the appropriate verification agent before proceeding.
-        Each agent should use relevant APIs to retrieve real data when needed.
-        """
-    )
+    return run_planner(agents, manager, message)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
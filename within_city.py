@@ -0,0 +1,192 @@
+# ai-trip-planner-agents/within_city.py
+
+import os
+import re
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+import autogen
+
+from api.tracing import span
+
+# Agents whose latest message is handed to every city's sub-conversation
+CONTEXT_AGENTS = ("TimeSlotAgent", "CityPlannerAgent", "FlightAgent", "InterCityTransportAgent")
+
+_LIST_SPLIT = re.compile(r"\s*(?:,|;|→|->|\band\b)\s*")
+_HEADER = re.compile(r"^\s*[-*]?\s*([A-Za-z][A-Za-z ()]*):\s*(.*)$")
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+_NUMBERED = re.compile(r"^\s*\d+[.)]\s")
+
+
+def _section(text: str, title: str) -> List[str]:
+    """Items of a "- Title: a, b" line, or of the indented/numbered lines under a bare "- Title:" header."""
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        match = _HEADER.match(line)
+        if not match or not match.group(1).strip().lower().startswith(title):
+            continue
+        if match.group(2).strip():
+            return [item for item in _LIST_SPLIT.split(match.group(2).strip()) if item]
+        indent = len(line) - len(line.lstrip())
+        items = []
+        for following in lines[i + 1:]:
+            if not following.strip():
+                if items:
+                    break
+                continue
+            nested = len(following) - len(following.lstrip()) > indent or _NUMBERED.match(following)
+            if not nested:
+                break
+            items.append(_BULLET.sub("", following).strip())
+        return [item for item in items if item]
+    return []
+
+
+def parse_cities(plan: str) -> List[Tuple[str, Optional[int]]]:
+    """
+    Cities and their day counts from a CityPlannerAgent itinerary.
+
+    Reads the "Cities (in order)" and "Days per City" items of the agent's
+    output format; days are None where the allocation does not name the city.
+    """
+    plan = plan.replace("**", "")
+    cities = []
+    for item in _section(plan, "cities"):
+        # "Paris (3 days)" or "1. Paris"
+        name = re.sub(r"\(.*?\)", "", _BULLET.sub("", item)).strip(" .")
+        if name and name.lower() not in (c.lower() for c in cities):
+            cities.append(name)
+    days: Dict[str, int] = {}
+    for item in _section(plan, "days per city"):
+        match = re.match(r"(.+?)\s*(?::|-|–|\()\s*(\d+)", item)
+        if match:
+            days[match.group(1).strip().lower()] = int(match.group(2))
+    return [(city, days.get(city.lower())) for city in cities]
+
+
+def _latest(messages: List[Dict[str, Any]], name: str) -> Optional[str]:
+    for message in reversed(messages):
+        if message.get("name") == name and message.get("content"):
+            return str(message["content"])
+    return None
+
+
+class WithinCityPlanner(autogen.ConversableAgent):
+    """
+    Group chat member that runs the Within-City layer once per city, concurrently.
+
+    When it gets the floor (after the City layer is verified) it reads the
+    city list from CityPlannerAgent's itinerary. Each city then gets its own
+    sub-conversation between fresh within-city agents. That conversation
+    starts from a short brief: the trip request, the latest Area and City
+    layer outputs, and the city with its days. Every city's sub-plan comes
+    back in one message, marked verified, rejected, unfinished or failed,
+    which the orchestrator merges.
+    """
+
+    def __init__(
+        self,
+        make_chat: Callable[[], Callable[[str], List[Dict[str, Any]]]],
+        name: str = "WithinCityPlanner",
+        max_workers: Optional[int] = None,
+        verifier: str = "ActivityVerificationAgent",
+        verified_pattern: Optional[str] = None
+    ):
+        """
+        Args:
+            make_chat: Builds one city's sub-conversation: a function from its brief to its transcript
+            name: Agent name used in the speaker graph
+            max_workers: Cities planned at once (default: WITHIN_CITY_WORKERS, else 4)
+            verifier: Agent whose last verdict decides whether a city's plan is verified
+            verified_pattern: Verdict that accepts a plan (as in speaker_selection.yaml)
+        """
+        super().__init__(
+            name=name,
+            system_message="Runs the Within-City layer for every city in parallel.",
+            llm_config=False,
+            human_input_mode="NEVER",
+            code_execution_config=False
+        )
+        self.make_chat = make_chat
+        self.max_workers = max_workers or int(os.environ.get("WITHIN_CITY_WORKERS", 4))
+        self.verifier = verifier
+        self.verified = re.compile(verified_pattern or r"^\W*verified\b", re.IGNORECASE | re.MULTILINE)
+        self.register_reply([autogen.Agent, None], WithinCityPlanner._plan_cities)
+
+    def _brief(self, messages: List[Dict[str, Any]], city: str, days: Optional[int]) -> str:
+        parts = [f"Trip request:\n{messages[0].get('content', '')}"] if messages else []
+        for name in CONTEXT_AGENTS:
+            latest = _latest(messages, name)
+            if latest:
+                parts.append(f"{name}:\n{latest}")
+        scope = f"{city} ({days} days)" if days else city
+        parts.append(
+            f"Plan the Within-City layer for {scope} only: sites, restaurants, hotel and daily transport, "
+            f"then verify it. Other cities are planned separately."
+        )
+        return "\n\n".join(parts)
+
+    def plan_city(self, brief: str, city: str) -> Dict[str, Any]:
+        """
+        Run one city's sub-conversation and collect each agent's final output.
+
+        "verdict" is "verified" or "rejected" when the verifier had the last
+        word, and "unfinished" when the conversation ran out of rounds first.
+        """
+        with span("within_city.city", city=city) as city_span:
+            messages = self.make_chat()(brief)
+            outputs, last = {}, None
+            for message in messages[1:]:
+                if message.get("content") and message.get("role") not in ("function", "tool"):
+                    outputs[message.get("name")] = str(message["content"])
+                    last = message.get("name")
+            # A verdict only covers the plan if nobody answered after it
+            if last != self.verifier:
+                verdict = "unfinished"
+            else:
+                verdict = "verified" if self.verified.search(outputs[last]) else "rejected"
+            city_span.set("rounds", len(messages))
+            city_span.set("verdict", verdict)
+        return {"city": city, "outputs": outputs, "rounds": len(messages), "verdict": verdict}
+
+    def _plan_cities(self, messages=None, sender=None, config=None):
+        messages = messages or []
+        plan = _latest(messages, "CityPlannerAgent") or ""
+        # Without a parsable city list the whole trip is planned as one unit
+        cities = parse_cities(plan) or [("all cities of the itinerary", None)]
+
+        with span("within_city", cities=len(cities)):
+            # Each city runs in a copy of this context so its spans and tool metrics nest here
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(cities)), thread_name_prefix="city") as pool:
+                futures = [
+                    pool.submit(contextvars.copy_context().run, self.plan_city, self._brief(messages, city, days), city)
+                    for city, days in cities
+                ]
+                results = []
+                for (city, _), future in zip(cities, futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        results.append({"city": city, "error": f"{type(e).__name__}: {e}"})
+
+        sections = []
+        for result in results:
+            if "error" in result:
+                status = f"FAILED, no plan: {result['error']}"
+            elif result["verdict"] == "verified":
+                status = f"verified by {self.verifier}"
+            elif result["verdict"] == "rejected":
+                status = f"NOT VERIFIED: {self.verifier} rejected the last plan"
+            else:
+                status = f"NOT VERIFIED: stopped after {result['rounds']} messages before a final verdict"
+            lines = [f"## {result['city']} ({status})"]
+            for name, output in result.get("outputs", {}).items():
+                lines.append(f"{name}:\n{output}")
+            sections.append("\n\n".join(lines))
+        verified = sum(1 for result in results if result.get("verdict") == "verified")
+        header = f"Within-City plans for {len(results)} cities, planned separately; {verified} verified."
+        if verified < len(results):
+            header += " Cities marked NOT VERIFIED or FAILED need their plan checked or redone."
+        header += " OrchestratorAgent: merge them into the final day-by-day plan."
+        return True, header + "\n\n" + "\n\n".join(sections)